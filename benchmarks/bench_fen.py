@@ -0,0 +1,37 @@
+"""
+Parse throughput of Fen.verify and Fen.to_board_representation.
+
+Usage: PYTHONPATH=. python benchmarks/bench_fen.py [--number N]
+"""
+import argparse
+import timeit
+
+from fen2image.Fen import Fen
+
+FENS = [
+    "rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1",
+    "r1bqkb1r/pppp1ppp/2n2n2/4p2Q/2B1P3/8/PPPP1PPP/RNB1K1NR w KQkq - 4 4",
+    "r3k2r/p1ppqpb1/bn2pnp1/3PN3/1p2P3/2N2Q1p/PPPBBPPP/R3K2R w KQkq - 0 1",
+    "8/2p5/3p4/KP5r/1R3p1k/8/4P1P1/8 w - - 0 1",
+]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--number", type=int, default=20000, help="number of FENs parsed per measure")
+    args = parser.parse_args()
+
+    fens = (FENS * (args.number // len(FENS) + 1))[:args.number]
+    boards = [Fen(fen).to_board_representation() for fen in fens]
+    measures = {
+        "verify": lambda: [Fen(fen).verify() for fen in fens],
+        "verify + to_board_representation": lambda: [Fen(fen).to_board_representation() for fen in fens],
+        "to_list": lambda: [board.to_list() for board in boards],
+    }
+    for name, function in measures.items():
+        seconds = min(timeit.repeat(function, number=1, repeat=5))
+        print(f"{name:<34} {args.number / seconds:>12,.0f} FEN/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,218 @@
+"""
+Benchmark suite: parsing, rendering of every board design, encoding and batch throughput.
+
+Usage: PYTHONPATH=. python benchmarks/run.py [--suite NAME ...] [--output results.json] [--baseline baseline.json] [--threshold 0.15]
+
+The results are written as JSON. Given a baseline (the output of an earlier run on the same machine),
+every measure slower than the baseline by more than the threshold is reported and the exit status is 1.
+"""
+import argparse
+import io
+import json
+import platform
+import statistics
+import sys
+import time
+import timeit
+from datetime import datetime, timezone
+from typing import Callable, Dict, List, Optional
+
+import PIL
+
+from bench_fen import FENS
+from fen2image import fen2images, numpy_backend
+from fen2image.BoardPyramid import board_pyramid
+from fen2image.Fen import Fen
+from fen2image.SpriteStore import sprite_store
+from fen2image.TileStore import tile_store
+from fen2image.utils import get_list_available_boards
+
+SUITES = ("parse", "render", "encode", "batch")
+# the board widths rendered for every design, None for the native width
+SIZES = (None, 256, 512)
+ENCODINGS = {
+    "PNG": {"format": "PNG"},
+    "PNG compress_level=1": {"format": "PNG", "compress_level": 1},
+    "WEBP lossless": {"format": "WEBP", "lossless": True},
+    "WEBP quality=80": {"format": "WEBP", "quality": 80},
+    "JPEG quality=85": {"format": "JPEG", "quality": 85},
+}
+WORKER_COUNTS = (1, 2, 4)
+
+
+def measure(function: Callable[[], object], min_time: float, repeat: int = 5, setup: Optional[Callable[[], object]] = None) -> Dict[str, float]:
+    """
+    Time a function, calling it enough times per repeat to run for about min_time seconds.
+
+    :param function: the operation to time.
+    :param min_time: the target duration of one repeat in seconds.
+    :param repeat: the number of repeats.
+    :param setup: called before every call of the function, outside of the timing.
+    :return: the best and median seconds per call, and the number of calls per repeat.
+    """
+    def timed() -> float:
+        if setup is not None:
+            setup()
+        start = time.perf_counter()
+        function()
+        return time.perf_counter() - start
+
+    if setup is not None:
+        # the setup is not cheap enough to be amortized, each call is timed on its own
+        timings = [timed() for _ in range(max(repeat, 3))]
+        return {"best": min(timings), "median": statistics.median(timings), "number": 1}
+
+    first = timed()
+    number = max(1, int(min_time / max(first, 1e-9)))
+    timings = [seconds / number for seconds in timeit.repeat(function, number=number, repeat=repeat)]
+    return {"best": min(timings), "median": statistics.median(timings), "number": number}
+
+
+def bench_parse(args) -> Dict[str, Dict[str, float]]:
+    fens = FENS * 250
+    boards = [Fen(fen).to_board_representation() for fen in fens]
+    results = {
+        "parse/verify": measure(lambda: [Fen(fen).verify() for fen in fens], args.min_time),
+        "parse/to_board_representation": measure(lambda: [Fen(fen).to_board_representation() for fen in fens], args.min_time),
+        "parse/placement": measure(lambda: [board.placement() for board in boards], args.min_time),
+    }
+    # per FEN rather than per batch of FENs
+    for result in results.values():
+        result["best"] /= len(fens)
+        result["median"] /= len(fens)
+    return results
+
+
+def clear_caches() -> None:
+    """
+    Empty every cache of decoded assets, so that a render decodes and resizes the board and the sprites again.
+    """
+    board_pyramid.clear()
+    sprite_store.clear()
+    tile_store.clear()
+    numpy_backend.sprite_stack.cache_clear()
+
+
+def bench_render(args) -> Dict[str, Dict[str, float]]:
+    board = Fen(FENS[1]).to_board_representation()
+    results = {}
+    for design in _designs(args):
+        results[f"render/{design}/cold"] = measure(
+            lambda: board.create_image(board_design=design), args.min_time, setup=clear_caches
+        )
+        for size in SIZES:
+            board.create_image(board_design=design, size=size)
+            label = "native" if size is None else size
+            for backend in args.backends:
+                results[f"render/{design}/{label}/{backend}"] = measure(
+                    lambda: board.create_image(board_design=design, size=size, backend=backend), args.min_time
+                )
+    return results
+
+
+def bench_encode(args) -> Dict[str, Dict[str, float]]:
+    results = {}
+    for size in SIZES:
+        image = Fen(FENS[1]).to_board_representation().create_image(board_design="wood", size=size)
+        label = "native" if size is None else size
+        for name, params in ENCODINGS.items():
+            params = dict(params)
+            source = image.convert("RGB") if params["format"] == "JPEG" else image
+            results[f"encode/{label}/{name}"] = measure(lambda: source.save(io.BytesIO(), **params), args.min_time)
+    return results
+
+
+def bench_batch(args) -> Dict[str, Dict[str, float]]:
+    fens = FENS * (args.batch_size // len(FENS))
+    results = {}
+    for workers in WORKER_COUNTS:
+        def run() -> None:
+            for result in fen2images(fens, board_design="wood", max_workers=workers, size=256):
+                if result.error is not None:
+                    raise result.error
+
+        # the pool start-up is part of the measure, as it is for a caller of fen2images
+        result = measure(run, 0, repeat=3)
+        result["best"] /= len(fens)
+        result["median"] /= len(fens)
+        results[f"batch/{workers} workers"] = result
+    return results
+
+
+def compare(results: Dict[str, Dict[str, float]], baseline: Dict[str, Dict[str, float]], threshold: float) -> List[str]:
+    """
+    List the measures slower than their baseline by more than the threshold.
+
+    :param results: the measures of this run.
+    :param baseline: the measures of the baseline run.
+    :param threshold: the tolerated slowdown, 0.15 for 15 %.
+    :return: one line per regression.
+    """
+    regressions = []
+    for name, result in results.items():
+        reference = baseline.get(name)
+        if reference is None:
+            continue
+        ratio = result["best"] / reference["best"]
+        if ratio > 1 + threshold:
+            regressions.append(f"{name}: {_format(result['best'])} vs {_format(reference['best'])} ({ratio - 1:+.0%})")
+    return regressions
+
+
+def _designs(args) -> List[str]:
+    return args.boards or get_list_available_boards()
+
+
+def _format(seconds: float) -> str:
+    if seconds >= 1e-3:
+        return f"{seconds * 1e3:.2f} ms"
+    return f"{seconds * 1e6:.2f} us"
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--suite", choices=SUITES, nargs="+", default=list(SUITES), help="the suites to run")
+    parser.add_argument("--boards", nargs="+", help="the board designs rendered, all of them by default")
+    parser.add_argument("--backends", nargs="+", default=["pil"], help="the compositing backends rendered")
+    parser.add_argument("--min-time", type=float, default=0.2, help="target duration of one repeat in seconds")
+    parser.add_argument("--batch-size", type=int, default=400, help="number of FENs of the batch suite")
+    parser.add_argument("--output", help="write the results to this JSON file")
+    parser.add_argument("--baseline", help="compare the results to this JSON file")
+    parser.add_argument("--threshold", type=float, default=0.15, help="tolerated slowdown against the baseline")
+    args = parser.parse_args(argv)
+
+    suites = {"parse": bench_parse, "render": bench_render, "encode": bench_encode, "batch": bench_batch}
+    results: Dict[str, Dict[str, float]] = {}
+    for suite in args.suite:
+        for name, result in suites[suite](args).items():
+            print(f"{name:<48} {_format(result['best']):>12} best {_format(result['median']):>12} median")
+            results[name] = result
+
+    if args.output:
+        report = {
+            "meta": {
+                "date": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+                "python": platform.python_version(),
+                "pillow": PIL.__version__,
+                "platform": platform.platform(),
+                "suites": args.suite,
+            },
+            "results": results,
+        }
+        with open(args.output, "w") as file:
+            json.dump(report, file, indent=2)
+
+    if args.baseline:
+        with open(args.baseline) as file:
+            baseline = json.load(file)["results"]
+        regressions = compare(results, baseline, args.threshold)
+        for line in regressions:
+            print(f"REGRESSION {line}")
+        if regressions:
+            return 1
+        print(f"No regression beyond {args.threshold:.0%} against {args.baseline}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,124 @@
+import threading
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple, Union
+
+from .constants import PATH_ARTS, piece_to_filename
+
+
+@dataclass(frozen=True)
+class Asset:
+    """
+    A board design or a pieces design found on disk.
+
+    :param name: the name of the design, as passed to create_image.
+    :param path: the image file of a board, or the directory of a pieces design.
+    :param format: the image format reported by Pillow, e.g. "PNG" or "JPEG".
+    :param size: the native (width, height) in pixels. For pieces, the size of a single sprite.
+    """
+    name: str
+    path: Path
+    format: Optional[str]
+    size: Optional[Tuple[int, int]]
+
+
+class AssetRegistry:
+    """
+    Index of the available board and pieces designs.
+
+    The asset directories are scanned once, on first use, instead of on every lookup.
+    Every asset directory follows the layout of resources/arts: a "boards" directory of images
+    and a "pieces" directory holding one directory of sprites per design.
+    """
+
+    def __init__(self, directories: Optional[List[Path]] = None) -> None:
+        """
+        Initializes the registry. Nothing is read from disk until the first lookup.
+
+        :param directories: the asset directories, the bundled resources/arts by default.
+        """
+        self._directories: List[Path] = list(directories) if directories is not None else [PATH_ARTS]
+        self._boards: Optional[Dict[str, Asset]] = None
+        self._pieces: Optional[Dict[str, Asset]] = None
+        self._lock = threading.Lock()
+
+    @property
+    def directories(self) -> List[Path]:
+        return list(self._directories)
+
+    @property
+    def boards(self) -> Dict[str, Asset]:
+        """
+        The board designs, by name.
+        """
+        if self._boards is None:
+            self._build()
+        return self._boards
+
+    @property
+    def pieces(self) -> Dict[str, Asset]:
+        """
+        The pieces designs, by name.
+        """
+        if self._pieces is None:
+            self._build()
+        return self._pieces
+
+    def register_directory(self, directory: Union[str, Path]) -> None:
+        """
+        Add an asset directory. Its designs take precedence over those with the same name in
+        previously registered directories.
+
+        :param directory: a directory containing a "boards" and/or a "pieces" directory.
+        """
+        directory = Path(directory)
+        if not directory.is_dir():
+            raise ValueError(f"Asset directory '{directory}' does not exist.")
+        with self._lock:
+            if directory not in self._directories:
+                self._directories.append(directory)
+            self._boards = self._pieces = None
+
+    def refresh(self) -> None:
+        """
+        Drop the index, the asset directories are scanned again on the next lookup.
+        """
+        with self._lock:
+            self._boards = self._pieces = None
+
+    def _build(self) -> None:
+        with self._lock:
+            if self._boards is not None and self._pieces is not None:
+                return
+            boards: Dict[str, Asset] = {}
+            pieces: Dict[str, Asset] = {}
+            for directory in self._directories:
+                boards_directory = directory / "boards"
+                if boards_directory.is_dir():
+                    for path in sorted(boards_directory.iterdir()):
+                        if path.is_file():
+                            name = path.name.split('.')[0]
+                            boards[name] = Asset(name, path, *_read_header(path))
+                pieces_directory = directory / "pieces"
+                if pieces_directory.is_dir():
+                    for path in sorted(pieces_directory.iterdir()):
+                        if path.is_dir():
+                            pieces[path.name] = Asset(path.name, path, *_read_header(path / piece_to_filename["K"]))
+            self._boards, self._pieces = boards, pieces
+
+
+def _read_header(path: Path) -> Tuple[Optional[str], Optional[Tuple[int, int]]]:
+    """
+    Read the format and size of an image. Pillow only parses the header, the pixels are not decoded.
+    """
+    from PIL import Image
+
+    try:
+        with Image.open(path) as image:
+            return image.format, image.size
+    except (OSError, ValueError):
+        return None, None
+
+
+# shared by every render of the process
+registry = AssetRegistry()
@@ -0,0 +1,119 @@
+from __future__ import annotations
+
+from pathlib import Path
+from typing import Dict, Optional, Tuple, TYPE_CHECKING
+
+from .ImageLRU import ImageLRU
+from .utils import get_dict_available_boards
+
+if TYPE_CHECKING:
+    from PIL import Image
+
+# the reductions of the native board kept as pyramid levels
+_FACTORS = (8, 4, 2, 1)
+
+
+class BoardPyramid(ImageLRU):
+    """
+    Bounded LRU store of decoded boards, at their native size and at reduced sizes.
+
+    A board requested at a square size is resampled from the smallest level of the pyramid that is
+    still larger than it: the native board reduced by 2, 4 or 8. JPEG levels are decoded directly at
+    the reduced scale (Pillow's draft mode), PNG levels are reduced from the native board.
+    The levels and the resampled boards are all kept, up to max_bytes of pixels. They are keyed by
+    the image file of the board, so registering a directory that overrides a design does not serve
+    the old board.
+    """
+
+    counter = "board_pyramid"
+
+    def __init__(self, max_bytes: int = 256 * 1024 * 1024) -> None:
+        """
+        Initializes an empty pyramid.
+
+        :param max_bytes: the maximum memory used by the cached boards, the least recently used are evicted beyond it.
+        """
+        super().__init__(max_bytes)
+        self._native_sizes: Dict[Path, Tuple[int, int]] = {}
+
+    def get(self, board_design: str, square_size: Optional[int] = None, board_path: Optional[Path] = None) -> Image.Image:
+        """
+        Get a board at a square size.
+
+        :param board_design: the design of the board.
+        :param square_size: the size of a square in pixels, the board is then 8 * square_size wide and high.
+            None for the native size of the board.
+        :param board_path: the image file of the board, looked up from its name if not given.
+        :return: the RGBA board. It is shared, do not modify it.
+        """
+        from PIL import Image
+
+        if board_path is None:
+            board_path = get_dict_available_boards()[board_design]
+        if square_size is None:
+            return self._level(board_path, 1)
+
+        target = 8 * square_size
+        width, height = self._native_size(board_path)
+        factor = next(factor for factor in _FACTORS if factor == 1 or min(width, height) // factor >= target)
+        if width // factor == target and height // factor == target:
+            # the level is the requested board
+            level = self._level(board_path, factor)
+            if level.size == (target, target):
+                return level
+
+        key = ("size", board_path, square_size)
+        board = self._lookup(key)
+        if board is not None:
+            return board
+        level = self._level(board_path, factor)
+        return self._store(key, level.resize((target, target), Image.LANCZOS))
+
+    def clear(self) -> None:
+        """
+        Remove every board and reset the statistics.
+        """
+        super().clear()
+        with self._lock:
+            self._native_sizes.clear()
+
+    def _native_size(self, board_path: Path) -> Tuple[int, int]:
+        with self._lock:
+            size = self._native_sizes.get(board_path)
+        if size is None:
+            from PIL import Image
+
+            # only the header is read
+            with Image.open(board_path) as image:
+                size = image.size
+            with self._lock:
+                self._native_sizes[board_path] = size
+        return size
+
+    def _level(self, board_path: Path, factor: int) -> Image.Image:
+        key = ("level", board_path, factor)
+        board = self._lookup(key)
+        if board is not None:
+            return board
+
+        from PIL import Image
+
+        with Image.open(board_path) as image:
+            if factor == 1:
+                board = image.convert("RGBA")
+            elif image.format == "JPEG":
+                # decode at 1/factor scale, most of the DCT work is skipped
+                size = (image.width // factor, image.height // factor)
+                image.draft("RGB", size)
+                board = image.convert("RGBA")
+                if board.size != size:
+                    board = board.resize(size, Image.LANCZOS)
+            else:
+                board = None
+        if board is None:
+            board = self._level(board_path, 1).reduce(factor)
+        return self._store(key, board)
+
+
+# shared by every render of the process
+board_pyramid = BoardPyramid()
@@ -1,73 +1,313 @@
+from __future__ import annotations
+
 import random
-from PIL import Image
-from typing import List
+import re
+from contextlib import nullcontext
+from typing import Iterable, List, Optional, Sequence, Tuple, Union, TYPE_CHECKING
 
-from .constants import piece_to_filename, PATH_RESULT, PATH_OTHER
+from . import numpy_backend
+from .BoardPyramid import board_pyramid
+from .RenderCache import RenderCache
+from .instrumentation import Metrics, instrument, stage
+from .overlays import Arrow, Highlight, Overlay, split_overlays
+from .SpriteStore import sprite_store
+from .TileStore import tile_store
+from .sinks import Output, as_sink
 from .utils import get_list_available_pieces, get_list_available_boards, get_dict_available_boards, get_dict_available_pieces
 
+if TYPE_CHECKING:
+    import numpy
+    from PIL import Image
+    from .atlas import Atlas
+
+# the ways of compositing the pieces on the board
+BACKENDS = ("pil", "numpy", "tiles")
+# what create_image returns: a PIL image, a NumPy array or the raw RGBA bytes
+RETURN_TYPES = ("image", "array", "buffer")
+
+# runs of empty squares, counted back to a digit in the FEN placement
+_EMPTY_RUN = re.compile(r"\.+")
+# "1" to "8" expand to as many empty squares
+_EMPTY_SQUARES = tuple((str(count), "." * count) for count in range(8, 0, -1))
+
+
+def expand_empty_squares(placement: str) -> str:
+    """
+    Replace the digits of a piece placement by as many "." characters.
+
+    :param placement: a piece placement, or part of it, e.g. "4k3".
+    :return: the placement with one character per square, e.g. "....k...".
+    """
+    # a few str.replace calls run faster than str.translate with multi-character replacements
+    for digit, empty in _EMPTY_SQUARES:
+        placement = placement.replace(digit, empty)
+    return placement
+
 
 class BoardRepresentation:
+    """
+    A parsed FEN position.
+
+    The 64 squares are stored as 64 bytes, from a8 to h1 rank by rank, holding the piece letter
+    or "." for an empty square. The board attribute gives them as the 8x8 list of lists of earlier versions.
+    """
+
+    __slots__ = ("_board", "color_turn", "castling_rights", "en_passant", "half_move_count", "full_move_count")
+
     def __init__(
         self,
-        board: List,
+        board: Union[List, bytes, str],
         color_turn: str,
         castling_rights: str,
         en_passant: str,
         half_move_count: int,
         full_move_count: int
     ):
-        self.board: List = board
+        self.board = board
         self.color_turn: str = color_turn
         self.castling_rights: str = castling_rights
         self.en_passant: str = en_passant
         self.half_move_count: int = half_move_count
         self.full_move_count: int = full_move_count
 
-    def create_image(self, pieces_design: str = "classic", board_design: str = "random") -> Image:
+    @property
+    def board(self) -> List[List[str]]:
+        """
+        The board as 8 rows of 8 characters, a piece letter or "." for an empty square.
+        The squares are stored as bytes: each read builds a new list, and editing it does not change the board.
+        Edit a copy and assign it back instead: rows = br.board; rows[0][0] = "."; br.board = rows.
+        Assigning accepts the same list of lists (digits count empty squares), 64 bytes, or a placement string.
+        """
+        return self.to_list()
+
+    @board.setter
+    def board(self, board: Union[List, bytes, str]) -> None:
+        if isinstance(board, (bytes, bytearray)):
+            packed = bytes(board)
+        elif isinstance(board, str):
+            packed = expand_empty_squares(board.replace("/", "")).encode("ascii")
+        else:
+            rows = [expand_empty_squares("".join(row)) for row in board]
+            if len(rows) != 8 or any(len(row) != 8 for row in rows):
+                raise ValueError(f"Invalid board: Expected 8 rows of 8 squares, got {[len(row) for row in rows]}")
+            packed = "".join(rows).encode("ascii")
+        if len(packed) != 64:
+            raise ValueError(f"Invalid board: Expected 64 squares, got {len(packed)}")
+        self._board = packed
+
+    @property
+    def board_bytes(self) -> bytes:
+        """
+        The 64 squares as bytes, from a8 to h1.
+        """
+        return self._board
+
+    def to_list(self) -> List[List[str]]:
+        """
+        Convert the board to a list of 8 rows of 8 characters.
+
+        :return: the board, e.g. [["r", "n", ...], ["p", ...], [".", ...], ...].
+        """
+        squares = self._board.decode("ascii")
+        return [list(squares[index:index + 8]) for index in range(0, 64, 8)]
+
+    def squares(self) -> str:
+        """
+        Get the content of the 64 squares, from a8 to h1, rank by rank.
+
+        :return: a string of 64 characters, a piece letter or "." for an empty square.
+        """
+        return self._board.decode("ascii")
+
+    def placement(self) -> str:
+        """
+        Get the piece placement field of the FEN of the board, with the empty squares counted.
+
+        :return: the normalized piece placement, e.g. "rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR".
+        """
+        squares = self._board.decode("ascii")
+        ranks = "/".join(squares[index:index + 8] for index in range(0, 64, 8))
+        return _EMPTY_RUN.sub(lambda run: str(len(run.group())), ranks)
+
+    def create_image(
+        self,
+        pieces_design: str = "classic",
+        board_design: str = "random",
+        output: Output = None,
+        cache: Optional[RenderCache] = None,
+        backend: str = "pil",
+        atlas: Optional["Atlas"] = None,
+        size: Optional[int] = None,
+        metrics: Optional[Metrics] = None,
+        overlays: Iterable[Overlay] = (),
+        return_type: str = "image"
+    ) -> Union[Image, "numpy.ndarray", bytes]:
         """
         Create an image of the board representation.
 
         :param pieces_design: The design of the pieces.
         :param board_design: The design of the board.
+        :param output: Where to write the image: None to only return it, a path, a binary file object,
+            or a Sink such as BytesSink or BackgroundWriter.sink().
+        :param cache: A RenderCache to look the render up in before drawing it. A random board design
+            is resolved first, so the render is cached under the design actually drawn.
+        :param backend: How the pieces are composited: "pil" pastes them one by one, "numpy" blends them
+            all at once with NumPy (pip install fen2image[numpy]), "tiles" copies pieces precomposed on their
+            square (see fen2image.TileStore). They all give the same pixels.
+        :param atlas: An Atlas holding the designs (see fen2image.atlas.build_atlas). The board and the sprites
+            are then read from it instead of being decoded. A "random" board design stands for the board of the atlas.
+        :param size: The width of the board in pixels, rounded down to a multiple of 8. The board and the pieces
+            are drawn directly at that size, from a cached reduced version of the board. None keeps the native
+            size of the board design. With an atlas, size // 8 must be one of its square sizes.
+        :param metrics: A MetricsCollector, or a callback(kind, name, value), receiving the duration of each
+            stage of the render and the hits and misses of the caches (see fen2image.instrumentation).
+        :param overlays: Highlight and Arrow objects (see fen2image.overlays). Highlights are drawn on the board
+            under the pieces, arrows over them, in the same pass as the pieces.
+        :param return_type: "image" returns a PIL image. "array" returns a read-only (height, width, 4) uint8
+            NumPy array (pip install fen2image[numpy]) and "buffer" its raw RGBA bytes, row by row: the pixels
+            are handed over without an encode and decode cycle.
         """
-        if board_design == "random":
-            board_design = random.choice(get_list_available_boards())
-        self._verify_designs(pieces_design, board_design)
-        board_path = get_dict_available_boards()[board_design]
-        pieces_path = get_dict_available_pieces()[pieces_design]
-
-        board = Image.open(board_path).convert("RGBA")
-        square_size = board.width // 8
-        composite = board.copy()
-
-        for index_row, row in enumerate(self.board):
-            index_col = 0
-            for char in row:
-                if char.isdigit():
-                    index_col += int(char)
-                    continue
-                elif char == ".":
-                    index_col += 1
-                    continue
-                else:  # should be a piece
-                    piece_path = pieces_path / piece_to_filename[char]
-                    piece = Image.open(piece_path).convert("RGBA").resize((square_size, square_size), Image.LANCZOS)
-                    position = ((index_col * square_size)-1, (index_row * square_size)-0)
-                    composite.paste(piece, position, piece)
-                    index_col += 1
-
-        frame_name = "wFrame.png" if self.color_turn == "w" else "bFrame.png"
-        frame = Image.open(PATH_OTHER / frame_name).convert("RGBA").resize((square_size//2, square_size//2), Image.LANCZOS)
-        width, height = composite.size
-        frame_width, frame_height = frame.size
-        new_width, new_height = width + frame_width+square_size//4, height + frame_height
-        new_frame = Image.new("RGBA", (new_width, new_height))
-        new_frame.paste(composite, (0, 0))
-        new_frame.paste(frame, (width+square_size//4, height-frame_height-square_size//4))
-
-        new_frame.save(PATH_RESULT / "result.png")
+        if return_type not in RETURN_TYPES:
+            raise ValueError(f"Return type '{return_type}' is not available. Available return types are: {list(RETURN_TYPES)}")
+        with instrument(metrics) if metrics is not None else nullcontext(), stage("render"):
+            new_frame = self._create_image(pieces_design, board_design, output, cache, backend, atlas, size, tuple(overlays))
+        if return_type == "array":
+            return numpy_backend._numpy("An array return type").asarray(new_frame)
+        if return_type == "buffer":
+            return new_frame.tobytes()
         return new_frame
 
+    def _create_image(
+        self,
+        pieces_design: str,
+        board_design: str,
+        output: Output,
+        cache: Optional[RenderCache],
+        backend: str,
+        atlas: Optional["Atlas"],
+        size: Optional[int],
+        overlays: Tuple[Overlay, ...]
+    ) -> Image:
+        if backend not in BACKENDS:
+            raise ValueError(f"Backend '{backend}' is not available. Available backends are: {list(BACKENDS)}")
+        if size is not None and size < 16:
+            raise ValueError(f"Size must be superior or equal to 16, got {size}")
+        square_size = None if size is None else size // 8
+        highlights, arrows = split_overlays(overlays)
+        sink = as_sink(output)
+        with stage("assets"):
+            if atlas is not None:
+                atlas.check_designs(pieces_design, board_design)
+                board_design = atlas.board_design
+            else:
+                if board_design == "random":
+                    board_design = random.choice(get_list_available_boards())
+                self._verify_designs(pieces_design, board_design)
+
+        key = None
+        new_frame = None
+        if cache is not None:
+            if atlas is None:
+                board_path, pieces_path = get_dict_available_boards()[board_design], get_dict_available_pieces()[pieces_design]
+            else:
+                board_path, pieces_path = atlas.path, None
+            key = cache.make_key(self.placement(), self.color_turn, board_design, pieces_design, size=square_size, overlays=overlays,
+                                 board_path=board_path, pieces_path=pieces_path)
+            new_frame = cache.get(key)
+        if new_frame is None:
+            new_frame = self._render(pieces_design, board_design, backend, atlas, square_size, highlights, arrows)
+            if cache is not None:
+                cache.put(key, new_frame)
+
+        if sink is not None:
+            with stage("encode"):
+                sink.write(new_frame)
+        return new_frame
+
+    def _render(
+        self,
+        pieces_design: str,
+        board_design: str,
+        backend: str = "pil",
+        atlas: Optional["Atlas"] = None,
+        square_size: Optional[int] = None,
+        highlights: Sequence[Highlight] = (),
+        arrows: Sequence[Arrow] = ()
+    ) -> Image:
+        """
+        Draw the board, the pieces and the turn indicator.
+
+        :param pieces_design: The verified design of the pieces.
+        :param board_design: The verified design of the board.
+        :param backend: The compositing backend, "pil", "numpy" or "tiles".
+        :param atlas: The atlas to take the board and the sprites from, instead of decoding them.
+        :param square_size: The size of a square in pixels, None for the native size of the board.
+        :param highlights: The highlights drawn under the pieces.
+        :param arrows: The arrows drawn over the pieces.
+        """
+        with stage("decode"):
+            if atlas is None:
+                pieces_path = get_dict_available_pieces()[pieces_design]
+                board_path = get_dict_available_boards()[board_design]
+                board = board_pyramid.get(board_design, square_size, board_path)
+                square_size = board.width // 8
+                # tiles are keyed on the files of the designs
+                tile_source = (board_path, pieces_path)
+            else:
+                # on the atlas itself, not its path: the file may be rebuilt and reopened. Closing it evicts its tiles
+                tile_source = (atlas, None)
+                square_size = square_size or atlas.native_square_size
+                board = atlas.board(square_size)
+
+        squares = self.squares()
+        with stage("sprites"):
+            if backend == "numpy":
+                if atlas is None:
+                    sprites = numpy_backend.sprite_stack(pieces_design, square_size, pieces_path)
+                else:
+                    sprites = atlas.piece_stack(square_size)
+            elif atlas is None:
+                sprites = {char: sprite_store.get_piece(pieces_design, char, square_size, pieces_path) for char in set(squares) - {"."}}
+            else:
+                sprites = {char: atlas.piece(char, square_size) for char in set(squares) - {"."}}
+            frame = sprite_store.get_frame(self.color_turn, square_size) if atlas is None else atlas.frame(self.color_turn, square_size)
+            under = [(highlight.index, highlight.layer(square_size)) for highlight in highlights]
+            over = [arrow.layer(square_size) for arrow in arrows]
+
+        with stage("composite"):
+            if backend == "numpy":
+                new_frame = new_canvas(numpy_backend.composite(board, self._board, sprites, square_size, under), square_size)
+            elif backend == "tiles":
+                new_frame = new_canvas(board, square_size)
+                paste_highlights(new_frame, under, square_size)
+                # the tiles of pieces overlapping a highlight hold the board without it, those pieces are blended instead
+                highlighted = {index for index, _ in under} | {index + 1 for index, _ in under if index % 8 != 7}
+                for index, char in enumerate(squares):
+                    if char == ".":
+                        continue
+                    if index in highlighted:
+                        piece = sprites[char]
+                        new_frame.paste(piece, piece_position(index, square_size), piece)
+                    else:
+                        tile = tile_store.get(
+                            (*tile_source, square_size, index, char),
+                            lambda: compose_tile(board, sprites[char], index, square_size)
+                        )
+                        # a tile holds the board under the piece, it is copied without blending
+                        new_frame.paste(tile, piece_position(index, square_size))
+            else:
+                new_frame = new_canvas(board, square_size)
+                paste_highlights(new_frame, under, square_size)
+                for index, char in enumerate(squares):
+                    if char != ".":
+                        piece = sprites[char]
+                        new_frame.paste(piece, piece_position(index, square_size), piece)
+            for layer, position in over:
+                paste_overlay(new_frame, layer, position)
+
+        with stage("frame"):
+            new_frame.paste(frame, frame_position(board.size, square_size))
+        return new_frame
 
     def _verify_designs(self, pieces_design: str, board_design: str) -> None:
         """
@@ -80,4 +320,93 @@ class BoardRepresentation:
             raise ValueError(f"Pieces design '{pieces_design}' is not available. Available designs are: {get_list_available_pieces()}")
 
         if board_design not in get_list_available_boards():
-            raise ValueError(f"Board design '{board_design}' is not available. Available designs are: {get_list_available_boards()}")
\ No newline at end of file
+            raise ValueError(f"Board design '{board_design}' is not available. Available designs are: {get_list_available_boards()}")
+
+
+def new_canvas(board: Image, square_size: int) -> Image:
+    """
+    Create the output image, the board on the left and room for the turn indicator on its right.
+
+    :param board: the RGBA board.
+    :param square_size: the size of a square of the board in pixels.
+    :return: a transparent RGBA image holding the board.
+    """
+    from PIL import Image
+
+    width, height = board.size
+    frame_size = square_size // 2
+    canvas = Image.new("RGBA", (width + frame_size + square_size // 4, height + frame_size))
+    canvas.paste(board, (0, 0))
+    return canvas
+
+
+def paste_highlights(canvas: Image, highlights: Sequence[Tuple[int, Image]], square_size: int) -> None:
+    """
+    Blend highlights on their square, before the pieces are pasted.
+
+    :param canvas: the RGBA image holding the board, modified in place.
+    :param highlights: (square index, RGBA layer) pairs.
+    :param square_size: the size of a square of the board in pixels.
+    """
+    for index, layer in highlights:
+        row, col = divmod(index, 8)
+        paste_overlay(canvas, layer, (col * square_size, row * square_size))
+
+
+def paste_overlay(canvas: Image, layer: Image, position: Tuple[int, int]) -> None:
+    """
+    Blend the color of a translucent overlay onto the canvas, keeping the alpha of the canvas.
+
+    Pasting the layer with itself as the mask would blend its alpha too, and leave the board translucent under it.
+
+    :param canvas: the RGBA image drawn on, modified in place.
+    :param layer: the RGBA overlay, its alpha channel is the mask.
+    :param position: the (x, y) position of the top-left corner of the layer on the canvas.
+    """
+    x, y = position
+    region = canvas.crop((x, y, x + layer.width, y + layer.height))
+    alpha = region.getchannel("A")
+    region.paste(layer, (0, 0), layer)
+    region.putalpha(alpha)
+    canvas.paste(region, position)
+
+
+def piece_position(index: int, square_size: int) -> Tuple[int, int]:
+    """
+    Get where a piece is pasted. Pieces are drawn one pixel to the left of their square.
+
+    :param index: the index of the square, 0 for a8 and 63 for h1.
+    :param square_size: the size of a square of the board in pixels.
+    :return: the (x, y) position of the top-left corner of the piece.
+    """
+    index_row, index_col = divmod(index, 8)
+    return (index_col * square_size) - 1, index_row * square_size
+
+
+def compose_tile(board: Image, sprite: Image, index: int, square_size: int) -> Image:
+    """
+    Blend a piece onto the part of the board it covers, the same way a render pastes it.
+
+    :param board: the RGBA board.
+    :param sprite: the RGBA sprite of the piece.
+    :param index: the index of the square, 0 for a8 and 63 for h1.
+    :param square_size: the size of a square of the board in pixels.
+    :return: the RGBA tile, to paste at piece_position(index, square_size).
+    """
+    x, y = piece_position(index, square_size)
+    tile = board.crop((x, y, x + square_size, y + square_size))
+    tile.paste(sprite, (0, 0), sprite)
+    return tile
+
+
+def frame_position(board_size: Tuple[int, int], square_size: int) -> Tuple[int, int]:
+    """
+    Get where the turn indicator is pasted, next to the bottom-right corner of the board.
+
+    :param board_size: the (width, height) of the board.
+    :param square_size: the size of a square of the board in pixels.
+    :return: the (x, y) position of the top-left corner of the turn indicator.
+    """
+    width, height = board_size
+    frame_size = square_size // 2
+    return width + square_size // 4, height - frame_size - square_size // 4
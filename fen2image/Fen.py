@@ -1,4 +1,10 @@
-from .BoardRepresentation import BoardRepresentation
+import re
+from typing import List, Optional
+
+from .BoardRepresentation import BoardRepresentation, expand_empty_squares
+
+# 8 ranks of 8 squares, once the empty squares are expanded
+_EXPANDED_PLACEMENT = re.compile(r"(?:[rnbqkpRNBQKP.]{8}/){7}[rnbqkpRNBQKP.]{8}")
 
 
 class Fen:
@@ -11,6 +17,8 @@ class Fen:
         """
         self.fen = fen
         self.verified = False
+        self._fields: Optional[List[str]] = None
+        self._board: Optional[bytes] = None
 
     def __str__(self) -> str:
         """
@@ -35,68 +43,65 @@ class Fen:
         if not self.verified:
             self.verify()
 
-        split_fen = self.fen.split(" ")
-
-        board = []
-        rows = split_fen[0].split('/')
-        for row in rows:
-            board_row = []
-            for char in row:
-                if char.isdigit():
-                    board_row.extend(['.'] * int(char))
-                else:
-                    board_row.append(char)
-            board.append(board_row)
-
-        color_turn = split_fen[1]
-        castling_rights = split_fen[2]
-        en_passant = split_fen[3]
-        half_move_count = int(split_fen[4])
-        full_move_count = int(split_fen[5])
-
+        fields = self._fields
         return BoardRepresentation(
-            board,
-            color_turn,
-            castling_rights,
-            en_passant,
-            half_move_count,
-            full_move_count)
+            self._board,
+            fields[1],
+            fields[2],
+            fields[3],
+            int(fields[4]),
+            int(fields[5]))
 
-    def verify(self) -> None:
+    def verify(self, semantic: bool = False) -> None:
         """
         Verifies the FEN string.
+        The string is split once, and the placement is checked and parsed in the same pass.
 
+        :param semantic: also check that the position could occur in a game (see check_position).
+            Diagrams such as an empty board are rejected then.
         :return: None if all checks passed, raise an error otherwise
         """
+        split_fen = self.fen.split(" ")
+        self._check_fen_structure(split_fen)
 
-        self._check_fen_structure()
-        split_fen = self.fen.split(' ')
-
-        self._check_first_field(split_fen[0])
+        board = self._check_first_field(split_fen[0])
         self._check_second_field(split_fen[1])
         self._check_third_field(split_fen[2])
         self._check_fourth_field(split_fen[3])
         self._check_fifth_field(split_fen[4])
         self._check_sixth_field(split_fen[5])
+        if semantic:
+            check_position(board)
 
+        self._fields = split_fen
+        self._board = board
         self.verified = True
 
-    def _check_fen_structure(self) -> None:
+    def _check_fen_structure(self, split_fen: Optional[List[str]] = None) -> None:
         """
         Checks the number of fields in the FEN string. A correct FEN must have 6 fields separated by a white space.
 
+        :param split_fen: the fields of the FEN string, split from it if not given.
         :return: None if the number of fields is correct, raise an error otherwise.
         """
-        split_fen = self.fen.split(" ")
+        if split_fen is None:
+            split_fen = self.fen.split(" ")
         if len(split_fen) != 6:
             raise ValueError(f"Invalid FEN: Incorrect number of fields. Expected 6, got {len(split_fen)}.")
 
-    def _check_first_field(self, first_field: str) -> None:
+    def _check_first_field(self, first_field: str) -> bytes:
         """
-        Checks the first field of the FEN string. The first field must contain 8 ranks separated by a "/" character.
+        Checks the first field of the FEN string. The first field must contain 8 ranks of 8 squares separated by a "/" character.
 
-        :return: None if the first field is correct, raise an error otherwise.
+        :return: the 64 squares of the board, from a8 to h1, if the first field is correct, raise an error otherwise.
         """
+        # "." stands for an empty square once expanded, but is not allowed in the FEN itself
+        if "." not in first_field:
+            expanded = expand_empty_squares(first_field)
+            if _EXPANDED_PLACEMENT.fullmatch(expanded):
+                return expanded.replace("/", "").encode("ascii")
+
+        # invalid placement, find out why
         ranks = first_field.split("/")
         if len(ranks) != 8:
             raise ValueError(f"Invalid FEN: Incorrect number of ranks. Expected 8, got {len(ranks)}. Field: {first_field}")
@@ -104,7 +109,11 @@ class Fen:
         for char in first_field:
             if char not in correct_characters:
                 raise ValueError(f"Invalid FEN: Incorrect characters in rank. Expected characters from {correct_characters}, got {char}")
-
+        for rank in ranks:
+            squares = len(expand_empty_squares(rank))
+            if squares != 8:
+                raise ValueError(f"Invalid FEN: Incorrect number of squares in rank. Expected 8, got {squares}. Rank: {rank}")
+        raise ValueError(f"Invalid FEN: Incorrect piece placement. Field: {first_field}")
 
     def _check_second_field(self, second_field: str) -> None:
         """
@@ -161,4 +170,19 @@ class Fen:
         :return: None if the sixth field is correct, raise an error otherwise.
         """
         if not sixth_field.isdigit() or int(sixth_field) < 1:
-            raise ValueError(f"Invalid FEN: Incorrect full-move number. Expected a digit superior to 0, got {sixth_field}")
\ No newline at end of file
+            raise ValueError(f"Invalid FEN: Incorrect full-move number. Expected a digit superior to 0, got {sixth_field}")
+
+
+def check_position(board: bytes) -> None:
+    """
+    Checks that a piece placement could occur in a game: one king per side and no pawn on the first or last rank.
+
+    :param board: the 64 squares, from a8 to h1, a piece letter or "." for an empty square.
+    :return: None if the placement is plausible, raise an error otherwise.
+    """
+    white_kings, black_kings = board.count(b"K"), board.count(b"k")
+    if white_kings != 1 or black_kings != 1:
+        raise ValueError(f"Invalid FEN: Incorrect number of kings. Expected one king per side, got {white_kings} white and {black_kings} black")
+    for rank in (board[:8], board[56:]):
+        if b"P" in rank or b"p" in rank:
+            raise ValueError(f"Invalid FEN: Pawns on the first or last rank. Rank: {rank.decode('ascii')}")
@@ -0,0 +1,160 @@
+from __future__ import annotations
+
+import random
+from typing import Iterable, Iterator, Optional, Tuple, Union, TYPE_CHECKING
+
+from .BoardPyramid import board_pyramid
+from .BoardRepresentation import BoardRepresentation, new_canvas, piece_position, frame_position
+from .Fen import Fen
+from .SpriteStore import sprite_store
+from .utils import get_list_available_boards, get_dict_available_boards, get_dict_available_pieces
+
+if TYPE_CHECKING:
+    from PIL import Image
+
+Position = Union[str, Fen, BoardRepresentation]
+
+
+class GameRenderer:
+    """
+    Render the successive positions of a game, repainting only what changed between them.
+
+    The first position is drawn in full. For the next ones, the squares whose content changed
+    are restored from the empty board and their new piece is pasted, and the turn indicator is
+    redrawn only when the side to move changes. A move touches 2 to 4 squares, so the cost of a
+    frame no longer depends on the number of pieces on the board.
+    The images are identical to those of BoardRepresentation.create_image.
+    After each update, dirty_box holds the (left, upper, right, lower) area of the image that
+    changed, or None if the position did not change anything.
+    """
+
+    def __init__(
+        self,
+        pieces_design: str = "classic",
+        board_design: str = "random",
+        copy: bool = True,
+        size: Optional[int] = None
+    ) -> None:
+        """
+        Initializes the renderer.
+
+        :param pieces_design: the design of the pieces.
+        :param board_design: the design of the board. "random" picks one design for the whole game.
+        :param copy: return a copy of each frame. Without a copy, the returned image is the canvas itself
+            and is modified by the next call to update().
+        :param size: the width of the board in pixels, see BoardRepresentation.create_image. None for the native size.
+        """
+        if size is not None and size < 16:
+            raise ValueError(f"Size must be superior or equal to 16, got {size}")
+        self.pieces_design = pieces_design
+        self.board_design = board_design
+        self.copy = copy
+        self.size = size
+        self._canvas: Optional[Image.Image] = None
+        self._background: Optional[Image.Image] = None
+        self._squares: Optional[str] = None
+        self._color_turn: Optional[str] = None
+        self._square_size = 0
+        self._pieces_path = None
+        self.dirty_box: Optional[Tuple[int, int, int, int]] = None
+
+    @property
+    def square_size(self) -> int:
+        """
+        The size of a square in pixels, 0 until the first position is rendered.
+        """
+        return self._square_size
+
+    def render(self, positions: Iterable[Position]) -> Iterator[Image.Image]:
+        """
+        Render a sequence of positions.
+
+        :param positions: FEN strings, Fen objects or BoardRepresentation objects, in game order.
+        :return: a generator of images, one per position.
+        """
+        for position in positions:
+            yield self.update(position)
+
+    def update(self, position: Position) -> Image.Image:
+        """
+        Render the next position of the game.
+
+        :param position: a FEN string, a Fen object or a BoardRepresentation.
+        :return: the image of the position.
+        """
+        board = _to_board_representation(position)
+        squares = board.squares()
+        self.dirty_box = None
+
+        if self._canvas is None:
+            self._start(board, squares)
+        else:
+            for index, (previous, current) in enumerate(zip(self._squares, squares)):
+                if previous != current:
+                    self._repaint(index, current)
+            if board.color_turn != self._color_turn:
+                self._paste_frame(board.color_turn)
+
+        self._squares = squares
+        self._color_turn = board.color_turn
+        return self._canvas.copy() if self.copy else self._canvas
+
+    def reset(self) -> None:
+        """
+        Forget the previous position, the next one is drawn in full.
+        """
+        self._canvas = None
+        self._squares = None
+        self._color_turn = None
+
+    def _start(self, board: BoardRepresentation, squares: str) -> None:
+        if self.board_design == "random":
+            self.board_design = random.choice(get_list_available_boards())
+        board._verify_designs(self.pieces_design, self.board_design)
+        self._pieces_path = get_dict_available_pieces()[self.pieces_design]
+
+        square_size = None if self.size is None else self.size // 8
+        self._background = board_pyramid.get(self.board_design, square_size, get_dict_available_boards()[self.board_design])
+        self._square_size = self._background.width // 8
+        self._canvas = new_canvas(self._background, self._square_size)
+        self.dirty_box = (0, 0) + self._canvas.size
+        for index, char in enumerate(squares):
+            if char != ".":
+                self._paste_piece(index, char)
+        self._paste_frame(board.color_turn)
+
+    def _repaint(self, index: int, char: str) -> None:
+        # each piece covers its square shifted one pixel to the left, so restoring that area
+        # from the empty board erases the old piece without touching the neighbouring ones
+        x, y = piece_position(index, self._square_size)
+        box = (x, y, x + self._square_size, y + self._square_size)
+        self._canvas.paste(self._background.crop(box), (x, y))
+        self._touch(box)
+        if char != ".":
+            self._paste_piece(index, char)
+
+    def _paste_piece(self, index: int, char: str) -> None:
+        piece = sprite_store.get_piece(self.pieces_design, char, self._square_size, self._pieces_path)
+        self._canvas.paste(piece, piece_position(index, self._square_size), piece)
+
+    def _paste_frame(self, color_turn: str) -> None:
+        frame = sprite_store.get_frame(color_turn, self._square_size)
+        x, y = frame_position(self._background.size, self._square_size)
+        self._canvas.paste(frame, (x, y))
+        self._touch((x, y, x + frame.width, y + frame.height))
+
+    def _touch(self, box: Tuple[int, int, int, int]) -> None:
+        width, height = self._canvas.size
+        box = (max(box[0], 0), max(box[1], 0), min(box[2], width), min(box[3], height))
+        if self.dirty_box is not None:
+            box = (min(box[0], self.dirty_box[0]), min(box[1], self.dirty_box[1]),
+                   max(box[2], self.dirty_box[2]), max(box[3], self.dirty_box[3]))
+        self.dirty_box = box
+
+
+def _to_board_representation(position: Position) -> BoardRepresentation:
+    if isinstance(position, BoardRepresentation):
+        return position
+    if isinstance(position, str):
+        position = Fen(position)
+    return position.to_board_representation()
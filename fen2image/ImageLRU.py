@@ -0,0 +1,105 @@
+from __future__ import annotations
+
+import threading
+from collections import OrderedDict
+from typing import Callable, Dict, Hashable, Optional, TYPE_CHECKING
+
+from .instrumentation import increment
+
+if TYPE_CHECKING:
+    from PIL import Image
+
+
+class ImageLRU:
+    """
+    Bounded LRU store of images, sized by their pixels.
+
+    Every image is counted as width * height * 4 bytes, the least recently used ones are evicted beyond
+    max_bytes. The image just stored is always kept, even if it exceeds the budget alone.
+    Subclasses name their counters, reported as "<counter>.hits" and "<counter>.misses".
+    """
+
+    # the prefix of the counters sent to fen2image.instrumentation
+    counter = "image_lru"
+
+    def __init__(self, max_bytes: int) -> None:
+        """
+        Initializes an empty store.
+
+        :param max_bytes: the maximum memory used by the images, the least recently used are evicted beyond it.
+        """
+        if max_bytes < 1:
+            raise ValueError(f"max_bytes must be superior or equal to 1, got {max_bytes}")
+        self.max_bytes = max_bytes
+        self._images: "OrderedDict[Hashable, Image.Image]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self) -> int:
+        return len(self._images)
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Get the usage statistics of the store.
+
+        :return: a dictionary with the hits, misses, evictions, number of images and bytes used.
+        """
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "size": len(self._images),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+            }
+
+    def clear(self) -> None:
+        """
+        Remove every image and reset the statistics.
+        """
+        with self._lock:
+            self._images.clear()
+            self._bytes = 0
+            self.hits = self.misses = self.evictions = 0
+
+    def discard(self, predicate: Callable[[Hashable], bool]) -> int:
+        """
+        Remove the images whose key matches.
+
+        :param predicate: called with each key, True to remove its image.
+        :return: the number of images removed.
+        """
+        with self._lock:
+            keys = [key for key in self._images if predicate(key)]
+            for key in keys:
+                image = self._images.pop(key)
+                self._bytes -= image.width * image.height * 4
+        return len(keys)
+
+    def _lookup(self, key: Hashable) -> Optional[Image.Image]:
+        with self._lock:
+            image = self._images.get(key)
+            if image is not None:
+                self._images.move_to_end(key)
+                self.hits += 1
+            else:
+                self.misses += 1
+        increment(f"{self.counter}.hits" if image is not None else f"{self.counter}.misses")
+        return image
+
+    def _store(self, key: Hashable, image: Image.Image) -> Image.Image:
+        with self._lock:
+            # a concurrent miss on the same key keeps the image stored first
+            if key not in self._images:
+                self._images[key] = image
+                self._bytes += image.width * image.height * 4
+            self._images.move_to_end(key)
+            while self._bytes > self.max_bytes and len(self._images) > 1:
+                _, evicted = self._images.popitem(last=False)
+                self._bytes -= evicted.width * evicted.height * 4
+                self.evictions += 1
+            return self._images[key]
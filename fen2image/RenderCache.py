@@ -0,0 +1,233 @@
+from __future__ import annotations
+
+import hashlib
+import io
+import os
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, Optional, Sequence, Union, TYPE_CHECKING
+
+from .instrumentation import increment
+
+if TYPE_CHECKING:
+    from PIL import Image
+
+CacheValue = Union["Image.Image", bytes]
+# the share of max_disk_bytes left after an eviction, so that the next puts do not each scan the directory again
+_DISK_LOW_WATER = 0.9
+
+
+class RenderCache:
+    """
+    Cache of rendered boards, addressed by the content of the position.
+
+    Only the piece placement and the side to move change the pixels of a render, so the castling,
+    en passant and move counter fields are left out of the key. The first tier is an in-memory LRU;
+    an optional second tier stores the renders on disk under their key, with a size cap.
+    Images are stored on disk as PNG, encoded bytes as they are.
+    """
+
+    def __init__(self, max_entries: int = 1024, directory: Optional[Union[str, Path]] = None, max_disk_bytes: int = 256 * 1024 * 1024) -> None:
+        """
+        Initializes the cache.
+
+        :param max_entries: the maximum number of renders kept in memory.
+        :param directory: the directory of the on-disk tier, no disk tier if None.
+        :param max_disk_bytes: the maximum total size of the on-disk tier. Beyond it, the least recently used files
+            are removed until the tier is back under 90 % of it.
+        """
+        if max_entries < 1:
+            raise ValueError(f"max_entries must be superior or equal to 1, got {max_entries}")
+        self.max_entries = max_entries
+        self.directory = Path(directory) if directory is not None else None
+        self.max_disk_bytes = max_disk_bytes
+        self._memory: "OrderedDict[str, CacheValue]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._disk_bytes = 0
+        if self.directory is not None:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            self._disk_bytes = sum(path.stat().st_size for path in self._disk_files())
+
+    @staticmethod
+    def make_key(
+        placement: str,
+        color_turn: str,
+        board_design: str,
+        pieces_design: str,
+        size: Optional[int] = None,
+        format: Optional[str] = None,
+        overlays: Sequence = (),
+        board_path: Optional[Path] = None,
+        pieces_path: Optional[Path] = None
+    ) -> str:
+        """
+        Build the key of a render.
+
+        :param placement: the piece placement field of the FEN, normalized.
+        :param color_turn: the color to move, "w" or "b".
+        :param board_design: the resolved design of the board, never "random".
+        :param pieces_design: the design of the pieces.
+        :param size: the requested size of the render, None for the native size.
+        :param format: the encoding of the cached value, None for an Image.
+        :param overlays: the Highlight and Arrow objects drawn on the render.
+        :param board_path: the image file of the board design. With the pieces directory, it keeps apart the
+            renders of a design overridden by a registered asset directory.
+        :param pieces_path: the directory of the pieces design.
+        :return: the key, a hexadecimal digest.
+        """
+        fields = (placement, color_turn, board_design, pieces_design, str(size), str(format).upper())
+        if overlays:
+            # renders without overlays keep the keys of earlier versions
+            fields += (repr(tuple(overlays)),)
+        if board_path is not None or pieces_path is not None:
+            fields += (str(board_path), str(pieces_path))
+        return hashlib.sha256("\0".join(fields).encode()).hexdigest()
+
+    def get(self, key: str) -> Optional[CacheValue]:
+        """
+        Get a render.
+
+        :param key: the key built by make_key.
+        :return: a copy of the cached Image, the cached bytes, or None on a miss.
+        """
+        with self._lock:
+            value = self._memory.get(key)
+            if value is not None:
+                self._memory.move_to_end(key)
+                self.hits += 1
+                increment("render_cache.hits")
+                return _copy(value)
+
+        value = self._read_disk(key)
+        with self._lock:
+            if value is None:
+                self.misses += 1
+            else:
+                self.disk_hits += 1
+                self._remember(key, value)
+        if value is None:
+            increment("render_cache.misses")
+            return None
+        increment("render_cache.disk_hits")
+        return _copy(value)
+
+    def put(self, key: str, value: CacheValue) -> None:
+        """
+        Store a render.
+
+        :param key: the key built by make_key.
+        :param value: the rendered Image, or its encoded bytes. A copy of an Image is stored.
+        """
+        value = _copy(value)
+        with self._lock:
+            self._remember(key, value)
+        if self.directory is not None:
+            self._write_disk(key, value)
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Get the usage statistics of the cache.
+
+        :return: a dictionary with the memory hits, disk hits, misses, evictions and the size of both tiers.
+        """
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "size": len(self._memory),
+                "max_entries": self.max_entries,
+                "disk_bytes": self._disk_bytes,
+            }
+
+    def clear(self) -> None:
+        """
+        Empty both tiers and reset the statistics.
+        """
+        with self._lock:
+            self._memory.clear()
+            self.hits = self.disk_hits = self.misses = self.evictions = 0
+            for path in self._disk_files():
+                path.unlink()
+            self._disk_bytes = 0
+
+    def _remember(self, key: str, value: CacheValue) -> None:
+        self._memory[key] = value
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+            self.evictions += 1
+
+    def _disk_files(self):
+        if self.directory is None:
+            return []
+        return [path for path in self.directory.iterdir() if path.suffix in (".png", ".bin")]
+
+    def _read_disk(self, key: str) -> Optional[CacheValue]:
+        if self.directory is None:
+            return None
+        from PIL import Image
+
+        for suffix in (".png", ".bin"):
+            path = self.directory / (key + suffix)
+            try:
+                data = path.read_bytes()
+            except FileNotFoundError:
+                continue
+            # the modification time orders the eviction, refresh it on every hit
+            os.utime(path)
+            if suffix == ".bin":
+                return data
+            with Image.open(io.BytesIO(data)) as image:
+                return image.convert("RGBA")
+        return None
+
+    def _write_disk(self, key: str, value: CacheValue) -> None:
+        if isinstance(value, bytes):
+            path, data = self.directory / (key + ".bin"), value
+        else:
+            buffer = io.BytesIO()
+            value.save(buffer, format="PNG", compress_level=1)
+            path, data = self.directory / (key + ".png"), buffer.getvalue()
+        if len(data) > self.max_disk_bytes:
+            return
+
+        # write then rename, so concurrent readers never see a partial file
+        temporary = path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        temporary.write_bytes(data)
+        previous = path.stat().st_size if path.exists() else 0
+        os.replace(temporary, path)
+        with self._lock:
+            self._disk_bytes += len(data) - previous
+            if self._disk_bytes > self.max_disk_bytes:
+                self._evict_disk()
+
+    def _evict_disk(self) -> None:
+        files = []
+        for path in self._disk_files():
+            try:
+                files.append((path.stat().st_mtime, path))
+            except FileNotFoundError:
+                pass
+        files.sort()
+        self._disk_bytes = sum(path.stat().st_size for _, path in files if path.exists())
+        low_water = self.max_disk_bytes * _DISK_LOW_WATER
+        for _, path in files:
+            if self._disk_bytes <= low_water:
+                break
+            try:
+                size = path.stat().st_size
+                path.unlink()
+            except FileNotFoundError:
+                continue
+            self._disk_bytes -= size
+
+
+def _copy(value: CacheValue) -> CacheValue:
+    return value if isinstance(value, bytes) else value.copy()
@@ -0,0 +1,131 @@
+from __future__ import annotations
+
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Callable, Dict, Hashable, Optional, TYPE_CHECKING
+
+from .constants import piece_to_filename, PATH_OTHER
+from .instrumentation import increment
+from .utils import get_dict_available_pieces
+
+if TYPE_CHECKING:
+    from PIL import Image
+
+
+class SpriteStore:
+    """
+    Bounded LRU store of decoded and resized sprites.
+
+    Sprites are keyed by (directory of the piece set, piece letter, square size), so each sprite is decoded
+    and LANCZOS-resampled once and then reused by every render at the same size. Keying on the directory
+    rather than the name of the design means registering a directory that overrides a design does not
+    serve the old sprites.
+    The turn indicator frames are stored alongside, keyed by (None, frame file, square size).
+    """
+
+    def __init__(self, max_entries: int = 256) -> None:
+        """
+        Initializes an empty store.
+
+        :param max_entries: the maximum number of sprites kept before the least recently used one is evicted.
+        """
+        if max_entries < 1:
+            raise ValueError(f"max_entries must be superior or equal to 1, got {max_entries}")
+        self.max_entries = max_entries
+        self._sprites: "OrderedDict[Hashable, Image.Image]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self) -> int:
+        return len(self._sprites)
+
+    def get_piece(self, pieces_design: str, piece: str, square_size: int, pieces_path: Optional[Path] = None) -> Image.Image:
+        """
+        Get a piece sprite resized to the square size.
+
+        :param pieces_design: the design of the pieces.
+        :param piece: the piece letter, as found in a FEN string.
+        :param square_size: the size of a square of the board in pixels.
+        :param pieces_path: the directory of the pieces design, looked up from its name if not given.
+        :return: the RGBA sprite. It is shared, do not modify it.
+        """
+        if pieces_path is None:
+            pieces_path = get_dict_available_pieces()[pieces_design]
+        return self._get((pieces_path, piece, square_size), lambda: load_resized(pieces_path / piece_to_filename[piece], square_size))
+
+    def get_frame(self, color_turn: str, square_size: int) -> Image.Image:
+        """
+        Get the turn indicator frame, sized to half a square.
+
+        :param color_turn: the color to move, "w" or "b".
+        :param square_size: the size of a square of the board in pixels.
+        :return: the RGBA frame. It is shared, do not modify it.
+        """
+        frame_name = "wFrame.png" if color_turn == "w" else "bFrame.png"
+        return self._get((None, frame_name, square_size), lambda: load_resized(PATH_OTHER / frame_name, square_size // 2))
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Get the usage statistics of the store.
+
+        :return: a dictionary with the hits, misses, evictions, current size and maximum size.
+        """
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "size": len(self._sprites),
+                "max_entries": self.max_entries,
+            }
+
+    def clear(self) -> None:
+        """
+        Remove every sprite and reset the statistics.
+        """
+        with self._lock:
+            self._sprites.clear()
+            self.hits = self.misses = self.evictions = 0
+
+    def _get(self, key: Hashable, load: Callable[[], Image.Image]) -> Image.Image:
+        with self._lock:
+            sprite = self._sprites.get(key)
+            if sprite is not None:
+                self._sprites.move_to_end(key)
+                self.hits += 1
+                increment("sprite_store.hits")
+                return sprite
+            self.misses += 1
+        increment("sprite_store.misses")
+
+        # decode outside the lock, a concurrent miss on the same key only costs a duplicate load
+        sprite = load()
+
+        with self._lock:
+            self._sprites[key] = sprite
+            self._sprites.move_to_end(key)
+            while len(self._sprites) > self.max_entries:
+                self._sprites.popitem(last=False)
+                self.evictions += 1
+        return sprite
+
+
+def load_resized(path: Path, size: int) -> Image.Image:
+    """
+    Decode a sprite and resize it to a square.
+
+    :param path: the image file of the sprite.
+    :param size: the width and height of the resized sprite in pixels.
+    :return: the RGBA sprite.
+    """
+    from PIL import Image
+
+    with Image.open(path) as image:
+        return image.convert("RGBA").resize((size, size), Image.LANCZOS)
+
+
+# shared by every render of the process
+sprite_store = SpriteStore()
@@ -0,0 +1,50 @@
+from __future__ import annotations
+
+from typing import Callable, Hashable, TYPE_CHECKING
+
+from .ImageLRU import ImageLRU
+
+if TYPE_CHECKING:
+    from PIL import Image
+
+
+class TileStore(ImageLRU):
+    """
+    Bounded LRU store of precomposed tiles, for the "tiles" backend.
+
+    A tile is a piece already blended onto the part of the board it covers. Board textures differ from
+    square to square, so tiles are keyed by (board file, pieces directory, square size, square index, piece):
+    at most 64 * 12 tiles per design and size. Keying on the files rather than the names of the designs
+    means registering a directory that overrides a design does not serve the old tiles. The tiles of an
+    atlas are keyed by (atlas, None, ...) and removed when the atlas is closed.
+    With its tiles, a render is one opaque copy per piece and no alpha blending. Tiles are composed on
+    first use, the least recently used ones are evicted beyond max_bytes of pixels.
+    """
+
+    counter = "tile_store"
+
+    def __init__(self, max_bytes: int = 64 * 1024 * 1024) -> None:
+        """
+        Initializes an empty store.
+
+        :param max_bytes: the maximum memory used by the tiles, the least recently used are evicted beyond it.
+        """
+        super().__init__(max_bytes)
+
+    def get(self, key: Hashable, compose: Callable[[], Image.Image]) -> Image.Image:
+        """
+        Get a tile, composing it on a miss.
+
+        :param key: (board file, pieces directory, square size, square index, piece), or (atlas, None, ...).
+        :param compose: builds the tile.
+        :return: the RGBA tile. It is shared, do not modify it.
+        """
+        tile = self._lookup(key)
+        if tile is not None:
+            return tile
+        # composed outside the lock, a concurrent miss on the same key only costs a duplicate tile
+        return self._store(key, compose())
+
+
+# shared by every render of the process
+tile_store = TileStore()
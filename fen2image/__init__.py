@@ -1 +1,43 @@
-from .core import fen2image
\ No newline at end of file
+import importlib
+
+# named like their module: importing the module would shadow a lazy export, they are imported now
+from .RenderCache import RenderCache
+from .GameRenderer import GameRenderer
+
+# the other public names and the module defining them. They are imported on first access, so that
+# "import fen2image" stays cheap and Pillow, asyncio and multiprocessing are loaded only when used.
+_EXPORTS = {
+    "fen2image": ".core",
+    "fen2bytes": ".core",
+    "fen2images": ".core",
+    "RenderResult": ".core",
+    "fen2image_async": ".aio",
+    "AsyncRenderer": ".aio",
+    "register_asset_directory": ".utils",
+    "refresh_assets": ".utils",
+    "BackgroundWriter": ".sinks",
+    "BytesSink": ".sinks",
+    "FileSink": ".sinks",
+    "save_animation": ".animation",
+    "MetricsCollector": ".instrumentation",
+    "instrument": ".instrumentation",
+    "Encoding": ".encoding",
+    "preload": ".warmup",
+    "Highlight": ".overlays",
+    "Arrow": ".overlays",
+}
+
+__all__ = ["RenderCache", "GameRenderer"] + list(_EXPORTS)
+
+
+def __getattr__(name: str):
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module, __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_EXPORTS))
@@ -0,0 +1,133 @@
+import asyncio
+import os
+import weakref
+from concurrent.futures import Executor, ThreadPoolExecutor
+from typing import Optional, Union
+
+from PIL import Image
+
+from .core import fen2bytes, fen2image
+from .encoding import Encoding
+
+
+class AsyncRenderer:
+    """
+    Render FEN strings from asyncio code without blocking the event loop.
+
+    The rendering runs fen2image, or fen2bytes when an encoding is given, on an executor.
+    At most max_concurrency renders run at once, further calls wait for a slot. A slot is only given back once its render has really finished,
+    so cancelled or timed out calls still count until the worker is done with them.
+    """
+
+    def __init__(self, max_concurrency: Optional[int] = None, executor: Optional[Executor] = None) -> None:
+        """
+        Initializes the renderer.
+
+        :param max_concurrency: the maximum number of renders running at once, the number of CPUs by default.
+        :param executor: the executor running the renders, a thread pool of max_concurrency threads by default.
+            An executor given here is not shut down by close().
+        """
+        if max_concurrency is None:
+            max_concurrency = os.cpu_count() or 1
+        if max_concurrency < 1:
+            raise ValueError(f"max_concurrency must be superior or equal to 1, got {max_concurrency}")
+        self.max_concurrency = max_concurrency
+        self._owns_executor = executor is None
+        self._executor = executor if executor is not None else ThreadPoolExecutor(max_concurrency, thread_name_prefix="fen2image")
+        self._semaphores: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Semaphore]" = weakref.WeakKeyDictionary()
+
+    async def __aenter__(self) -> "AsyncRenderer":
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        self.close()
+
+    async def render(
+        self,
+        fen: str,
+        board_design: str = "random",
+        timeout: Optional[float] = None,
+        encoding: Optional[Union[str, Encoding]] = None,
+        **options
+    ) -> Union[Image.Image, bytes]:
+        """
+        Convert a FEN string to an image.
+
+        :param fen: the FEN string.
+        :param board_design: the design of the board as a string.
+        :param timeout: the maximum number of seconds to wait, including the wait for a free slot.
+            asyncio.TimeoutError is raised when it expires.
+        :param encoding: an Encoding or a preset name such as "png-fast": the image is then encoded on the
+            executor and its bytes are returned, as fen2bytes does.
+        :param options: the other keyword arguments of fen2image (size, overlays, backend, cache, return_type...),
+            or of fen2bytes when an encoding is given.
+        :return: the image, the same as fen2image would return, or the bytes of fen2bytes.
+        """
+        return await asyncio.wait_for(self._render(fen, board_design, encoding, options), timeout)
+
+    def close(self) -> None:
+        """
+        Shut down the executor created by the renderer, waiting for the running renders.
+        """
+        if self._owns_executor:
+            self._executor.shutdown(wait=True)
+
+    async def _render(self, fen: str, board_design: str, encoding: Optional[Union[str, Encoding]], options: dict) -> Union[Image.Image, bytes]:
+        loop = asyncio.get_running_loop()
+        semaphore = self._semaphore(loop)
+        await semaphore.acquire()
+        try:
+            if encoding is None:
+                future = self._executor.submit(fen2image, fen, board_design, **options)
+            else:
+                future = self._executor.submit(fen2bytes, fen, board_design, encoding=encoding, **options)
+        except BaseException:
+            semaphore.release()
+            raise
+
+        def release(_) -> None:
+            try:
+                loop.call_soon_threadsafe(semaphore.release)
+            except RuntimeError:  # the loop is closed, nobody is waiting on the semaphore anymore
+                pass
+
+        future.add_done_callback(release)
+        # cancelling the wrapper also cancels the render if it has not started yet
+        return await asyncio.wrap_future(future)
+
+    def _semaphore(self, loop: asyncio.AbstractEventLoop) -> asyncio.Semaphore:
+        semaphore = self._semaphores.get(loop)
+        if semaphore is None:
+            semaphore = self._semaphores[loop] = asyncio.Semaphore(self.max_concurrency)
+        return semaphore
+
+
+_default_renderer: Optional[AsyncRenderer] = None
+
+
+async def fen2image_async(
+    fen: str,
+    board_design: str = "random",
+    timeout: Optional[float] = None,
+    encoding: Optional[Union[str, Encoding]] = None,
+    **options
+) -> Union[Image.Image, bytes]:
+    """
+    Convert a FEN string to an image without blocking the event loop.
+
+    The renders of every caller share a default AsyncRenderer, limited to one render per CPU.
+    Create an AsyncRenderer to choose the concurrency or the executor.
+
+    :param:
+        fen: the FEN string
+        board_design: the design of the board as a string
+        timeout: the maximum number of seconds to wait, asyncio.TimeoutError is raised when it expires
+        encoding: an Encoding or a preset name, the encoded bytes are then returned (see fen2bytes)
+        options: the other keyword arguments of fen2image, e.g. size=256 or overlays=[...],
+            or of fen2bytes when an encoding is given
+    :return: the image, or its encoded bytes
+    """
+    global _default_renderer
+    if _default_renderer is None:
+        _default_renderer = AsyncRenderer()
+    return await _default_renderer.render(fen, board_design, timeout, encoding, **options)
@@ -0,0 +1,198 @@
+import io
+import struct
+import zlib
+from pathlib import Path
+from typing import Any, BinaryIO, Iterable, Iterator, Optional, Tuple, Union
+
+from PIL import GifImagePlugin, Image
+
+from .GameRenderer import GameRenderer, Position
+from .SpriteStore import sprite_store
+
+_FORMATS = {".gif": "GIF", ".png": "APNG", ".apng": "APNG", ".webp": "WEBP"}
+
+
+def save_animation(
+    positions: Iterable[Position],
+    fp: Union[str, Path, BinaryIO],
+    format: Optional[str] = None,
+    duration: int = 500,
+    loop: int = 0,
+    pieces_design: str = "classic",
+    board_design: str = "random",
+    palette: str = "shared",
+    background: Tuple[int, int, int] = (255, 255, 255),
+    size: Optional[int] = None,
+    **params: Any
+) -> None:
+    """
+    Write the positions of a game as an animated GIF, APNG or WebP.
+
+    The frames are rendered incrementally by a GameRenderer. GIF and APNG are streamed: each frame
+    is encoded as soon as it is rendered and only the area changed by the move is stored, so the
+    memory used does not grow with the length of the game. Animated WebP is assembled by libwebp,
+    which needs every frame before writing, and finds the changed areas itself.
+
+    :param positions: FEN strings, Fen objects or BoardRepresentation objects, in game order.
+    :param fp: a path or a binary file object open for writing.
+    :param format: "GIF", "APNG" or "WEBP", guessed from the extension of a path by default.
+    :param duration: the display time of each frame in milliseconds.
+    :param loop: the number of times the animation plays, 0 to loop forever.
+    :param pieces_design: the design of the pieces.
+    :param board_design: the design of the board, "random" picks one for the whole game.
+    :param palette: GIF only. "shared" quantizes every frame to one global palette computed from the
+        first frame, "adaptive" gives each changed area its own palette.
+    :param background: GIF only. GIF has no partial transparency, the frames are flattened on this color.
+    :param size: the width of the board in pixels, None for the native size of the board design.
+    :param params: extra options of the encoder: compress_level for APNG, or Pillow's WebP options such as lossless.
+    """
+    if format is None:
+        if not isinstance(fp, (str, Path)):
+            raise ValueError("The format of the animation is required when writing to a file object.")
+        format = _FORMATS.get(Path(fp).suffix.lower())
+        if format is None:
+            raise ValueError(f"Cannot guess the animation format of '{fp}'. Expected one of {sorted(_FORMATS)}")
+    format = format.upper()
+    if format not in ("GIF", "APNG", "WEBP"):
+        raise ValueError(f"Animation format must be 'GIF', 'APNG' or 'WEBP', got {format!r}")
+    if palette not in ("shared", "adaptive"):
+        raise ValueError(f"Palette must be 'shared' or 'adaptive', got {palette!r}")
+
+    frame_count = len(positions) if hasattr(positions, "__len__") else None
+    renderer = GameRenderer(pieces_design, board_design, copy=False, size=size)
+    frames = renderer.render(positions)
+
+    if isinstance(fp, (str, Path)):
+        with open(fp, "wb") as file:
+            _save(format, renderer, frames, file, frame_count, duration, loop, palette, background, params)
+    else:
+        _save(format, renderer, frames, fp, frame_count, duration, loop, palette, background, params)
+
+
+def _save(format, renderer, frames, fp, frame_count, duration, loop, palette, background, params) -> None:
+    if format == "GIF":
+        _save_gif(renderer, frames, fp, duration, loop, palette, background)
+    elif format == "APNG":
+        _save_apng(renderer, frames, fp, frame_count, duration, loop, params.get("compress_level", 6))
+    else:
+        # libwebp needs all the frames at once, copy them out of the shared canvas
+        images = [frame.copy() for frame in frames]
+        if not images:
+            raise ValueError("Cannot write an animation without positions.")
+        images[0].save(fp, format="WEBP", save_all=True, append_images=images[1:], duration=duration, loop=loop, **params)
+
+
+def _deltas(renderer: GameRenderer, frames: Iterator[Image.Image]) -> Iterator[Tuple[Image.Image, Tuple[int, int]]]:
+    """
+    Yield the changed area of each frame with its offset. An unchanged frame yields its top-left pixel.
+    """
+    for frame in frames:
+        box = renderer.dirty_box or (0, 0, 1, 1)
+        yield frame.crop(box), box[:2]
+
+
+def _save_gif(renderer, frames, fp, duration, loop, palette, background) -> None:
+    deltas = _deltas(renderer, frames)
+    first = next(deltas, None)
+    if first is None:
+        raise ValueError("Cannot write an animation without positions.")
+    first_frame = _flatten(first[0], background)
+
+    # the global palette also covers the turn indicator of the side not shown in the first frame
+    source = Image.new("RGB", (first_frame.width, first_frame.height + renderer.square_size), background)
+    source.paste(first_frame, (0, 0))
+    for index, color_turn in enumerate("wb"):
+        indicator = sprite_store.get_frame(color_turn, renderer.square_size)
+        source.paste(_flatten(indicator, background), (index * indicator.width, first_frame.height))
+    palette_image = source.quantize(256, dither=Image.Dither.NONE)
+
+    quantized = first_frame.quantize(palette=palette_image, dither=Image.Dither.NONE)
+    header, _ = GifImagePlugin.getheader(quantized.copy(), info={"loop": loop, "duration": duration})
+    for chunk in header:
+        fp.write(chunk)
+    _write_gif_frame(fp, quantized, (0, 0), duration, False)
+
+    for image, offset in deltas:
+        image = _flatten(image, background)
+        if palette == "shared":
+            _write_gif_frame(fp, image.quantize(palette=palette_image, dither=Image.Dither.NONE), offset, duration, False)
+        else:
+            _write_gif_frame(fp, image.quantize(256, dither=Image.Dither.NONE), offset, duration, True)
+    fp.write(b";")
+
+
+def _write_gif_frame(fp: BinaryIO, image: Image.Image, offset: Tuple[int, int], duration: int, local_palette: bool) -> None:
+    # disposal 1 leaves the frame in place, the next one is drawn over it
+    for chunk in GifImagePlugin.getdata(image, offset, duration=duration, disposal=1, include_color_table=local_palette):
+        fp.write(chunk)
+
+
+def _flatten(image: Image.Image, background: Tuple[int, int, int]) -> Image.Image:
+    flat = Image.new("RGB", image.size, background)
+    flat.paste(image, (0, 0), image)
+    return flat
+
+
+def _save_apng(renderer, frames, fp, frame_count, duration, loop, compress_level) -> None:
+    seekable = fp.seekable() if hasattr(fp, "seekable") else False
+    if frame_count is None and not seekable:
+        raise ValueError("APNG needs the number of frames up front: give a sequence of positions or a seekable file.")
+
+    deltas = _deltas(renderer, frames)
+    first = next(deltas, None)
+    if first is None:
+        raise ValueError("Cannot write an animation without positions.")
+    image, _ = first
+    width, height = image.size
+
+    fp.write(b"\x89PNG\r\n\x1a\n")
+    _write_chunk(fp, b"IHDR", struct.pack(">IIBBBBB", width, height, 8, 6, 0, 0, 0))
+    actl_offset = fp.tell() if seekable else None
+    _write_chunk(fp, b"acTL", struct.pack(">II", frame_count or 0, loop))
+
+    sequence = 0
+    written = 0
+    for index, (image, offset) in enumerate(_chain(first, deltas)):
+        # blend operation 0 replaces the area, dispose operation 0 keeps it for the next frame
+        _write_chunk(fp, b"fcTL", struct.pack(">IIIIIHHBB", sequence, image.width, image.height, offset[0], offset[1], duration, 1000, 0, 0))
+        sequence += 1
+        for data in _idat_payloads(image, compress_level):
+            if index == 0:
+                _write_chunk(fp, b"IDAT", data)
+            else:
+                _write_chunk(fp, b"fdAT", struct.pack(">I", sequence) + data)
+                sequence += 1
+        written += 1
+    _write_chunk(fp, b"IEND", b"")
+
+    if written != frame_count:
+        if not seekable:
+            raise ValueError(f"Expected {frame_count} positions, got {written}.")
+        end = fp.tell()
+        fp.seek(actl_offset)
+        _write_chunk(fp, b"acTL", struct.pack(">II", written, loop))
+        fp.seek(end)
+
+
+def _chain(first, rest):
+    yield first
+    yield from rest
+
+
+def _idat_payloads(image: Image.Image, compress_level: int) -> Iterator[bytes]:
+    """
+    Encode an RGBA image with Pillow's PNG encoder and yield the content of its IDAT chunks.
+    """
+    buffer = io.BytesIO()
+    image.save(buffer, format="PNG", compress_level=compress_level)
+    data = buffer.getvalue()
+    position = 8
+    while position < len(data):
+        length, chunk_type = struct.unpack(">I4s", data[position:position + 8])
+        if chunk_type == b"IDAT":
+            yield data[position + 8:position + 8 + length]
+        position += 12 + length
+
+
+def _write_chunk(fp: BinaryIO, chunk_type: bytes, data: bytes) -> None:
+    fp.write(struct.pack(">I", len(data)) + chunk_type + data + struct.pack(">I", zlib.crc32(chunk_type + data)))
@@ -0,0 +1,227 @@
+import argparse
+import json
+import mmap
+import struct
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Union
+
+from PIL import Image
+
+from .BoardPyramid import board_pyramid
+from .SpriteStore import load_resized
+from .TileStore import tile_store
+from .constants import PATH_OTHER, piece_to_filename
+from .numpy_backend import PIECES
+from .utils import get_dict_available_boards, get_dict_available_pieces
+
+MAGIC = b"F2IATLAS"
+VERSION = 1
+# the square sizes compiled by default, on top of the native square size of the board
+STANDARD_SQUARE_SIZES = (32, 48, 64, 96, 128)
+_ALIGNMENT = 64
+_PREFIX = struct.Struct("<8sII")
+
+
+def build_atlas(
+    path: Union[str, Path],
+    board_design: str,
+    pieces_design: str = "classic",
+    square_sizes: Sequence[int] = STANDARD_SQUARE_SIZES
+) -> Path:
+    """
+    Compile a board design and a pieces design into an atlas file.
+
+    For every square size, the atlas holds the board, the 12 pieces and the 2 turn indicators as raw
+    RGBA pixels, resized exactly as the renderer resizes them. Rendering from an atlas then needs no
+    image decoding at all, and processes mapping the same atlas share its pages.
+    The native square size of the board is always compiled.
+
+    :param path: the atlas file to write.
+    :param board_design: the design of the board.
+    :param pieces_design: the design of the pieces.
+    :param square_sizes: the square sizes in pixels.
+    :return: the path of the atlas.
+    """
+    boards = get_dict_available_boards()
+    pieces = get_dict_available_pieces()
+    if board_design not in boards:
+        raise ValueError(f"Board design '{board_design}' is not available. Available designs are: {list(boards)}")
+    if pieces_design not in pieces:
+        raise ValueError(f"Pieces design '{pieces_design}' is not available. Available designs are: {list(pieces)}")
+    if any(size < 2 for size in square_sizes):
+        raise ValueError(f"Square sizes must be superior or equal to 2, got {list(square_sizes)}")
+
+    native = board_pyramid.get(board_design, None, boards[board_design])
+    native_square_size = native.width // 8
+    levels: Dict[str, Dict] = {}
+    chunks: List[bytes] = []
+    offset = 0
+
+    def add(image: Image.Image) -> int:
+        nonlocal offset
+        start = offset
+        data = image.tobytes()
+        chunks.append(data)
+        offset += len(data)
+        return start
+
+    for square_size in sorted(set(square_sizes) | {native_square_size}):
+        board = native if square_size == native_square_size else board_pyramid.get(board_design, square_size, boards[board_design])
+        level = {"board": [add(board), board.width, board.height], "pieces": offset}
+        for piece in PIECES:
+            add(load_resized(pieces[pieces_design] / piece_to_filename[piece], square_size))
+        level["frames"] = offset
+        for frame_name in ("wFrame.png", "bFrame.png"):
+            add(load_resized(PATH_OTHER / frame_name, square_size // 2))
+        levels[str(square_size)] = level
+
+    header = json.dumps({
+        "board_design": board_design,
+        "pieces_design": pieces_design,
+        "native_square_size": native_square_size,
+        "pieces": PIECES,
+        "levels": levels,
+    }).encode()
+    data_start = -(-(_PREFIX.size + len(header)) // _ALIGNMENT) * _ALIGNMENT
+
+    path = Path(path)
+    with open(path, "wb") as file:
+        file.write(_PREFIX.pack(MAGIC, VERSION, len(header)))
+        file.write(header)
+        file.write(b"\0" * (data_start - _PREFIX.size - len(header)))
+        for chunk in chunks:
+            file.write(chunk)
+    return path
+
+
+class Atlas:
+    """
+    A compiled atlas, memory-mapped read-only.
+
+    The images it returns point into the mapping: they are read-only and no pixel is copied until they are pasted.
+    """
+
+    def __init__(self, path: Union[str, Path]) -> None:
+        """
+        Map an atlas file.
+
+        :param path: the atlas file written by build_atlas.
+        """
+        self.path = Path(path)
+        with open(self.path, "rb") as file:
+            self._mmap = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, header_length = _PREFIX.unpack_from(self._mmap, 0)
+        if magic != MAGIC:
+            raise ValueError(f"'{self.path}' is not a fen2image atlas.")
+        if version != VERSION:
+            raise ValueError(f"Unsupported atlas version {version}, expected {VERSION}.")
+        header = json.loads(self._mmap[_PREFIX.size:_PREFIX.size + header_length])
+        self._data_start = -(-(_PREFIX.size + header_length) // _ALIGNMENT) * _ALIGNMENT
+        self._buffer = memoryview(self._mmap)
+
+        self.board_design: str = header["board_design"]
+        self.pieces_design: str = header["pieces_design"]
+        self.native_square_size: int = header["native_square_size"]
+        self._pieces: str = header["pieces"]
+        self._levels: Dict[int, Dict] = {int(size): level for size, level in header["levels"].items()}
+
+    def __enter__(self) -> "Atlas":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    @property
+    def square_sizes(self) -> List[int]:
+        """
+        The compiled square sizes, in increasing order.
+        """
+        return sorted(self._levels)
+
+    def board(self, square_size: int) -> Image.Image:
+        """
+        :param square_size: a compiled square size.
+        :return: the RGBA board.
+        """
+        offset, width, height = self._level(square_size)["board"]
+        return self._image(offset, width, height)
+
+    def piece(self, piece: str, square_size: int) -> Image.Image:
+        """
+        :param piece: the piece letter, as found in a FEN string.
+        :param square_size: a compiled square size.
+        :return: the RGBA sprite.
+        """
+        offset = self._level(square_size)["pieces"] + self._pieces.index(piece) * square_size * square_size * 4
+        return self._image(offset, square_size, square_size)
+
+    def frame(self, color_turn: str, square_size: int) -> Image.Image:
+        """
+        :param color_turn: the color to move, "w" or "b".
+        :param square_size: a compiled square size.
+        :return: the RGBA turn indicator, half a square wide.
+        """
+        frame_size = square_size // 2
+        offset = self._level(square_size)["frames"] + (0 if color_turn == "w" else frame_size * frame_size * 4)
+        return self._image(offset, frame_size, frame_size)
+
+    def piece_stack(self, square_size: int):
+        """
+        Get the 12 sprites as a NumPy array, without copying them out of the mapping.
+
+        :param square_size: a compiled square size.
+        :return: a read-only uint8 array of shape (12, square_size, square_size, 4), in the order of numpy_backend.PIECES.
+        """
+        import numpy
+        start = self._data_start + self._level(square_size)["pieces"]
+        count = 12 * square_size * square_size * 4
+        return numpy.frombuffer(self._buffer[start:start + count], dtype=numpy.uint8).reshape(12, square_size, square_size, 4)
+
+    def check_designs(self, pieces_design: str, board_design: str) -> None:
+        """
+        Verify that the atlas holds the requested designs. "random" stands for the board of the atlas.
+        """
+        if board_design not in ("random", self.board_design):
+            raise ValueError(f"Board design '{board_design}' is not in the atlas, which holds '{self.board_design}'.")
+        if pieces_design != self.pieces_design:
+            raise ValueError(f"Pieces design '{pieces_design}' is not in the atlas, which holds '{self.pieces_design}'.")
+
+    def close(self) -> None:
+        """
+        Unmap the atlas. The images and arrays it returned must have been deleted first: the mapping cannot
+        be closed while they point into it, a BufferError is then raised and the atlas is left open and usable.
+        """
+        self._buffer.release()
+        try:
+            self._mmap.close()
+        except BufferError:
+            # the slices of the released view still hold the mapping, the atlas is restored as it was
+            self._buffer = memoryview(self._mmap)
+            raise BufferError(f"Cannot close the atlas '{self.path}': images or arrays taken from it are still referenced.") from None
+        tile_store.discard(lambda key: key[0] is self)
+
+    def _level(self, square_size: int) -> Dict:
+        level = self._levels.get(square_size)
+        if level is None:
+            raise ValueError(f"Square size {square_size} is not in the atlas. Available square sizes are: {self.square_sizes}")
+        return level
+
+    def _image(self, offset: int, width: int, height: int) -> Image.Image:
+        start = self._data_start + offset
+        return Image.frombuffer("RGBA", (width, height), self._buffer[start:start + width * height * 4], "raw", "RGBA", 0, 1)
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(prog="python -m fen2image.atlas", description="Compile a board and a pieces design into an atlas file.")
+    parser.add_argument("path", help="the atlas file to write")
+    parser.add_argument("--board", required=True, help="the design of the board")
+    parser.add_argument("--pieces", default="classic", help="the design of the pieces")
+    parser.add_argument("--sizes", type=int, nargs="+", default=list(STANDARD_SQUARE_SIZES), help="the square sizes in pixels")
+    args = parser.parse_args(argv)
+    path = build_atlas(args.path, args.board, args.pieces, args.sizes)
+    with Atlas(path) as atlas:
+        print(f"{path}: {atlas.board_design} / {atlas.pieces_design}, square sizes {atlas.square_sizes}, {path.stat().st_size} bytes")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,237 @@
+import argparse
+import io
+import os
+import sys
+import tarfile
+import time
+import zipfile
+from collections import deque
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Deque, Iterator, List, Optional, Set, TextIO, Tuple
+
+from .core import fen2images
+from .encoding import PRESETS
+from .utils import get_list_available_boards
+
+# the file extension of each format
+EXTENSIONS = {"PNG": "png", "WEBP": "webp", "JPEG": "jpg"}
+
+
+def epd_to_fen(line: str) -> str:
+    """
+    Convert an EPD line to a FEN string. A FEN string is returned unchanged.
+
+    EPD has the 4 first fields of FEN followed by operations such as 'bm Nf3; id "puzzle 12";'.
+    The half move clock and the full move number are read from the hmvc and fmvn operations, 0 and 1 by default.
+
+    :param line: a FEN string or an EPD line.
+    :return: the FEN string.
+    """
+    fields = line.split()
+    if len(fields) >= 6 and fields[4].isdigit() and fields[5].isdigit():
+        return " ".join(fields[:6])
+    if len(fields) < 4:
+        return line.strip()
+
+    counters = {"hmvc": "0", "fmvn": "1"}
+    for operation in " ".join(fields[4:]).split(";"):
+        parts = operation.split()
+        if len(parts) == 2 and parts[0] in counters:
+            counters[parts[0]] = parts[1]
+    return " ".join(fields[:4] + [counters["hmvc"], counters["fmvn"]])
+
+
+def read_positions(inputs: List[str], stdin: TextIO = None) -> Iterator[Tuple[str, int, str]]:
+    """
+    Stream the positions of the input files, one line at a time.
+
+    Blank lines and lines starting with "#" are skipped.
+
+    :param inputs: the paths of the files, "-" for the standard input.
+    :param stdin: the file read for "-", sys.stdin by default.
+    :return: a generator of (source, line number, FEN string).
+    """
+    for source in inputs:
+        with _open_input(source, stdin) as file:
+            for line_number, line in enumerate(file, 1):
+                line = line.strip()
+                if line and not line.startswith("#"):
+                    yield source, line_number, epd_to_fen(line)
+
+
+@contextmanager
+def _open_input(source: str, stdin: Optional[TextIO]):
+    if source == "-":
+        yield stdin or sys.stdin
+    else:
+        with open(source, encoding="utf-8") as file:
+            yield file
+
+
+class _Directory:
+
+    def __init__(self, path: Path, resume: bool) -> None:
+        self.path = path
+        self.path.mkdir(parents=True, exist_ok=True)
+
+    def exists(self, name: str) -> bool:
+        return (self.path / name).exists()
+
+    def write(self, name: str, data: bytes) -> None:
+        # written under a temporary name first, an interrupted run never leaves a truncated image to resume from
+        target = self.path / name
+        temporary = target.with_name(target.name + ".tmp")
+        temporary.write_bytes(data)
+        os.replace(temporary, target)
+
+    def close(self) -> None:
+        pass
+
+
+class _Zip:
+
+    def __init__(self, path: Path, resume: bool) -> None:
+        # the images are already compressed, they are stored as is
+        self._zip = zipfile.ZipFile(path, "a" if resume and path.exists() else "w", zipfile.ZIP_STORED)
+        self._names: Set[str] = set(self._zip.namelist())
+
+    def exists(self, name: str) -> bool:
+        return name in self._names
+
+    def write(self, name: str, data: bytes) -> None:
+        self._zip.writestr(name, data)
+        self._names.add(name)
+
+    def close(self) -> None:
+        self._zip.close()
+
+
+class _Tar:
+
+    def __init__(self, path: Path, resume: bool) -> None:
+        compressed = path.name.endswith((".tar.gz", ".tgz"))
+        if resume and path.exists():
+            if compressed:
+                raise ValueError(f"Cannot resume into the compressed archive '{path}', use a .tar, a .zip or a directory.")
+            self._tar = tarfile.open(path, "a")
+        else:
+            self._tar = tarfile.open(path, "w:gz" if compressed else "w")
+        self._names: Set[str] = set(self._tar.getnames()) if self._tar.mode == "a" else set()
+
+    def exists(self, name: str) -> bool:
+        return name in self._names
+
+    def write(self, name: str, data: bytes) -> None:
+        info = tarfile.TarInfo(name)
+        info.size = len(data)
+        info.mtime = int(time.time())
+        self._tar.addfile(info, io.BytesIO(data))
+        self._names.add(name)
+
+    def close(self) -> None:
+        self._tar.close()
+
+
+def open_output(path: str, resume: bool = False):
+    """
+    Open where the images are written: a directory, or a .zip, .tar, .tar.gz or .tgz archive.
+
+    :param path: the directory or the archive.
+    :param resume: keep what an earlier run wrote, instead of starting over.
+    :return: an object with exists(name), write(name, data) and close() methods.
+    """
+    path = Path(path)
+    if path.suffix == ".zip":
+        return _Zip(path, resume)
+    if path.name.endswith((".tar", ".tar.gz", ".tgz")):
+        return _Tar(path, resume)
+    return _Directory(path, resume)
+
+
+def main(argv: Optional[List[str]] = None, stdin: Optional[TextIO] = None, stderr: Optional[TextIO] = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="fen2image",
+        description="Render FEN or EPD positions, one per line, to images in a directory or an archive.",
+    )
+    parser.add_argument("inputs", nargs="*", default=["-"], help="the files to read, '-' for the standard input (default)")
+    parser.add_argument("-o", "--output", required=True, help="a directory, or a .zip, .tar, .tar.gz or .tgz archive")
+    parser.add_argument("-f", "--format", choices=list(PRESETS), default="png", help="the encoding of the images, e.g. png-fast or webp-lossy")
+    parser.add_argument("-b", "--board", default="random", help="the design of the board")
+    parser.add_argument("-s", "--size", type=int, help="the width of the board in pixels, the native size by default")
+    parser.add_argument("-j", "--workers", type=int, default=os.cpu_count() or 1, help="the number of worker processes")
+    parser.add_argument("--resume", action="store_true", help="skip the positions whose image already exists")
+    parser.add_argument("-q", "--quiet", action="store_true", help="do not print the summary")
+    args = parser.parse_args(argv)
+    stderr = stderr or sys.stderr
+
+    if args.workers < 1:
+        parser.error(f"the number of workers must be superior or equal to 1, got {args.workers}")
+    if args.size is not None and args.size < 16:
+        parser.error(f"the size must be superior or equal to 16, got {args.size}")
+    if args.board != "random" and args.board not in get_list_available_boards():
+        parser.error(f"board design '{args.board}' is not available, available designs are: {get_list_available_boards()}")
+    try:
+        output = open_output(args.output, args.resume)
+    except (OSError, ValueError, zipfile.BadZipFile, tarfile.TarError) as error:
+        parser.error(str(error))
+
+    encoding = PRESETS[args.format]
+    extension = EXTENSIONS[encoding.format]
+    prefix_source = len(args.inputs) > 1
+    # the name and the origin of each submitted position, in submission order
+    pending: Deque[Tuple[str, str, int]] = deque()
+    counts = {"rendered": 0, "skipped": 0, "invalid": 0}
+
+    def positions() -> Iterator[str]:
+        for source, line_number, fen in read_positions(args.inputs, stdin):
+            name = f"{line_number:08d}.{extension}"
+            if prefix_source:
+                name = f"{Path(source).stem}-{name}"
+            if args.resume and output.exists(name):
+                counts["skipped"] += 1
+                continue
+            pending.append((name, source, line_number))
+            yield fen
+
+    start = time.perf_counter()
+    try:
+        results = fen2images(positions(), args.board, max_workers=args.workers, ordered=False, size=args.size, format=encoding)
+        for (name, source, line_number), result in _with_origins(results, pending):
+            if result.error is not None:
+                counts["invalid"] += 1
+                print(f"{source}:{line_number}: {result.error}", file=stderr)
+            else:
+                output.write(name, result.image)
+                counts["rendered"] += 1
+    except KeyboardInterrupt:
+        print("Interrupted, run again with --resume to continue.", file=stderr)
+        return 130
+    finally:
+        output.close()
+        elapsed = time.perf_counter() - start
+        if not args.quiet:
+            rate = counts["rendered"] / elapsed if elapsed > 0 else 0.0
+            print(f"{counts['rendered']} rendered, {counts['skipped']} skipped, {counts['invalid']} invalid "
+                  f"in {elapsed:.1f} s ({rate:.1f} images/s)", file=stderr)
+    return 0
+
+
+def _with_origins(results, pending: Deque) -> Iterator:
+    """
+    Pair each result of fen2images with the name and the origin of its position.
+
+    The positions are submitted in order, so the n-th entry of pending belongs to the result of index n.
+    Only the positions submitted and not returned yet are remembered.
+    """
+    in_flight = {}
+    submitted = 0
+    for result in results:
+        while submitted <= result.index:
+            in_flight[submitted] = pending.popleft()
+            submitted += 1
+        yield in_flight.pop(result.index), result
+
+
+if __name__ == "__main__":
+    sys.exit(main())
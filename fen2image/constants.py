@@ -6,7 +6,6 @@ PATH_ARTS = PATH_PROJECT / 'resources' / 'arts'
 PATH_BOARDS = PATH_ARTS / 'boards'
 PATH_PIECES = PATH_ARTS / 'pieces'
 PATH_OTHER = PATH_ARTS / 'other'
-PATH_RESULT = PATH_PROJECT / 'result_file'
 
 # dictionary associations
 piece_to_filename = {
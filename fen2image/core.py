@@ -1,17 +1,247 @@
+from __future__ import annotations
+
+import os
+from collections import deque
+from contextlib import nullcontext
+from concurrent.futures import Executor, FIRST_COMPLETED, Future, wait
+from typing import Callable, Iterable, Iterator, NamedTuple, Optional, Sequence, Union, TYPE_CHECKING
+
 from .Fen import Fen
-from PIL import Image
+from .AssetRegistry import registry
+from .RenderCache import RenderCache
+from .encoding import Encoding, as_encoding
+from .instrumentation import Metrics, instrument, stage
+from .overlays import Overlay
+from .sinks import BytesSink, Output
+from .utils import get_list_available_boards
+
+if TYPE_CHECKING:
+    import numpy
+    from PIL import Image
 
 
-def fen2image(fen: str, board_design: str = "random") -> Image:
+class RenderResult(NamedTuple):
+    """
+    The outcome of rendering one FEN of a batch.
+
+    :param index: the position of the FEN in the input iterable.
+    :param fen: the FEN string.
+    :param image: the image, or its encoded bytes when a format was requested. None if the rendering failed.
+    :param error: the error raised by the verification of the FEN, None on success.
+    """
+    index: int
+    fen: str
+    image: Optional[Union[Image.Image, bytes]]
+    error: Optional[Exception]
+
+
+def fen2image(
+    fen: str,
+    board_design: str = "random",
+    output: Output = None,
+    cache: Optional[RenderCache] = None,
+    backend: str = "pil",
+    size: Optional[int] = None,
+    metrics: Optional[Metrics] = None,
+    overlays: Sequence[Overlay] = (),
+    return_type: str = "image"
+) -> Union[Image, "numpy.ndarray", bytes]:
     """
     Convert a FEN string to an image.
 
     :param:
         fen: the FEN string
         board_design: the design of the board as a string
+        output: where to write the image, nothing is written by default (see BoardRepresentation.create_image)
+        cache: a RenderCache reused across calls, repeated positions are then rendered once
+        backend: "pil", "numpy" or "tiles", how the pieces are composited (same pixels either way)
+        size: the width of the board in pixels, the native size of the board design by default
+        metrics: a MetricsCollector or a callback(kind, name, value) receiving the duration of each stage
+            and the cache hits and misses (see fen2image.instrumentation)
+        overlays: Highlight and Arrow objects drawn with the pieces, e.g. the last move (see fen2image.overlays)
+        return_type: "image", "array" for a NumPy array or "buffer" for the raw RGBA bytes
     :return: the image
     """
 
-    fen = Fen(fen)
-    board = fen.to_board_representation()
-    return board.create_image(board_design=board_design)
\ No newline at end of file
+    with instrument(metrics) if metrics is not None else nullcontext():
+        fen = Fen(fen)
+        with stage("validate"):
+            fen.verify()
+        with stage("parse"):
+            board = fen.to_board_representation()
+        return board.create_image(
+            board_design=board_design, output=output, cache=cache, backend=backend, size=size, overlays=overlays,
+            return_type=return_type
+        )
+
+
+def fen2bytes(
+    fen: str,
+    board_design: str = "random",
+    encoding: Union[str, Encoding] = "png",
+    cache: Optional[RenderCache] = None,
+    backend: str = "pil",
+    size: Optional[int] = None,
+    metrics: Optional[Metrics] = None,
+    overlays: Sequence[Overlay] = ()
+) -> bytes:
+    """
+    Convert a FEN string to an encoded image.
+
+    :param:
+        fen: the FEN string
+        board_design: the design of the board as a string
+        encoding: an Encoding, or a preset name: "png", "png-fast", "png-palette", "webp", "webp-fast",
+            "webp-lossy" or "jpeg" (see fen2image.encoding)
+        cache: a RenderCache reused across calls, repeated positions are then rendered once
+        backend: "pil", "numpy" or "tiles", how the pieces are composited (same pixels either way)
+        size: the width of the board in pixels, the native size of the board design by default
+        metrics: a MetricsCollector or a callback(kind, name, value), see fen2image
+        overlays: Highlight and Arrow objects drawn with the pieces, see fen2image
+    :return: the encoded bytes
+    """
+    sink = BytesSink(as_encoding(encoding))
+    fen2image(fen, board_design, output=sink, cache=cache, backend=backend, size=size, metrics=metrics, overlays=overlays)
+    return sink.getvalue()
+
+
+def fen2images(
+    fens: Iterable[str],
+    board_design: str = "random",
+    executor: Union[str, Executor] = "process",
+    max_workers: Optional[int] = None,
+    ordered: bool = True,
+    size: Optional[int] = None,
+    format: Optional[Union[str, Encoding]] = None
+) -> Iterator[RenderResult]:
+    """
+    Convert many FEN strings to images on a pool of workers.
+
+    The FEN strings are consumed lazily, only a few per worker are in flight at any time.
+    An invalid FEN does not abort the batch, its result holds the error instead of an image.
+    The arguments are checked when fen2images is called: an unavailable board design, a size below 16
+    or an unknown format raise a ValueError before anything is rendered.
+
+    :param:
+        fens: the FEN strings, any iterable
+        board_design: the design of the board as a string
+        executor: "process", "thread", or an Executor to submit to (it is not shut down)
+        max_workers: the number of workers of the pool, the number of CPUs by default
+        ordered: yield the results in input order, or as soon as they are done
+        size: the width of the board in pixels, the native size of the board design by default
+        format: encode the images in the workers and return the bytes, with an Encoding or a preset name
+            such as "png-fast" (see fen2bytes). Encoded images are much smaller than raw pixels to send
+            back from worker processes.
+    :return: a generator of RenderResult
+    """
+    if max_workers is None:
+        max_workers = os.cpu_count() or 1
+    if max_workers < 1:
+        raise ValueError(f"max_workers must be superior or equal to 1, got {max_workers}")
+    if format is not None:
+        format = as_encoding(format)
+    # a wrong design or size would fail every render, it is reported once, before the first one
+    if board_design != "random" and board_design not in get_list_available_boards():
+        raise ValueError(f"Board design '{board_design}' is not available. Available designs are: {get_list_available_boards()}")
+    if size is not None and size < 16:
+        raise ValueError(f"Size must be superior or equal to 16, got {size}")
+    # the workers of a pool are only started by its first submit
+    pool = _make_pool(executor, max_workers, _warm_up)
+    return _batch(fens, board_design, pool, pool is not executor, max_workers, ordered, size, format)
+
+
+def _batch(
+    fens: Iterable[str],
+    board_design: str,
+    pool: Executor,
+    owns_pool: bool,
+    max_workers: int,
+    ordered: bool,
+    size: Optional[int],
+    format: Optional[Encoding]
+) -> Iterator[RenderResult]:
+    max_in_flight = max_workers * 4
+    try:
+        submissions = (pool.submit(_render, index, fen, board_design, size, format) for index, fen in enumerate(fens))
+        if ordered:
+            yield from _ordered_results(submissions, max_in_flight)
+        else:
+            yield from _completed_results(submissions, max_in_flight)
+    finally:
+        if owns_pool:
+            pool.shutdown(wait=True, cancel_futures=True)
+
+
+def _make_pool(executor: Union[str, Executor], max_workers: Optional[int], initializer: Optional[Callable[[], object]] = None) -> Executor:
+    """
+    Create the pool of workers of a batch.
+
+    :param executor: "process", "thread", or an Executor, returned as is.
+    :param max_workers: the number of workers of the pool, the number of CPUs by default.
+    :param initializer: run by every worker of a created pool as it starts.
+    :return: the pool. The caller shuts it down, unless it is the Executor it gave.
+    """
+    # the pools are imported on first use, multiprocessing is slow to import
+    from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+    if executor == "process":
+        return ProcessPoolExecutor(max_workers, initializer=initializer)
+    if executor == "thread":
+        return ThreadPoolExecutor(max_workers, initializer=initializer)
+    if isinstance(executor, Executor):
+        return executor
+    raise ValueError(f"Executor must be 'process', 'thread' or an Executor, got {executor!r}")
+
+
+def _ordered_results(submissions: Iterator[Future], max_in_flight: int) -> Iterator[RenderResult]:
+    in_flight = deque()
+    for future in submissions:
+        in_flight.append(future)
+        if len(in_flight) >= max_in_flight:
+            yield in_flight.popleft().result()
+    while in_flight:
+        yield in_flight.popleft().result()
+
+
+def _completed_results(submissions: Iterator[Future], max_in_flight: int) -> Iterator[RenderResult]:
+    in_flight = set()
+    for future in submissions:
+        in_flight.add(future)
+        if len(in_flight) >= max_in_flight:
+            done, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+            for finished in done:
+                yield finished.result()
+    while in_flight:
+        done, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+        for finished in done:
+            yield finished.result()
+
+
+def _render(
+    index: int,
+    fen: str,
+    board_design: str,
+    size: Optional[int] = None,
+    format: Optional[Encoding] = None,
+    overlays: Sequence[Overlay] = ()
+) -> RenderResult:
+    # only an invalid FEN is reported in the result, any other error is raised to the caller
+    try:
+        position = Fen(fen)
+        position.verify()
+        board = position.to_board_representation()
+    except ValueError as error:
+        return RenderResult(index, fen, None, error)
+    if format is None:
+        return RenderResult(index, fen, board.create_image(board_design=board_design, size=size, overlays=overlays), None)
+    sink = BytesSink(format)
+    board.create_image(board_design=board_design, output=sink, size=size, overlays=overlays)
+    return RenderResult(index, fen, sink.getvalue(), None)
+
+
+def _warm_up() -> None:
+    """
+    Index the assets once per worker, before its first render.
+    """
+    registry.boards
+    registry.pieces
@@ -0,0 +1,183 @@
+import csv
+import hashlib
+import os
+from collections import deque
+from concurrent.futures import Executor
+from pathlib import Path
+from typing import Iterable, List, NamedTuple, Optional, Sequence, Tuple, Union
+
+from .Fen import Fen
+from .core import _make_pool, _warm_up
+from .numpy_backend import _numpy
+from .utils import get_list_available_boards, get_list_available_pieces
+
+# the columns of the label file
+LABEL_FIELDS = ("index", "shard", "row", "fen", "board_design", "pieces_design")
+
+
+class DatasetReport(NamedTuple):
+    """
+    The outcome of writing a dataset.
+
+    :param count: the number of images written.
+    :param shards: the .npy files, in order. Each holds a (rows, height, width, 4) uint8 array,
+        all of them shard_size rows but the last one.
+    :param labels: the CSV file with a row per image: its index in the input, shard, row, FEN and designs.
+    :param errors: the (index in the input, error) of the invalid FENs, which are skipped.
+    """
+    count: int
+    shards: List[Path]
+    labels: Path
+    errors: List[Tuple[int, str]]
+
+
+def image_shape(size: int) -> Tuple[int, int, int]:
+    """
+    Get the shape of the images rendered at a size.
+
+    :param size: the width of the board in pixels, as given to create_image(size=...).
+    :return: the (height, width, 4) of the RGBA arrays.
+    """
+    square_size = size // 8
+    height = 8 * square_size + square_size // 2
+    return height, height + square_size // 4, 4
+
+
+def choose_design(index: int, board_designs: Sequence[str], seed: int = 0) -> str:
+    """
+    Pick the board design of an item, instead of random.choice: the same index and seed always
+    get the same design, whatever the process rendering it.
+
+    :param index: the index of the item in the dataset.
+    :param board_designs: the designs to pick from.
+    :param seed: changes the designs picked.
+    :return: the board design.
+    """
+    digest = hashlib.blake2b(f"{seed}:{index}".encode(), digest_size=8).digest()
+    return board_designs[int.from_bytes(digest, "big") % len(board_designs)]
+
+
+def write_dataset(
+    fens: Iterable[str],
+    directory: Union[str, os.PathLike],
+    size: int = 256,
+    shard_size: int = 10000,
+    board_designs: Optional[Sequence[str]] = None,
+    pieces_design: str = "classic",
+    seed: int = 0,
+    executor: Union[str, Executor] = "process",
+    max_workers: Optional[int] = None,
+    batch_size: int = 64
+) -> DatasetReport:
+    """
+    Render FEN strings into memory-mapped .npy shards, for training models on raw pixels.
+
+    The shards are preallocated, and the workers render each image with create_image(return_type="array")
+    and copy it in place: no image is encoded, and no pixel is sent back from the workers.
+    The FEN strings are consumed lazily and verified as they are read, the invalid ones are skipped.
+
+    :param fens: the FEN strings, any iterable.
+    :param directory: where to write shard-00000.npy, shard-00001.npy... and labels.csv. It is created if needed.
+    :param size: the width of the board in pixels, every image has the shape image_shape(size).
+    :param shard_size: the number of images per shard.
+    :param board_designs: the board designs to pick from with choose_design, every available design by default.
+    :param pieces_design: the design of the pieces.
+    :param seed: changes the board designs picked.
+    :param executor: "process", "thread", or an Executor to submit to (it is not shut down).
+    :param max_workers: the number of workers of the pool, the number of CPUs by default.
+    :param batch_size: the number of images rendered per task.
+    :return: the DatasetReport.
+    """
+    np = _numpy("The dataset writer")
+    if size < 16:
+        raise ValueError(f"Size must be superior or equal to 16, got {size}")
+    if shard_size < 1:
+        raise ValueError(f"shard_size must be superior or equal to 1, got {shard_size}")
+    if batch_size < 1:
+        raise ValueError(f"batch_size must be superior or equal to 1, got {batch_size}")
+    if max_workers is None:
+        max_workers = os.cpu_count() or 1
+    if max_workers < 1:
+        raise ValueError(f"max_workers must be superior or equal to 1, got {max_workers}")
+    available_boards = get_list_available_boards()
+    board_designs = sorted(available_boards) if board_designs is None else list(board_designs)
+    if not board_designs:
+        raise ValueError("board_designs must not be empty")
+    for design in board_designs:
+        if design not in available_boards:
+            raise ValueError(f"Board design '{design}' is not available. Available designs are: {available_boards}")
+    if pieces_design not in get_list_available_pieces():
+        raise ValueError(f"Pieces design '{pieces_design}' is not available. Available designs are: {get_list_available_pieces()}")
+
+    pool = _make_pool(executor, max_workers, _warm_up)
+
+    directory = Path(directory)
+    directory.mkdir(parents=True, exist_ok=True)
+    shape = image_shape(size)
+    shards: List[Path] = []
+    errors: List[Tuple[int, str]] = []
+    count = 0
+    in_flight = deque()
+    batch = []
+    try:
+        with open(directory / "labels.csv", "w", newline="", encoding="utf-8") as label_file:
+            labels = csv.writer(label_file)
+            labels.writerow(LABEL_FIELDS)
+            for index, fen in enumerate(fens):
+                try:
+                    Fen(fen).verify()
+                except ValueError as error:
+                    errors.append((index, str(error)))
+                    continue
+                shard, row = divmod(count, shard_size)
+                if row == 0:
+                    shards.append(directory / f"shard-{shard:05d}.npy")
+                    # preallocated in full, the workers only open it
+                    np.lib.format.open_memmap(shards[-1], mode="w+", dtype=np.uint8, shape=(shard_size,) + shape)
+                board_design = choose_design(index, board_designs, seed)
+                labels.writerow((index, shard, row, fen, board_design, pieces_design))
+                batch.append((shards[-1], row, fen, board_design))
+                count += 1
+                if len(batch) == batch_size:
+                    in_flight.append(pool.submit(_render_batch, batch, pieces_design, size))
+                    batch = []
+                    if len(in_flight) >= max_workers * 4:
+                        in_flight.popleft().result()
+            if batch:
+                in_flight.append(pool.submit(_render_batch, batch, pieces_design, size))
+            while in_flight:
+                in_flight.popleft().result()
+    finally:
+        if pool is not executor:
+            pool.shutdown(wait=True, cancel_futures=True)
+
+    rows = count - (len(shards) - 1) * shard_size
+    if shards and rows < shard_size:
+        _truncate(shards[-1], rows)
+    return DatasetReport(count, shards, directory / "labels.csv", errors)
+
+
+def _render_batch(batch: List[Tuple[Path, int, str, str]], pieces_design: str, size: int) -> None:
+    np = _numpy("The dataset writer")
+    shards = {}
+    for path, row, fen, board_design in batch:
+        if path not in shards:
+            shards[path] = np.lib.format.open_memmap(path, mode="r+")
+        board = Fen(fen).to_board_representation()
+        shards[path][row] = board.create_image(pieces_design, board_design, size=size, return_type="array")
+    for shard in shards.values():
+        shard.flush()
+
+
+def _truncate(path: Path, rows: int) -> None:
+    """
+    Shrink the last shard to the rows written.
+    """
+    np = _numpy("The dataset writer")
+    full = np.load(path, mmap_mode="r")
+    tmp = path.with_suffix(".tmp")
+    truncated = np.lib.format.open_memmap(tmp, mode="w+", dtype=np.uint8, shape=(rows,) + full.shape[1:])
+    truncated[:] = full[:rows]
+    truncated.flush()
+    del full, truncated
+    os.replace(tmp, path)
@@ -0,0 +1,145 @@
+from __future__ import annotations
+
+import io
+from dataclasses import dataclass
+from typing import Any, BinaryIO, Dict, Optional, Tuple, Union, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from PIL import Image
+
+# the formats an Encoding writes
+FORMATS = ("PNG", "WEBP", "JPEG")
+
+
+@dataclass(frozen=True)
+class Encoding:
+    """
+    How a rendered image is encoded.
+
+    :param format: "PNG", "WEBP" or "JPEG".
+    :param compress_level: PNG only, zlib level from 0 to 9. 1 encodes several times faster than the default 6
+        for files about 15 % larger.
+    :param optimize: PNG and JPEG, spend more time searching for a smaller file.
+    :param lossless: WEBP only, lossless or lossy compression.
+    :param quality: lossy WEBP and JPEG quality from 0 to 100. For lossless WEBP, the effort from 0 (fastest) to 100.
+    :param method: WEBP only, the speed/size trade-off from 0 (fastest) to 6 (smallest).
+    :param palette: PNG and lossless WEBP, quantize to an adaptive palette of this many colors (2 to 256).
+        Diagrams have few distinct colors: files are several times smaller and faster to encode,
+        the transparency is kept.
+    :param background: JPEG has no transparency, the image is flattened on this color.
+    """
+    format: str = "PNG"
+    compress_level: Optional[int] = None
+    optimize: bool = False
+    lossless: bool = True
+    quality: Optional[int] = None
+    method: Optional[int] = None
+    palette: Optional[int] = None
+    background: Tuple[int, int, int] = (255, 255, 255)
+
+    def __post_init__(self) -> None:
+        format = self.format.upper()
+        object.__setattr__(self, "format", format)
+        if format not in FORMATS:
+            raise ValueError(f"Format '{self.format}' is not available. Available formats are: {list(FORMATS)}")
+        if self.palette is not None:
+            if not 2 <= self.palette <= 256:
+                raise ValueError(f"The palette must have between 2 and 256 colors, got {self.palette}")
+            if format == "JPEG" or (format == "WEBP" and not self.lossless):
+                raise ValueError("A palette only applies to PNG and lossless WEBP.")
+
+    @property
+    def mime_type(self) -> str:
+        """
+        The content type of the encoded image, e.g. "image/png".
+        """
+        from PIL import Image
+
+        # Image.MIME is filled in as the format plugins are imported, which a first encode or decode does
+        Image.init()
+        return Image.MIME[self.format]
+
+    def prepare(self, image: Image.Image) -> Image.Image:
+        """
+        Convert a rendered image to what the encoder is given: flattened for JPEG, quantized for a palette.
+
+        :param image: the RGBA image.
+        :return: the image to encode, it may be the same object.
+        """
+        from PIL import Image
+
+        if self.format == "JPEG":
+            flat = Image.new("RGB", image.size, self.background)
+            flat.paste(image, (0, 0), image)
+            return flat
+        if self.palette is not None:
+            # fast octree is the quantizer of Pillow that keeps the alpha channel
+            return image.quantize(self.palette, method=Image.Quantize.FASTOCTREE, dither=Image.Dither.NONE)
+        return image
+
+    def save_params(self) -> Dict[str, Any]:
+        """
+        :return: the options given to Image.save.
+        """
+        if self.format == "PNG":
+            params = {"optimize": self.optimize}
+            if self.compress_level is not None:
+                params["compress_level"] = self.compress_level
+        elif self.format == "WEBP":
+            params = {"lossless": self.lossless}
+            if self.quality is not None:
+                params["quality"] = self.quality
+            if self.method is not None:
+                params["method"] = self.method
+        else:
+            params = {"optimize": self.optimize}
+            if self.quality is not None:
+                params["quality"] = self.quality
+        return params
+
+    def save(self, image: Image.Image, fp: Union[str, BinaryIO]) -> None:
+        """
+        Encode an image to a path or a binary file object.
+
+        :param image: the RGBA image.
+        :param fp: where to write.
+        """
+        self.prepare(image).save(fp, format=self.format, **self.save_params())
+
+    def encode(self, image: Image.Image) -> bytes:
+        """
+        Encode an image.
+
+        :param image: the RGBA image.
+        :return: the encoded bytes.
+        """
+        buffer = io.BytesIO()
+        self.save(image, buffer)
+        return buffer.getvalue()
+
+
+# named encodings, usable wherever an encoding is expected
+PRESETS: Dict[str, Encoding] = {
+    "png": Encoding("PNG"),
+    "png-fast": Encoding("PNG", compress_level=1),
+    "png-palette": Encoding("PNG", palette=256),
+    "webp": Encoding("WEBP", lossless=True),
+    "webp-fast": Encoding("WEBP", lossless=True, quality=0, method=0),
+    "webp-lossy": Encoding("WEBP", lossless=False, quality=80),
+    "jpeg": Encoding("JPEG", quality=85),
+}
+
+
+def as_encoding(encoding: Union[str, Encoding]) -> Encoding:
+    """
+    Get the Encoding matching an encoding argument.
+
+    :param encoding: an Encoding, or the name of a preset such as "png-fast". Formats name their default preset, e.g. "WEBP".
+    :return: the Encoding.
+    """
+    if isinstance(encoding, Encoding):
+        return encoding
+    preset = PRESETS.get(encoding.lower())
+    if preset is not None:
+        return preset
+    raise ValueError(f"Encoding '{encoding}' is not available. Available presets are: {list(PRESETS)}")
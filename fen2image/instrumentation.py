@@ -0,0 +1,190 @@
+import threading
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from time import perf_counter
+from typing import Any, Callable, Dict, Iterator, Optional, Union
+
+# the stages timed by a render, in pipeline order
+STAGES = ("validate", "parse", "assets", "decode", "sprites", "composite", "frame", "encode", "render")
+
+
+class MetricsCollector:
+    """
+    Aggregate the timings and counters reported by the renders.
+
+    For every stage, the number of samples, their total and maximum are kept, along with the last
+    max_samples timings for the percentiles. A collector can be shared by several threads.
+    """
+
+    def __init__(self, max_samples: int = 10000) -> None:
+        """
+        Initializes an empty collector.
+
+        :param max_samples: the number of recent timings kept per stage to compute the percentiles.
+        """
+        if max_samples < 1:
+            raise ValueError(f"max_samples must be superior or equal to 1, got {max_samples}")
+        self.max_samples = max_samples
+        self._timings: Dict[str, Dict[str, Any]] = {}
+        self._counters: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def timing(self, stage: str, seconds: float) -> None:
+        """
+        Record the duration of a stage.
+
+        :param stage: the name of the stage, one of STAGES.
+        :param seconds: the duration.
+        """
+        with self._lock:
+            timing = self._timings.get(stage)
+            if timing is None:
+                timing = self._timings[stage] = {"count": 0, "total": 0.0, "max": 0.0, "samples": deque(maxlen=self.max_samples)}
+            timing["count"] += 1
+            timing["total"] += seconds
+            if seconds > timing["max"]:
+                timing["max"] = seconds
+            timing["samples"].append(seconds)
+
+    def increment(self, counter: str, value: int = 1) -> None:
+        """
+        Increment a counter, such as "sprite_store.hits".
+
+        :param counter: the name of the counter.
+        :param value: the increment.
+        """
+        with self._lock:
+            self._counters[counter] = self._counters.get(counter, 0) + value
+
+    def stats(self) -> Dict[str, Dict]:
+        """
+        Get the aggregated metrics.
+
+        :return: {"timings": {stage: {count, total, mean, max, p50, p90, p99}}, "counters": {counter: value}},
+            the durations in seconds.
+        """
+        with self._lock:
+            timings = {stage: dict(timing, samples=list(timing["samples"])) for stage, timing in self._timings.items()}
+            counters = dict(self._counters)
+        for timing in timings.values():
+            samples = sorted(timing.pop("samples"))
+            timing["mean"] = timing["total"] / timing["count"]
+            for percentile in (50, 90, 99):
+                timing[f"p{percentile}"] = _percentile(samples, percentile)
+        return {"timings": timings, "counters": counters}
+
+    def reset(self) -> None:
+        """
+        Forget every timing and counter.
+        """
+        with self._lock:
+            self._timings.clear()
+            self._counters.clear()
+
+
+class CallbackMetrics:
+    """
+    Forward every timing and counter to a function called as callback(kind, name, value),
+    kind being "timing" (value in seconds) or "counter" (value is the increment).
+    """
+
+    def __init__(self, callback: Callable[[str, str, float], None]) -> None:
+        self.callback = callback
+
+    def timing(self, stage: str, seconds: float) -> None:
+        self.callback("timing", stage, seconds)
+
+    def increment(self, counter: str, value: int = 1) -> None:
+        self.callback("counter", counter, value)
+
+
+# anything with timing(stage, seconds) and increment(counter, value) methods, or a callback
+Metrics = Union[MetricsCollector, CallbackMetrics, Callable[[str, str, float], None]]
+
+_active: ContextVar[Optional[Any]] = ContextVar("fen2image_metrics", default=None)
+
+
+@contextmanager
+def instrument(metrics: Metrics) -> Iterator[None]:
+    """
+    Report the timings and counters of every render in the block to metrics.
+
+    The metrics are bound to the current thread or task (a context variable): renders running on
+    other threads or processes, such as those of fen2images, are not reported.
+
+    :param metrics: a MetricsCollector, any object with the same timing and increment methods,
+        or a callback called as callback(kind, name, value).
+    """
+    token = _active.set(as_metrics(metrics))
+    try:
+        yield
+    finally:
+        _active.reset(token)
+
+
+def as_metrics(metrics: Metrics):
+    """
+    Wrap a callback in a CallbackMetrics, return any other metrics object as is.
+    """
+    if hasattr(metrics, "timing") and hasattr(metrics, "increment"):
+        return metrics
+    if callable(metrics):
+        return CallbackMetrics(metrics)
+    raise ValueError(f"Metrics must have timing and increment methods or be callable, got {type(metrics).__name__}")
+
+
+class _Stage:
+    __slots__ = ("metrics", "name", "start")
+
+    def __init__(self, metrics, name: str) -> None:
+        self.metrics = metrics
+        self.name = name
+
+    def __enter__(self) -> None:
+        self.start = perf_counter()
+
+    def __exit__(self, *exc_info) -> None:
+        self.metrics.timing(self.name, perf_counter() - self.start)
+
+
+class _NoStage:
+    __slots__ = ()
+
+    def __enter__(self) -> None:
+        pass
+
+    def __exit__(self, *exc_info) -> None:
+        pass
+
+
+_NO_STAGE = _NoStage()
+
+
+def stage(name: str):
+    """
+    Time a block as a stage of the render, when metrics are active.
+
+    Without active metrics, a shared no-op context manager is returned: the cost is one context variable lookup.
+
+    :param name: the name of the stage.
+    """
+    metrics = _active.get()
+    if metrics is None:
+        return _NO_STAGE
+    return _Stage(metrics, name)
+
+
+def increment(counter: str, value: int = 1) -> None:
+    """
+    Increment a counter of the active metrics, if any.
+    """
+    metrics = _active.get()
+    if metrics is not None:
+        metrics.increment(counter, value)
+
+
+def _percentile(samples, percentile: int) -> float:
+    # nearest rank on sorted samples
+    index = max(0, -(-len(samples) * percentile // 100) - 1)
+    return samples[index]
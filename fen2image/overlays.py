@@ -0,0 +1,208 @@
+from __future__ import annotations
+
+import math
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Iterable, List, Tuple, Union, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from PIL import Image
+
+# an RGBA color, the alpha sets how much of the board shows through
+Color = Tuple[int, int, int, int]
+
+LAST_MOVE_COLOR: Color = (255, 255, 51, 105)
+CHECK_COLOR: Color = (255, 0, 0, 220)
+ARROW_COLOR: Color = (21, 120, 27, 170)
+
+# how a highlight fills its square
+SHAPES = ("square", "circle")
+
+_FILES = "abcdefgh"
+_RANKS = "12345678"
+# the layers are drawn this many times larger and reduced, to smooth their edges
+_SUPERSAMPLING = 4
+
+
+def square_index(square: str) -> int:
+    """
+    Get the index of a square from its name.
+
+    :param square: the name of the square, e.g. "e4".
+    :return: the index of the square, 0 for a8 and 63 for h1.
+    """
+    if len(square) != 2 or square[0] not in _FILES or square[1] not in _RANKS:
+        raise ValueError(f"Square '{square}' is not valid. Squares are a file from a to h and a rank from 1 to 8, e.g. 'e4'")
+    return (8 - int(square[1])) * 8 + _FILES.index(square[0])
+
+
+@dataclass(frozen=True)
+class Highlight:
+    """
+    A colored square, drawn on the board under the pieces.
+
+    :param square: the name of the square, e.g. "e4".
+    :param color: the RGBA color.
+    :param shape: "square" fills the square, "circle" fades out from its center, as for a king in check.
+    """
+    square: str
+    color: Color = LAST_MOVE_COLOR
+    shape: str = "square"
+
+    def __post_init__(self) -> None:
+        square_index(self.square)
+        if self.shape not in SHAPES:
+            raise ValueError(f"Shape '{self.shape}' is not available. Available shapes are: {list(SHAPES)}")
+
+    @property
+    def index(self) -> int:
+        return square_index(self.square)
+
+    def layer(self, square_size: int) -> Image.Image:
+        """
+        :param square_size: the size of a square of the board in pixels.
+        :return: the RGBA layer covering the square. It is shared, do not modify it.
+        """
+        return highlight_layer(square_size, tuple(self.color), self.shape)
+
+
+@dataclass(frozen=True)
+class Arrow:
+    """
+    An arrow from the center of a square to the center of another, drawn over the pieces.
+
+    :param start: the name of the square the arrow starts from, e.g. "g1".
+    :param end: the name of the square the arrow points to, e.g. "f3".
+    :param color: the RGBA color.
+    :param width: the width of the shaft, as a fraction of a square.
+    """
+    start: str
+    end: str
+    color: Color = ARROW_COLOR
+    width: float = 0.2
+
+    def __post_init__(self) -> None:
+        if square_index(self.start) == square_index(self.end):
+            raise ValueError(f"An arrow needs two different squares, got '{self.start}' twice")
+        if not 0 < self.width <= 1:
+            raise ValueError(f"The width of an arrow must be between 0 and 1 square, got {self.width}")
+
+    def layer(self, square_size: int) -> Tuple[Image.Image, Tuple[int, int]]:
+        """
+        :param square_size: the size of a square of the board in pixels.
+        :return: the RGBA layer covering the squares spanned by the arrow, it is shared, do not modify it.
+            And the position of its top-left corner on the board.
+        """
+        start_row, start_col = divmod(square_index(self.start), 8)
+        end_row, end_col = divmod(square_index(self.end), 8)
+        # the layer only depends on the displacement, arrows of the same shape share it wherever they are
+        layer = arrow_layer(square_size, end_col - start_col, end_row - start_row, tuple(self.color), self.width)
+        return layer, (min(start_col, end_col) * square_size, min(start_row, end_row) * square_size)
+
+
+Overlay = Union[Highlight, Arrow]
+
+
+def last_move(move: str, color: Color = LAST_MOVE_COLOR) -> Tuple[Highlight, Highlight]:
+    """
+    Highlight the squares of a move.
+
+    :param move: the move in UCI notation, e.g. "e2e4" or "e7e8q".
+    :param color: the RGBA color.
+    :return: the highlights of the start and end squares.
+    """
+    if len(move) not in (4, 5):
+        raise ValueError(f"Move '{move}' is not valid. Moves are in UCI notation, e.g. 'e2e4'")
+    return Highlight(move[:2], color), Highlight(move[2:4], color)
+
+
+def check(square: str, color: Color = CHECK_COLOR) -> Highlight:
+    """
+    Highlight a king in check.
+
+    :param square: the square of the king, e.g. "e1".
+    :param color: the RGBA color at the center of the square.
+    :return: the highlight.
+    """
+    return Highlight(square, color, "circle")
+
+
+def split_overlays(overlays: Iterable[Overlay]) -> Tuple[List[Highlight], List[Arrow]]:
+    """
+    Separate the overlays drawn under the pieces from those drawn over them.
+
+    :param overlays: Highlight and Arrow objects, drawn in this order.
+    :return: the highlights and the arrows.
+    """
+    highlights, arrows = [], []
+    for overlay in overlays:
+        if isinstance(overlay, Highlight):
+            highlights.append(overlay)
+        elif isinstance(overlay, Arrow):
+            arrows.append(overlay)
+        else:
+            raise TypeError(f"Overlays must be Highlight or Arrow objects, got {overlay!r}")
+    return highlights, arrows
+
+
+@lru_cache(maxsize=64)
+def highlight_layer(square_size: int, color: Color, shape: str) -> Image.Image:
+    """
+    Rasterize a highlight.
+
+    :param square_size: the size of a square of the board in pixels.
+    :param color: the RGBA color.
+    :param shape: one of SHAPES.
+    :return: the RGBA layer of the size of a square.
+    """
+    from PIL import Image, ImageChops
+
+    if shape == "square":
+        return Image.new("RGBA", (square_size, square_size), color)
+    # the radial gradient is 0 at the center and 255 at its inscribed circle
+    fade = ImageChops.invert(Image.radial_gradient("L")).resize((square_size, square_size), Image.BILINEAR)
+    layer = Image.new("RGBA", (square_size, square_size), color)
+    layer.putalpha(fade.point(lambda value: value * color[3] // 255))
+    return layer
+
+
+@lru_cache(maxsize=256)
+def arrow_layer(square_size: int, columns: int, rows: int, color: Color, width: float) -> Image.Image:
+    """
+    Rasterize an arrow.
+
+    :param square_size: the size of a square of the board in pixels.
+    :param columns: the number of columns from the start square to the end square, negative to the left.
+    :param rows: the number of rows from the start square to the end square, negative upwards.
+    :param color: the RGBA color.
+    :param width: the width of the shaft, as a fraction of a square.
+    :return: the RGBA layer covering the rectangle of squares spanned by the arrow.
+    """
+    from PIL import Image, ImageDraw
+
+    size = square_size * _SUPERSAMPLING
+    # the centers of the start and end squares, in the layer
+    start_x, start_y = (max(-columns, 0) + 0.5) * size, (max(-rows, 0) + 0.5) * size
+    end_x, end_y = start_x + columns * size, start_y + rows * size
+    length = math.hypot(end_x - start_x, end_y - start_y)
+    along_x, along_y = (end_x - start_x) / length, (end_y - start_y) / length
+    across_x, across_y = -along_y, along_x
+
+    shaft = width * size / 2
+    head = 2.5 * shaft
+    head_length = 3 * shaft
+    base_x, base_y = end_x - along_x * head_length, end_y - along_y * head_length
+    points = [
+        (start_x + across_x * shaft, start_y + across_y * shaft),
+        (base_x + across_x * shaft, base_y + across_y * shaft),
+        (base_x + across_x * head, base_y + across_y * head),
+        (end_x, end_y),
+        (base_x - across_x * head, base_y - across_y * head),
+        (base_x - across_x * shaft, base_y - across_y * shaft),
+        (start_x - across_x * shaft, start_y - across_y * shaft),
+    ]
+
+    # transparent pixels have the color of the arrow, so that its reduced edges are not darkened
+    layer = Image.new("RGBA", ((abs(columns) + 1) * size, (abs(rows) + 1) * size), tuple(color[:3]) + (0,))
+    ImageDraw.Draw(layer).polygon(points, fill=tuple(color))
+    return layer.reduce(_SUPERSAMPLING)
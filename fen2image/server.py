@@ -0,0 +1,268 @@
+import argparse
+import json
+import os
+import random
+import time
+from concurrent.futures import Executor, TimeoutError
+from functools import partial
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional, Sequence, Tuple, Union
+from urllib.parse import parse_qs, urlsplit
+
+from .Fen import Fen
+from .RenderCache import RenderCache
+from .core import _make_pool, _render, _warm_up
+from .encoding import PRESETS
+from .instrumentation import MetricsCollector
+from .overlays import Arrow, Overlay, check, last_move
+from .utils import get_dict_available_boards, get_dict_available_pieces, get_list_available_boards
+from .warmup import preload
+
+# the largest board served, in pixels
+MAX_SIZE = 4096
+
+
+class RenderServer(ThreadingHTTPServer):
+    """
+    An HTTP server rendering positions, built on the standard library.
+
+    GET /render?fen=...&board=...&size=...&format=... answers the encoded image, format being one of the
+    encoding presets of fen2image.encoding ("png", "png-palette", "webp-lossy", "jpeg"...).
+    Overlays are drawn with lastmove=e2e4 (highlight of the move), check=e1 (king in check) and arrow=g1f3,
+    which may be repeated. The renders run on a pool of workers started with the server, each of which decodes
+    the boards and resizes the sprites of the configured designs and sizes before the first request (see
+    fen2image.preload). The encoded responses are kept in a RenderCache.
+    The ETag of a response is derived from the normalized position (placement and side to move), the design,
+    the size and the format, so a repeated request with If-None-Match is answered 304 without rendering.
+    A random board is resolved per request: its response is neither cached nor given an ETag.
+    GET /metrics answers the request counters, the cache statistics and the latencies in the Prometheus text format.
+    """
+
+    daemon_threads = True
+
+    def __init__(
+        self,
+        address: Tuple[str, int] = ("127.0.0.1", 8000),
+        executor: Union[str, Executor] = "process",
+        max_workers: Optional[int] = None,
+        cache_entries: int = 1024,
+        max_age: int = 86400,
+        render_timeout: float = 30.0,
+        log_requests: bool = True,
+        boards: Optional[Sequence[str]] = None,
+        sizes: Sequence[Optional[int]] = (None,)
+    ) -> None:
+        """
+        Start the workers and bind the server. Call serve_forever() to answer requests.
+
+        :param address: the (host, port) to listen on.
+        :param executor: "process", "thread", or an Executor to render on (it is not shut down).
+        :param max_workers: the number of workers of the pool, the number of CPUs by default.
+        :param cache_entries: the number of encoded images kept in memory.
+        :param max_age: the max-age of the Cache-Control header, in seconds.
+        :param render_timeout: the time a render may take before the request is answered 504.
+        :param log_requests: log each request to the standard error.
+        :param boards: the board designs loaded by every worker before the first request, all of them by default.
+        :param sizes: the sizes loaded by every worker, None for the native size of the boards.
+        """
+        for design in boards or ():
+            if design not in get_list_available_boards():
+                raise ValueError(f"Board design '{design}' is not available. Available designs are: {get_list_available_boards()}")
+        for size in sizes:
+            if size is not None and not 16 <= size <= MAX_SIZE:
+                raise ValueError(f"Sizes must be between 16 and {MAX_SIZE}, got {list(sizes)}")
+        # nothing is forked from the workers, gc.freeze would not share any page
+        self._preload = partial(preload, boards, ("classic",), tuple(sizes), freeze=False)
+        self.pool = _make_pool(executor, max_workers, self._preload)
+        self._owns_pool = self.pool is not executor
+        self._workers = (max_workers or os.cpu_count() or 1) if self._owns_pool else 1
+        self.cache = RenderCache(max_entries=cache_entries)
+        self.max_age = max_age
+        self.render_timeout = render_timeout
+        self.log_requests = log_requests
+        self.metrics = MetricsCollector()
+        self._warm()
+        super().__init__(address, _Handler)
+
+    def render(self, query: Dict[str, List[str]], if_none_match: Optional[str] = None) -> Tuple[int, Dict[str, str], bytes]:
+        """
+        Answer a render request.
+
+        :param query: the parsed query string.
+        :param if_none_match: the If-None-Match header of the request.
+        :return: the status, the headers and the body of the response.
+        """
+        fen = _single(query, "fen")
+        board_design = _single(query, "board") or "random"
+        image_format = (_single(query, "format") or "png").lower()
+        size = _single(query, "size")
+        if fen is None:
+            return _error(HTTPStatus.BAD_REQUEST, "The fen parameter is required.")
+        encoding = PRESETS.get(image_format)
+        if encoding is None:
+            return _error(HTTPStatus.BAD_REQUEST, f"Format '{image_format}' is not available. Available formats are: {list(PRESETS)}")
+        if size is not None:
+            if not size.isdigit() or not 16 <= int(size) <= MAX_SIZE:
+                return _error(HTTPStatus.BAD_REQUEST, f"Size must be an integer between 16 and {MAX_SIZE}, got '{size}'.")
+            size = int(size)
+        is_random = board_design == "random"
+        if is_random:
+            board_design = random.choice(get_list_available_boards())
+        elif board_design not in get_list_available_boards():
+            return _error(HTTPStatus.BAD_REQUEST, f"Board design '{board_design}' is not available. Available designs are: {get_list_available_boards()}")
+        try:
+            board = Fen(fen).to_board_representation()
+            overlays = _overlays(query)
+        except ValueError as error:
+            return _error(HTTPStatus.BAD_REQUEST, str(error))
+
+        headers = {"Content-Type": encoding.mime_type}
+        key = None
+        if is_random:
+            headers["Cache-Control"] = "no-store"
+        else:
+            key = self.cache.make_key(board.placement(), board.color_turn, board_design, "classic",
+                                      size=None if size is None else size // 8, format=image_format, overlays=overlays,
+                                      board_path=get_dict_available_boards()[board_design],
+                                      pieces_path=get_dict_available_pieces()["classic"])
+            etag = f'"{key[:32]}"'
+            headers["ETag"] = etag
+            headers["Cache-Control"] = f"public, max-age={self.max_age}"
+            if if_none_match is not None and etag in (tag.strip() for tag in if_none_match.split(",")):
+                return HTTPStatus.NOT_MODIFIED, headers, b""
+            body = self.cache.get(key)
+            if body is not None:
+                return HTTPStatus.OK, headers, body
+
+        start = time.perf_counter()
+        future = self.pool.submit(_render, 0, fen, board_design, size, encoding, overlays)
+        try:
+            result = future.result(timeout=self.render_timeout)
+        except TimeoutError:
+            future.cancel()
+            return _error(HTTPStatus.GATEWAY_TIMEOUT, f"The render took more than {self.render_timeout} s.")
+        self.metrics.timing("render", time.perf_counter() - start)
+        if result.error is not None:
+            return _error(HTTPStatus.BAD_REQUEST, str(result.error))
+        if key is not None:
+            self.cache.put(key, result.image)
+        return HTTPStatus.OK, headers, result.image
+
+    def metrics_text(self) -> str:
+        """
+        :return: the metrics of the server in the Prometheus text format.
+        """
+        stats = self.metrics.stats()
+        lines = ["# TYPE fen2image_requests_total counter"]
+        for counter, value in sorted(stats["counters"].items()):
+            lines.append(f'fen2image_requests_total{{status="{counter}"}} {value}')
+        cache = self.cache.stats()
+        for name in ("hits", "misses", "evictions"):
+            lines.append(f"# TYPE fen2image_render_cache_{name}_total counter")
+            lines.append(f"fen2image_render_cache_{name}_total {cache[name]}")
+        lines.append("# TYPE fen2image_render_cache_entries gauge")
+        lines.append(f"fen2image_render_cache_entries {cache['size']}")
+        for stage in ("request", "render"):
+            timing = stats["timings"].get(stage)
+            lines.append(f"# TYPE fen2image_{stage}_seconds summary")
+            if timing is not None:
+                for quantile in (50, 90, 99):
+                    lines.append(f'fen2image_{stage}_seconds{{quantile="0.{quantile}"}} {timing[f"p{quantile}"]:.6f}')
+            lines.append(f"fen2image_{stage}_seconds_sum {timing['total'] if timing else 0:.6f}")
+            lines.append(f"fen2image_{stage}_seconds_count {timing['count'] if timing else 0}")
+        return "\n".join(lines) + "\n"
+
+    def server_close(self) -> None:
+        super().server_close()
+        if self._owns_pool:
+            self.pool.shutdown(wait=True, cancel_futures=True)
+
+    def _warm(self) -> None:
+        """
+        Start every worker of the pool before the first request, each one preloads the designs as it starts.
+        The workers of an executor given to the server are not started by it, the designs are preloaded once.
+        """
+        task = _warm_up if self._owns_pool else self._preload
+        for future in [self.pool.submit(task) for _ in range(self._workers)]:
+            future.result()
+
+
+class _Handler(BaseHTTPRequestHandler):
+    server: RenderServer
+
+    def do_GET(self) -> None:
+        start = time.perf_counter()
+        url = urlsplit(self.path)
+        if url.path == "/render":
+            status, headers, body = self.server.render(parse_qs(url.query), self.headers.get("If-None-Match"))
+        elif url.path == "/metrics":
+            status, headers, body = HTTPStatus.OK, {"Content-Type": "text/plain; version=0.0.4"}, self.server.metrics_text().encode()
+        else:
+            status, headers, body = _error(HTTPStatus.NOT_FOUND, f"Unknown path '{url.path}', expected /render or /metrics.")
+
+        self.send_response(status)
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+        self.server.metrics.increment(str(int(status)))
+        self.server.metrics.timing("request", time.perf_counter() - start)
+
+    def log_message(self, format: str, *args) -> None:
+        if self.server.log_requests:
+            super().log_message(format, *args)
+
+
+def _single(query: Dict[str, List[str]], name: str) -> Optional[str]:
+    values = query.get(name)
+    return values[-1] if values else None
+
+
+def _overlays(query: Dict[str, List[str]]) -> Tuple[Overlay, ...]:
+    overlays = []
+    move = _single(query, "lastmove")
+    if move is not None:
+        overlays.extend(last_move(move))
+    square = _single(query, "check")
+    if square is not None:
+        overlays.append(check(square))
+    for arrow in query.get("arrow", []):
+        if len(arrow) != 4:
+            raise ValueError(f"Arrow '{arrow}' is not valid. Arrows are given by their start and end squares, e.g. 'g1f3'")
+        overlays.append(Arrow(arrow[:2], arrow[2:]))
+    return tuple(overlays)
+
+
+def _error(status: HTTPStatus, message: str) -> Tuple[int, Dict[str, str], bytes]:
+    return status, {"Content-Type": "application/json", "Cache-Control": "no-store"}, json.dumps({"error": message}).encode()
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(prog="python -m fen2image.server", description="Serve rendered positions over HTTP.")
+    parser.add_argument("--host", default="127.0.0.1", help="the address to listen on")
+    parser.add_argument("--port", type=int, default=8000, help="the port to listen on")
+    parser.add_argument("--workers", type=int, help="the number of worker processes, the number of CPUs by default")
+    parser.add_argument("--cache-entries", type=int, default=1024, help="the number of encoded images kept in memory")
+    parser.add_argument("--max-age", type=int, default=86400, help="the max-age of the responses, in seconds")
+    parser.add_argument("--quiet", action="store_true", help="do not log the requests")
+    parser.add_argument("--boards", nargs="+", help="the board designs loaded by the workers on start, all of them by default")
+    parser.add_argument("--sizes", nargs="+", type=int, help="the sizes loaded by the workers on start, the native size by default")
+    args = parser.parse_args(argv)
+
+    try:
+        server = RenderServer((args.host, args.port), max_workers=args.workers, cache_entries=args.cache_entries,
+                              max_age=args.max_age, log_requests=not args.quiet, boards=args.boards, sizes=args.sizes or (None,))
+    except ValueError as error:
+        parser.error(str(error))
+    with server:
+        print(f"Serving on http://{args.host}:{server.server_port}/render?fen=...")
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+
+
+if __name__ == "__main__":
+    main()
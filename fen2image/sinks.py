@@ -0,0 +1,186 @@
+from __future__ import annotations
+
+import io
+import queue
+import threading
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import Any, BinaryIO, List, Optional, Tuple, Union, TYPE_CHECKING
+
+from .encoding import Encoding
+
+if TYPE_CHECKING:
+    from PIL import Image
+
+
+class Sink(ABC):
+    """
+    Where a rendered image is written. create_image hands its result to the sink given as output.
+    """
+
+    @abstractmethod
+    def write(self, image: Image.Image) -> None:
+        """
+        Write the image.
+
+        :param image: the rendered image.
+        """
+
+
+class BytesSink(Sink):
+    """
+    Encode the image to an in-memory buffer.
+    """
+
+    def __init__(self, format: Union[str, Encoding] = "PNG", **params: Any) -> None:
+        """
+        :param format: the Pillow format of the encoding, or an Encoding.
+        :param params: extra options for Image.save, e.g. compress_level.
+        """
+        self.format = format
+        self.params = params
+        self._buffer = io.BytesIO()
+
+    def write(self, image: Image.Image) -> None:
+        self._buffer = io.BytesIO()
+        _save(image, self._buffer, self.format, self.params)
+
+    def getvalue(self) -> bytes:
+        """
+        :return: the encoded bytes of the last image written.
+        """
+        return self._buffer.getvalue()
+
+
+class FileSink(Sink):
+    """
+    Encode the image to a path or to a file object.
+    """
+
+    def __init__(self, target: Union[str, Path, BinaryIO], format: Optional[Union[str, Encoding]] = None, **params: Any) -> None:
+        """
+        :param target: a path, or a binary file object open for writing.
+        :param format: the Pillow format or an Encoding, guessed from the extension of a path by default.
+            File objects are written as PNG unless told otherwise.
+        :param params: extra options for Image.save, e.g. compress_level.
+        """
+        self.target = target
+        if format is None and not isinstance(target, (str, Path)):
+            format = "PNG"
+        self.format = format
+        self.params = params
+
+    def write(self, image: Image.Image) -> None:
+        _save(image, self.target, self.format, self.params)
+
+
+class BackgroundWriter:
+    """
+    Encode and write images on a background thread, so the render returns before the image hits the disk.
+
+    The queue of pending writes is bounded: when it is full, the render waits for a free slot.
+    Errors raised while writing are kept in errors instead of being lost with the thread.
+    """
+
+    def __init__(self, max_pending: int = 64) -> None:
+        """
+        :param max_pending: the maximum number of images waiting to be written.
+        """
+        if max_pending < 1:
+            raise ValueError(f"max_pending must be superior or equal to 1, got {max_pending}")
+        self.errors: List[Tuple[Any, Exception]] = []
+        self._queue: "queue.Queue[Optional[Tuple[Image.Image, Sink]]]" = queue.Queue(max_pending)
+        self._thread = threading.Thread(target=self._run, name="fen2image-writer", daemon=True)
+        self._thread.start()
+
+    def __enter__(self) -> "BackgroundWriter":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def sink(self, target: Union[str, Path, BinaryIO], format: Optional[Union[str, Encoding]] = None, **params: Any) -> Sink:
+        """
+        Get a sink queueing its image to this writer.
+
+        :param target: a path, or a binary file object open for writing.
+        :param format: the Pillow format or an Encoding, guessed from the extension of a path by default.
+        :param params: extra options for Image.save.
+        :return: the sink, to be given as output to create_image.
+        """
+        return _QueuedSink(self, FileSink(target, format, **params))
+
+    def submit(self, image: Image.Image, sink: Sink) -> None:
+        """
+        Queue an image to be written by a sink.
+
+        :param image: the image. A copy is queued, the caller may keep modifying the original.
+        :param sink: the sink writing the image on the background thread.
+        """
+        if not self._thread.is_alive():
+            raise RuntimeError("BackgroundWriter is closed.")
+        self._queue.put((image.copy(), sink))
+
+    def flush(self) -> None:
+        """
+        Wait until every queued image is written.
+        """
+        self._queue.join()
+
+    def close(self) -> None:
+        """
+        Write the queued images and stop the thread.
+        """
+        if self._thread.is_alive():
+            self._queue.put(None)
+            self._thread.join()
+
+    def _run(self) -> None:
+        while True:
+            item = self._queue.get()
+            try:
+                if item is None:
+                    return
+                image, sink = item
+                try:
+                    sink.write(image)
+                except Exception as error:
+                    self.errors.append((getattr(sink, "target", sink), error))
+            finally:
+                self._queue.task_done()
+
+
+class _QueuedSink(Sink):
+
+    def __init__(self, writer: BackgroundWriter, sink: Sink) -> None:
+        self.writer = writer
+        self.sink = sink
+        self.target = getattr(sink, "target", None)
+
+    def write(self, image: Image.Image) -> None:
+        self.writer.submit(image, self.sink)
+
+
+# what create_image accepts as output
+Output = Union[None, str, Path, BinaryIO, Sink]
+
+
+def as_sink(output: Output) -> Optional[Sink]:
+    """
+    Get the sink matching an output argument.
+
+    :param output: None to write nothing, a path, a binary file object, or a Sink.
+    :return: the sink, None when nothing has to be written.
+    """
+    if output is None or isinstance(output, Sink):
+        return output
+    if isinstance(output, (str, Path)) or hasattr(output, "write"):
+        return FileSink(output)
+    raise ValueError(f"Output must be None, a path, a file object or a Sink, got {output!r}")
+
+
+def _save(image: Image.Image, fp, format: Optional[Union[str, Encoding]], params: dict) -> None:
+    if isinstance(format, Encoding):
+        format.save(image, fp)
+    else:
+        image.save(fp, format=format, **params)
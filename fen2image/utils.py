@@ -1,4 +1,5 @@
 from .constants import *
+from .AssetRegistry import registry
 
 
 def get_list_available_boards() -> list[str]:
@@ -7,7 +8,7 @@ def get_list_available_boards() -> list[str]:
 
     :return: a list of available boards
     """
-    return [_.name.split('.')[0] for _ in PATH_BOARDS.iterdir() if _.is_file()]
+    return list(registry.boards)
 
 def get_list_available_pieces() -> list[str]:
     """
@@ -15,7 +16,7 @@ def get_list_available_pieces() -> list[str]:
 
     :return: a list of available pieces
     """
-    return [_.name for _ in PATH_PIECES.iterdir()]
+    return list(registry.pieces)
 
 def get_dict_available_boards() -> dict[str, Path]:
     """
@@ -23,7 +24,7 @@ def get_dict_available_boards() -> dict[str, Path]:
 
     :return: a dictionary of available boards with their name as key and their path as value
     """
-    return {_.name.split('.')[0]: _ for _ in PATH_BOARDS.iterdir() if _.is_file()}
+    return {name: asset.path for name, asset in registry.boards.items()}
 
 def get_dict_available_pieces() -> dict[str, Path]:
     """
@@ -31,4 +32,18 @@ def get_dict_available_pieces() -> dict[str, Path]:
 
     :return: a dictionary of available pieces with their name as key and their path as value
     """
-    return {_.name: _ for _ in PATH_PIECES.iterdir()}
\ No newline at end of file
+    return {name: asset.path for name, asset in registry.pieces.items()}
+
+def register_asset_directory(directory: Path) -> None:
+    """
+    Make the boards and pieces of another directory available.
+
+    :param directory: a directory laid out as resources/arts, with a "boards" and/or a "pieces" directory
+    """
+    registry.register_directory(directory)
+
+def refresh_assets() -> None:
+    """
+    Scan the asset directories again, to pick up designs added since the first render.
+    """
+    registry.refresh()
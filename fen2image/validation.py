@@ -0,0 +1,232 @@
+import argparse
+import hashlib
+import mmap
+import os
+import re
+import sys
+from concurrent.futures import Executor
+from typing import Dict, List, NamedTuple, Optional, Tuple, Union
+
+from .BoardRepresentation import expand_empty_squares
+from .Fen import Fen, _EXPANDED_PLACEMENT, check_position
+from .core import _make_pool
+
+# a FEN in its usual form: castling rights in KQkq order, no leading zero in the counters. The lines it
+# does not match go through Fen.verify, which accepts the other forms and explains the errors.
+_USUAL_FEN = re.compile(r"([1-8rnbqkpRNBQKP/]+) [wb] (?:-|K?Q?k?q?) (?:-|[a-h][1-8]) (?:0|[1-9][0-9]*) [1-9][0-9]*")
+# the number of placements whose outcome a worker remembers, scraped datasets repeat the same positions a lot
+_MAX_PLACEMENTS = 1 << 20
+
+
+class ValidationReport(NamedTuple):
+    """
+    The outcome of validating a file of FEN strings.
+
+    :param lines: the number of FEN lines checked. Blank lines and lines starting with "#" are skipped.
+    :param valid: the number of valid lines, duplicates included.
+    :param errors: the (line number, error message) of the invalid lines, numbered from 1.
+    :param duplicates: the numbers of the valid lines whose placement is on an earlier valid line, when deduplicating.
+    """
+    lines: int
+    valid: int
+    errors: List[Tuple[int, str]]
+    duplicates: List[int]
+
+
+class _Chunk(NamedTuple):
+    # line numbers are counted from 0 at the start of the chunk
+    line_count: int
+    lines: int
+    valid: int
+    errors: List[Tuple[int, str]]
+    duplicates: List[int]
+    # (line number, placement digest) of the first valid line of each placement, when deduplicating
+    placements: List[Tuple[int, bytes]]
+
+
+def validate_file(
+    path: Union[str, os.PathLike],
+    semantic: bool = True,
+    dedup: bool = False,
+    output: Optional[Union[str, os.PathLike]] = None,
+    executor: Union[str, Executor] = "process",
+    max_workers: Optional[int] = None,
+    chunk_bytes: int = 16 * 1024 * 1024
+) -> ValidationReport:
+    """
+    Validate a file of FEN strings, one per line, on a pool of workers.
+
+    The file is memory-mapped and split into chunks of whole lines, each worker maps it again and checks
+    its chunk: the lines are not sent to the workers. Each line goes through the checks of Fen.verify,
+    with a fast path for the usual form of FEN strings, and each distinct placement is checked once.
+
+    :param path: the file, ASCII or UTF-8.
+    :param semantic: also reject positions that cannot occur in a game, without exactly one king per side
+        or with pawns on the first or last rank (see fen2image.Fen.check_position).
+    :param dedup: report the valid lines whose normalized placement is on an earlier valid line, whatever
+        the other fields, as their images are the same but for the turn indicator.
+    :param output: write the valid lines there, in input order and stripped, without the duplicates when deduplicating.
+    :param executor: "process", "thread", or an Executor to submit to (it is not shut down).
+    :param max_workers: the number of workers of the pool, the number of CPUs by default.
+    :param chunk_bytes: the size of the chunks, in bytes.
+    :return: the ValidationReport.
+    """
+    if max_workers is None:
+        max_workers = os.cpu_count() or 1
+    if max_workers < 1:
+        raise ValueError(f"max_workers must be superior or equal to 1, got {max_workers}")
+    if chunk_bytes < 1:
+        raise ValueError(f"chunk_bytes must be superior or equal to 1, got {chunk_bytes}")
+    path = os.fspath(path)
+    ranges = _split(path, chunk_bytes)
+
+    pool = _make_pool(executor, max_workers)
+
+    try:
+        futures = [pool.submit(_validate_chunk, path, start, end, semantic, dedup) for start, end in ranges]
+        lines = valid = first_line = 0
+        errors, duplicates = [], []
+        seen = set()
+        for future in futures:
+            chunk = future.result()
+            lines += chunk.lines
+            valid += chunk.valid
+            errors.extend((first_line + number + 1, message) for number, message in chunk.errors)
+            duplicates.extend(first_line + number + 1 for number in chunk.duplicates)
+            for number, placement in chunk.placements:
+                if placement in seen:
+                    duplicates.append(first_line + number + 1)
+                else:
+                    seen.add(placement)
+            first_line += chunk.line_count
+    finally:
+        if pool is not executor:
+            pool.shutdown(wait=True, cancel_futures=True)
+
+    duplicates.sort()
+    if output is not None:
+        _write_valid_lines(path, output, {number for number, _ in errors}.union(duplicates))
+    return ValidationReport(lines, valid, errors, duplicates)
+
+
+def _split(path: str, chunk_bytes: int) -> List[Tuple[int, int]]:
+    """
+    Split a file into byte ranges of whole lines.
+
+    :param path: the file.
+    :param chunk_bytes: the approximate size of a range.
+    :return: the (start, end) ranges, in file order.
+    """
+    size = os.path.getsize(path)
+    if size == 0:
+        return []
+    ranges = []
+    with open(path, "rb") as file, mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as data:
+        start = 0
+        while start < size:
+            newline = data.find(b"\n", min(start + chunk_bytes, size) - 1)
+            end = size if newline == -1 else newline + 1
+            ranges.append((start, end))
+            start = end
+    return ranges
+
+
+def _validate_chunk(path: str, start: int, end: int, semantic: bool, dedup: bool) -> _Chunk:
+    with open(path, "rb") as file, mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as data:
+        lines = data[start:end].split(b"\n")
+    if not lines[-1]:
+        lines.pop()
+
+    checked = valid = 0
+    errors, duplicates = [], []
+    firsts = {}
+    placements = {}
+    for number, line in enumerate(lines):
+        line = line.strip()
+        if not line or line.startswith(b"#"):
+            continue
+        checked += 1
+        try:
+            board = _check_line(line.decode("utf-8"), semantic, placements)
+        except UnicodeDecodeError:
+            errors.append((number, "Invalid FEN: The line is not UTF-8 text."))
+            continue
+        except ValueError as error:
+            errors.append((number, str(error)))
+            continue
+        valid += 1
+        if dedup:
+            if board in firsts:
+                duplicates.append(number)
+            else:
+                firsts[board] = number
+    # digests are smaller to send back than the boards
+    digests = [(number, hashlib.blake2b(board, digest_size=16).digest()) for board, number in firsts.items()]
+    return _Chunk(len(lines), checked, valid, errors, duplicates, digests)
+
+
+def _check_line(fen: str, semantic: bool, placements: Dict[str, Union[bytes, str]]) -> bytes:
+    """
+    Verify a FEN string like Fen.verify.
+
+    :param fen: the FEN string.
+    :param semantic: also check the position with check_position.
+    :param placements: the board, or the error message, of the placements already checked.
+    :return: the 64 squares of the board, from a8 to h1.
+    """
+    match = _USUAL_FEN.fullmatch(fen)
+    if match is None:
+        # unusual or invalid, the checks of Fen accept it or raise the error
+        parsed = Fen(fen)
+        parsed.verify(semantic)
+        return parsed._board
+
+    placement = match.group(1)
+    board = placements.get(placement)
+    if board is None:
+        # the other fields are valid, an error can only come from the placement
+        try:
+            expanded = expand_empty_squares(placement)
+            if not _EXPANDED_PLACEMENT.fullmatch(expanded):
+                Fen(fen).verify(semantic)
+            board = expanded.replace("/", "").encode("ascii")
+            if semantic:
+                check_position(board)
+        except ValueError as error:
+            board = str(error)
+        if len(placements) >= _MAX_PLACEMENTS:
+            placements.clear()
+        placements[placement] = board
+    if isinstance(board, str):
+        raise ValueError(board)
+    return board
+
+
+def _write_valid_lines(path: str, output: Union[str, os.PathLike], dropped: set) -> None:
+    with open(path, "rb") as file, open(output, "wb") as destination:
+        for number, line in enumerate(file, 1):
+            line = line.strip()
+            if line and not line.startswith(b"#") and number not in dropped:
+                destination.write(line + b"\n")
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m fen2image.validation", description="Validate a file of FEN strings, one per line.")
+    parser.add_argument("input", help="the file of FEN strings")
+    parser.add_argument("-o", "--output", help="write the valid lines to this file")
+    parser.add_argument("--dedup", action="store_true", help="drop the lines whose placement is on an earlier line")
+    parser.add_argument("--no-semantic", dest="semantic", action="store_false", help="accept positions without one king per side")
+    parser.add_argument("-j", "--workers", type=int, default=None, help="the number of worker processes, the number of CPUs by default")
+    parser.add_argument("-q", "--quiet", action="store_true", help="do not list the invalid lines")
+    args = parser.parse_args(argv)
+
+    report = validate_file(args.input, semantic=args.semantic, dedup=args.dedup, output=args.output, max_workers=args.workers)
+    if not args.quiet:
+        for number, message in report.errors:
+            print(f"{args.input}:{number}: {message}", file=sys.stderr)
+    print(f"{report.lines} lines, {report.valid} valid, {len(report.errors)} invalid, {len(report.duplicates)} duplicates", file=sys.stderr)
+    return 1 if report.errors else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,109 @@
+import gc
+from typing import Dict, Iterable, Optional
+
+from .AssetRegistry import registry
+from .BoardPyramid import board_pyramid
+from .BoardRepresentation import compose_tile
+from .SpriteStore import sprite_store
+from .TileStore import tile_store
+from .numpy_backend import PIECES, sprite_stack
+
+
+def preload(
+    boards: Optional[Iterable[str]] = None,
+    piece_sets: Iterable[str] = ("classic",),
+    sizes: Iterable[Optional[int]] = (None,),
+    numpy: bool = False,
+    tiles: bool = False,
+    freeze: bool = True
+) -> Dict[str, int]:
+    """
+    Decode and resize everything the renders will need, ahead of time.
+
+    Call it in the parent process of a pre-forking server (gunicorn's preload_app, a multiprocessing
+    pool started with fork...) before the workers are forked: the boards, the sprites and the turn
+    indicators then live in the module-level caches inherited by every worker, whose pages are shared
+    copy-on-write instead of being decoded again on the first requests of each worker.
+    The bounds of the caches are raised when the preloaded images would not fit in them.
+
+    :param boards: the board designs, every available design by default ("random" may pick any of them).
+    :param piece_sets: the pieces designs.
+    :param sizes: the board widths in pixels, as given to create_image(size=...). None for the native size.
+    :param numpy: also stack the sprites for the "numpy" backend (requires NumPy).
+    :param tiles: also compose every tile of the "tiles" backend, 768 per board, pieces design and size.
+    :param freeze: move every object tracked by the garbage collector to the permanent generation (gc.freeze),
+        so that collections in the workers do not write to the shared pages.
+    :return: the number of boards, sprites and tiles loaded, and the memory used by the boards in bytes.
+    """
+    available_boards = registry.boards
+    available_pieces = registry.pieces
+    boards = list(available_boards) if boards is None else list(boards)
+    piece_sets = list(piece_sets)
+    sizes = list(sizes)
+    for design in boards:
+        if design not in available_boards:
+            raise ValueError(f"Board design '{design}' is not available. Available designs are: {list(available_boards)}")
+    for design in piece_sets:
+        if design not in available_pieces:
+            raise ValueError(f"Pieces design '{design}' is not available. Available designs are: {list(available_pieces)}")
+    if any(size is not None and size < 16 for size in sizes):
+        raise ValueError(f"Sizes must be superior or equal to 16, got {sizes}")
+
+    # the square sizes drawn, per board: the native one depends on the board
+    square_sizes = set()
+    board_bytes = 0
+    for design in boards:
+        width, height = available_boards[design].size
+        for size in sizes:
+            square_size = width // 8 if size is None else size // 8
+            square_sizes.add(square_size)
+            board_bytes += 64 * square_size * square_size * 4
+        # the native board is decoded to reduce PNG boards, and kept
+        board_bytes += width * height * 4
+
+    sprite_count = len(square_sizes) * (12 * len(piece_sets) + 2)
+    sprite_store.max_entries = max(sprite_store.max_entries, sprite_count)
+    board_pyramid.max_bytes = max(board_pyramid.max_bytes, board_bytes)
+    if tiles:
+        tile_bytes = sum(
+            64 * len(PIECES) * square_size * square_size * 4 * len(piece_sets)
+            for design in boards
+            for square_size in {available_boards[design].size[0] // 8 if size is None else size // 8 for size in sizes}
+        )
+        tile_store.max_bytes = max(tile_store.max_bytes, tile_bytes)
+
+    for design in boards:
+        path = available_boards[design].path
+        for size in sizes:
+            board_pyramid.get(design, None if size is None else size // 8, path)
+    for square_size in square_sizes:
+        for design in piece_sets:
+            for piece in PIECES:
+                sprite_store.get_piece(design, piece, square_size, available_pieces[design].path)
+            if numpy:
+                sprite_stack(design, square_size, available_pieces[design].path)
+        for color_turn in "wb":
+            sprite_store.get_frame(color_turn, square_size)
+
+    tile_count = 0
+    if tiles:
+        for design in boards:
+            path = available_boards[design].path
+            for size in sizes:
+                board = board_pyramid.get(design, None if size is None else size // 8, path)
+                square_size = board.width // 8
+                for pieces_design in piece_sets:
+                    for piece in PIECES:
+                        sprite = sprite_store.get_piece(pieces_design, piece, square_size, available_pieces[pieces_design].path)
+                        for index in range(64):
+                            # keyed like the renders of the "tiles" backend
+                            tile_store.get(
+                                (path, available_pieces[pieces_design].path, square_size, index, piece),
+                                lambda: compose_tile(board, sprite, index, square_size)
+                            )
+                            tile_count += 1
+
+    if freeze:
+        gc.collect()
+        gc.freeze()
+    return {"boards": len(boards) * len(sizes), "sprites": sprite_count, "tiles": tile_count, "bytes": board_pyramid.stats()["bytes"]}
@@ -0,0 +1,87 @@
+import asyncio
+import threading
+import unittest
+from unittest.mock import patch
+
+from PIL import Image
+
+from fen2image.aio import AsyncRenderer, fen2image_async
+
+
+class TestAsyncRenderer(unittest.TestCase):
+
+    def setUp(self):
+        self.fen = "rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1"
+
+    def test_render_matches_sync(self):
+        from fen2image.core import fen2image
+        image = asyncio.run(fen2image_async(self.fen, board_design="green2"))
+        self.assertIsInstance(image, Image.Image)
+        self.assertEqual(image.tobytes(), fen2image(self.fen, board_design="green2").tobytes())
+
+    def test_options_are_passed(self):
+        from fen2image.core import fen2bytes, fen2image
+        from fen2image.overlays import last_move
+        overlays = last_move("e2e4")
+        image = asyncio.run(fen2image_async(self.fen, board_design="green2", size=128, overlays=overlays))
+        self.assertEqual(image.tobytes(), fen2image(self.fen, board_design="green2", size=128, overlays=overlays).tobytes())
+        data = asyncio.run(fen2image_async(self.fen, board_design="green2", encoding="png-fast", size=128))
+        self.assertEqual(data, fen2bytes(self.fen, board_design="green2", encoding="png-fast", size=128))
+
+    def test_invalid_fen_raises(self):
+        with self.assertRaises(ValueError):
+            asyncio.run(fen2image_async("not a fen"))
+
+    def test_invalid_max_concurrency(self):
+        with self.assertRaises(ValueError):
+            AsyncRenderer(max_concurrency=0)
+
+    def test_concurrency_is_bounded(self):
+        running = 0
+        peak = 0
+        lock = threading.Lock()
+
+        def slow_render(fen, board_design):
+            nonlocal running, peak
+            with lock:
+                running += 1
+                peak = max(peak, running)
+            threading.Event().wait(0.02)
+            with lock:
+                running -= 1
+            return fen
+
+        async def main():
+            async with AsyncRenderer(max_concurrency=2) as renderer:
+                return await asyncio.gather(*(renderer.render(str(index)) for index in range(6)))
+
+        with patch("fen2image.aio.fen2image", side_effect=slow_render):
+            results = asyncio.run(main())
+        self.assertEqual(results, [str(index) for index in range(6)])
+        self.assertLessEqual(peak, 2)
+
+    def test_timeout_keeps_slot_until_render_finishes(self):
+        release = threading.Event()
+
+        def blocked_render(fen, board_design):
+            release.wait(5)
+            return fen
+
+        async def main():
+            renderer = AsyncRenderer(max_concurrency=1)
+            with self.assertRaises(asyncio.TimeoutError):
+                await renderer.render("first", timeout=0.05)
+            # the first render still holds the only slot
+            with self.assertRaises(asyncio.TimeoutError):
+                await renderer.render("second", timeout=0.05)
+            release.set()
+            result = await renderer.render("third", timeout=5)
+            renderer.close()
+            return result
+
+        with patch("fen2image.aio.fen2image", side_effect=blocked_render):
+            self.assertEqual(asyncio.run(main()), "third")
+
+
+if __name__ == '__main__':
+    unittest.main()
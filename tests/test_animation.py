@@ -0,0 +1,79 @@
+import io
+import tempfile
+import unittest
+from pathlib import Path
+
+from PIL import Image, ImageSequence
+
+from fen2image.animation import save_animation
+from fen2image.Fen import Fen
+
+GAME = [
+    "rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1",
+    "rnbqkbnr/pppppppp/8/8/4P3/8/PPPP1PPP/RNBQKBNR b KQkq e3 0 1",
+    "rnbqkbnr/pppp1ppp/8/4p3/4P3/8/PPPP1PPP/RNBQKBNR w KQkq e6 0 2",
+]
+
+
+class NonSeekable(io.BytesIO):
+
+    def seekable(self):
+        return False
+
+
+class TestSaveAnimation(unittest.TestCase):
+
+    def setUp(self):
+        self.expected = [Fen(fen).to_board_representation().create_image(board_design="green2") for fen in GAME]
+
+    def _frames(self, data):
+        return [frame.convert("RGBA") for frame in ImageSequence.Iterator(Image.open(io.BytesIO(data)))]
+
+    def test_apng_frames_are_exact(self):
+        buffer = io.BytesIO()
+        save_animation(iter(GAME), buffer, "APNG", board_design="green2", duration=250)
+        frames = self._frames(buffer.getvalue())
+        self.assertEqual(len(frames), len(GAME))
+        for frame, expected in zip(frames, self.expected):
+            self.assertEqual(frame.tobytes(), expected.tobytes())
+
+    def test_apng_non_seekable_needs_a_sequence(self):
+        save_animation(GAME, NonSeekable(), "APNG", board_design="green2")
+        with self.assertRaises(ValueError):
+            save_animation(iter(GAME), NonSeekable(), "APNG", board_design="green2")
+
+    def test_gif(self):
+        for palette in ("shared", "adaptive"):
+            buffer = io.BytesIO()
+            save_animation(GAME, buffer, "GIF", board_design="green2", palette=palette)
+            image = Image.open(io.BytesIO(buffer.getvalue()))
+            self.assertEqual(image.format, "GIF")
+            self.assertEqual(image.n_frames, len(GAME))
+            self.assertEqual(image.size, self.expected[0].size)
+
+    def test_webp(self):
+        buffer = io.BytesIO()
+        save_animation(GAME, buffer, "WEBP", board_design="green2", lossless=True)
+        frames = self._frames(buffer.getvalue())
+        self.assertEqual(len(frames), len(GAME))
+        self.assertEqual(frames[-1].tobytes(), self.expected[-1].tobytes())
+
+    def test_format_from_path(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = Path(directory) / "game.gif"
+            save_animation(GAME, path, board_design="green2")
+            self.assertEqual(Image.open(path).format, "GIF")
+
+    def test_invalid_arguments(self):
+        with self.assertRaises(ValueError):
+            save_animation(GAME, io.BytesIO())
+        with self.assertRaises(ValueError):
+            save_animation(GAME, "game.bmp")
+        with self.assertRaises(ValueError):
+            save_animation(GAME, io.BytesIO(), "GIF", palette="web")
+        with self.assertRaises(ValueError):
+            save_animation([], io.BytesIO(), "GIF")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,80 @@
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+from PIL import Image
+
+from fen2image.AssetRegistry import AssetRegistry
+from fen2image.Fen import Fen
+from fen2image.constants import PATH_ARTS, piece_to_filename
+
+
+class TestAssetRegistry(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.extra = Path(self.tmp.name)
+        (self.extra / "boards").mkdir()
+        Image.new("RGB", (80, 80), "red").save(self.extra / "boards" / "red.png")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_bundled_assets(self):
+        registry = AssetRegistry()
+        self.assertIn("wood", registry.boards)
+        self.assertIn("classic", registry.pieces)
+        self.assertEqual(registry.boards["wood"].format, "JPEG")
+        self.assertEqual(registry.boards["wood"].size, (1024, 1024))
+        self.assertEqual(registry.pieces["classic"].path, PATH_ARTS / "pieces" / "classic")
+
+    def test_directories_are_scanned_once(self):
+        registry = AssetRegistry()
+        with patch.object(Path, "iterdir", autospec=True, side_effect=Path.iterdir) as mock_iterdir:
+            registry.boards
+            registry.pieces
+            calls = mock_iterdir.call_count
+            registry.boards
+            registry.pieces
+            self.assertEqual(mock_iterdir.call_count, calls)
+
+    def test_register_directory(self):
+        registry = AssetRegistry()
+        self.assertNotIn("red", registry.boards)
+        registry.register_directory(self.extra)
+        self.assertIn("red", registry.boards)
+        self.assertIn("wood", registry.boards)
+        self.assertEqual(registry.boards["red"].size, (80, 80))
+
+    def test_register_missing_directory(self):
+        registry = AssetRegistry()
+        with self.assertRaises(ValueError):
+            registry.register_directory(self.extra / "missing")
+
+    def test_refresh(self):
+        registry = AssetRegistry([self.extra])
+        self.assertEqual(list(registry.boards), ["red"])
+        Image.new("RGB", (80, 80), "blue").save(self.extra / "boards" / "blue.png")
+        self.assertEqual(list(registry.boards), ["red"])
+        registry.refresh()
+        self.assertEqual(list(registry.boards), ["blue", "red"])
+
+    def test_overridden_design_is_rendered(self):
+        (self.extra / "pieces" / "classic").mkdir(parents=True)
+        for filename in piece_to_filename.values():
+            Image.new("RGBA", (40, 40), "red").save(self.extra / "pieces" / "classic" / filename)
+        board = Fen("k7/8/8/8/8/8/8/7K w - - 0 1").to_board_representation()
+        for backend in ("pil", "numpy", "tiles"):
+            registry = AssetRegistry()
+            with patch("fen2image.utils.registry", registry):
+                original = board.create_image(board_design="maple", backend=backend, size=256)
+                registry.register_directory(self.extra)
+                overridden = board.create_image(board_design="maple", backend=backend, size=256)
+                # a8 holds the black king, drawn one pixel to the left of its square
+                self.assertNotEqual(original.getpixel((16, 16)), (255, 0, 0, 255), backend)
+                self.assertEqual(overridden.getpixel((16, 16)), (255, 0, 0, 255), backend)
+
+
+if __name__ == '__main__':
+    unittest.main()
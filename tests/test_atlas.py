@@ -0,0 +1,111 @@
+import gc
+import tempfile
+import unittest
+from pathlib import Path
+
+from fen2image.atlas import Atlas, build_atlas
+from fen2image.Fen import Fen
+from fen2image.TileStore import tile_store
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+
+class TestAtlas(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.tmp = tempfile.TemporaryDirectory()
+        cls.path = build_atlas(Path(cls.tmp.name) / "maple.atlas", "maple", square_sizes=[32, 64])
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.tmp.cleanup()
+
+    def setUp(self):
+        self.atlas = Atlas(self.path)
+        self.board = Fen("r3k2r/p1ppqpb1/bn2pnp1/3PN3/1p2P3/2N2Q1p/PPPBBPPP/R3K2R b KQkq - 0 1").to_board_representation()
+
+    def tearDown(self):
+        gc.collect()
+        self.atlas.close()
+
+    def test_header(self):
+        self.assertEqual(self.atlas.board_design, "maple")
+        self.assertEqual(self.atlas.pieces_design, "classic")
+        self.assertEqual(self.atlas.native_square_size, 100)
+        self.assertEqual(self.atlas.square_sizes, [32, 64, 100])
+
+    def test_images(self):
+        self.assertEqual(self.atlas.board(32).size, (256, 256))
+        self.assertEqual(self.atlas.piece("K", 64).size, (64, 64))
+        self.assertEqual(self.atlas.frame("b", 64).size, (32, 32))
+        with self.assertRaises(ValueError):
+            self.atlas.board(50)
+
+    def test_close_with_live_images(self):
+        board = self.atlas.board(32)
+        with self.assertRaises(BufferError):
+            self.atlas.close()
+        # the atlas is still open
+        self.assertEqual(self.atlas.piece("K", 32).size, (32, 32))
+        del board
+        gc.collect()
+        self.atlas.close()
+
+    def test_render_matches_decoded_assets(self):
+        expected = self.board.create_image(board_design="maple")
+        image = self.board.create_image(atlas=self.atlas)
+        self.assertEqual(image.tobytes(), expected.tobytes())
+
+    def test_sized_render_matches_decoded_assets(self):
+        expected = self.board.create_image(board_design="maple", size=256)
+        image = self.board.create_image(atlas=self.atlas, size=256)
+        self.assertEqual(image.tobytes(), expected.tobytes())
+        with self.assertRaises(ValueError):
+            self.board.create_image(atlas=self.atlas, size=400)
+
+    @unittest.skipIf(numpy is None, "NumPy is not installed")
+    def test_rebuilt_atlas_with_tiles_backend(self):
+        path = Path(self.tmp.name) / "rebuilt.atlas"
+        build_atlas(path, "wood", square_sizes=[32])
+        with Atlas(path) as atlas:
+            wood = self.board.create_image(atlas=atlas, size=256, backend="tiles")
+        self.assertFalse(any(key[0] is atlas for key in tile_store._images))
+        gc.collect()
+        build_atlas(path, "maple", square_sizes=[32])
+        with Atlas(path) as atlas:
+            maple = self.board.create_image(atlas=atlas, size=256, backend="tiles")
+            expected = self.board.create_image(atlas=atlas, size=256)
+        self.assertNotEqual(maple.tobytes(), wood.tobytes())
+        self.assertEqual(maple.tobytes(), expected.tobytes())
+        del wood, maple, expected
+        gc.collect()
+
+    def test_numpy_backend(self):
+        expected = self.board.create_image(board_design="maple")
+        image = self.board.create_image(atlas=self.atlas, backend="numpy")
+        self.assertEqual(image.tobytes(), expected.tobytes())
+        self.assertEqual(self.atlas.piece_stack(32).shape, (12, 32, 32, 4))
+
+    def test_designs_must_match(self):
+        with self.assertRaises(ValueError):
+            self.board.create_image(board_design="wood", atlas=self.atlas)
+        with self.assertRaises(ValueError):
+            self.board.create_image(pieces_design="modern", atlas=self.atlas)
+
+    def test_not_an_atlas(self):
+        other = Path(self.tmp.name) / "other.atlas"
+        other.write_bytes(b"x" * 64)
+        with self.assertRaises(ValueError):
+            Atlas(other)
+
+    def test_unknown_design(self):
+        with self.assertRaises(ValueError):
+            build_atlas(Path(self.tmp.name) / "none.atlas", "nonexistent")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,55 @@
+import unittest
+
+from PIL import Image
+
+from fen2image.BoardPyramid import BoardPyramid
+from fen2image.utils import get_dict_available_boards
+
+
+class TestBoardPyramid(unittest.TestCase):
+
+    def setUp(self):
+        self.pyramid = BoardPyramid()
+
+    def test_invalid_max_bytes(self):
+        with self.assertRaises(ValueError):
+            BoardPyramid(max_bytes=0)
+
+    def test_native_board(self):
+        board = self.pyramid.get("maple")
+        self.assertEqual(board.size, (800, 800))
+        self.assertEqual(board.mode, "RGBA")
+        self.assertIs(self.pyramid.get("maple"), board)
+
+    def test_jpeg_board_is_decoded_at_reduced_scale(self):
+        board = self.pyramid.get("wood", 32)
+        self.assertEqual(board.size, (256, 256))
+        self.assertIs(self.pyramid.get("wood", 32), board)
+        # the 1024 pixels board is decoded at 1/4 scale, it is never decoded in full
+        self.assertEqual(self.pyramid.stats()["size"], 1)
+        self.assertEqual(self.pyramid.stats()["bytes"], 256 * 256 * 4)
+
+    def test_png_board_is_reduced_from_the_native_board(self):
+        board = self.pyramid.get("green2", 24)
+        self.assertEqual(board.size, (192, 192))
+        with Image.open(get_dict_available_boards()["green2"]) as image:
+            expected = image.convert("RGBA").reduce(4).resize((192, 192), Image.LANCZOS)
+        self.assertEqual(board.tobytes(), expected.tobytes())
+
+    def test_least_recently_used_is_evicted(self):
+        pyramid = BoardPyramid(max_bytes=256 * 256 * 4)
+        pyramid.get("wood", 32)
+        pyramid.get("wood2", 32)
+        stats = pyramid.stats()
+        self.assertEqual(stats["evictions"], 1)
+        self.assertLessEqual(stats["bytes"], stats["max_bytes"])
+
+    def test_clear(self):
+        self.pyramid.get("wood", 32)
+        self.pyramid.clear()
+        self.assertEqual(self.pyramid.stats()["size"], 0)
+        self.assertEqual(self.pyramid.stats()["bytes"], 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -42,6 +42,36 @@ class TestBoardRepresentation(unittest.TestCase):
         self.assertEqual(self.br.half_move_count, self.half_move_count)
         self.assertEqual(self.br.full_move_count, self.full_move_count)
 
+    def test_board_formats(self):
+        """Test that the board can be given as rows, bytes or a placement, and is stored as 64 bytes."""
+        from_rows = BoardRepresentation([list("4k3")] + [list("8")] * 6 + [list("4K3")], "w", "-", "-", 0, 1)
+        from_bytes = BoardRepresentation(b"....k..." + b"." * 48 + b"....K...", "w", "-", "-", 0, 1)
+        from_placement = BoardRepresentation("4k3/8/8/8/8/8/8/4K3", "w", "-", "-", 0, 1)
+        self.assertEqual(from_rows.board_bytes, from_bytes.board_bytes)
+        self.assertEqual(from_rows.board_bytes, from_placement.board_bytes)
+        self.assertEqual(from_rows.to_list()[0], list("....k..."))
+        self.assertEqual(from_rows.placement(), "4k3/8/8/8/8/8/8/4K3")
+        self.assertEqual(self.br.placement(), "rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR")
+
+    def test_board_is_a_copy(self):
+        """Test that editing the rows read from board only changes the board once assigned back."""
+        rows = self.br.board
+        rows[0][0] = "."
+        self.assertEqual(self.br.board_bytes[:1], b"r")
+        self.br.board = rows
+        self.assertEqual(self.br.board_bytes[:1], b".")
+
+    def test_invalid_board(self):
+        """Test that a board without 64 squares is rejected."""
+        with self.assertRaises(ValueError):
+            BoardRepresentation([list("9")] + [list("8")] * 7, "w", "-", "-", 0, 1)
+        with self.assertRaises(ValueError):
+            BoardRepresentation(b"." * 63, "w", "-", "-", 0, 1)
+
+    def test_slots(self):
+        """Test that no per-instance dictionary is allocated."""
+        self.assertFalse(hasattr(self.br, "__dict__"))
+
     @patch("fen2image.BoardRepresentation.get_list_available_pieces", return_value=["classic", "modern"])
     @patch("fen2image.BoardRepresentation.get_list_available_boards", return_value=["wood", "metal"])
     def test_verify_designs_valid(self, mock_boards_list, mock_pieces_list):
@@ -0,0 +1,77 @@
+import io
+import tempfile
+import unittest
+import zipfile
+from contextlib import redirect_stderr
+from pathlib import Path
+
+from fen2image.cli import epd_to_fen, main, read_positions
+
+START = "rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1"
+INPUT = f"""{START}
+
+# a comment
+not a fen
+r1bqkb1r/pppp1ppp/2n2n2/4p2Q/2B1P3/8/PPPP1PPP/RNB1K1NR w KQkq - bm Qxf7; id "mate in 1";
+"""
+
+
+class TestReading(unittest.TestCase):
+
+    def test_epd_to_fen(self):
+        self.assertEqual(epd_to_fen(START), START)
+        self.assertEqual(epd_to_fen("8/8/8/8/8/8/8/K6k b - - bm Kb2;"), "8/8/8/8/8/8/8/K6k b - - 0 1")
+        self.assertEqual(epd_to_fen("8/8/8/8/8/8/8/K6k b - - hmvc 12; fmvn 40;"), "8/8/8/8/8/8/8/K6k b - - 12 40")
+
+    def test_line_numbers(self):
+        positions = list(read_positions(["-"], io.StringIO(INPUT)))
+        self.assertEqual([(source, line) for source, line, _ in positions], [("-", 1), ("-", 4), ("-", 5)])
+        self.assertEqual(positions[0][2], START)
+
+
+class TestMain(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.directory = Path(self.tmp.name)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def run_cli(self, *args):
+        stderr = io.StringIO()
+        status = main(list(args) + ["--size", "64", "--workers", "1", "--board", "wood"], io.StringIO(INPUT), stderr)
+        return status, stderr.getvalue()
+
+    def test_directory(self):
+        status, log = self.run_cli("-o", str(self.directory / "images"))
+        self.assertEqual(status, 0)
+        self.assertEqual(sorted(path.name for path in (self.directory / "images").iterdir()), ["00000001.png", "00000005.png"])
+        self.assertIn("-:4: Invalid FEN", log)
+        self.assertIn("2 rendered, 0 skipped, 1 invalid", log)
+
+    def test_zip_resume(self):
+        archive = self.directory / "images.zip"
+        self.run_cli("-o", str(archive), "--format", "webp")
+        status, log = self.run_cli("-o", str(archive), "--format", "webp", "--resume")
+        self.assertEqual(status, 0)
+        self.assertIn("0 rendered, 2 skipped, 1 invalid", log)
+        with zipfile.ZipFile(archive) as images:
+            self.assertEqual(sorted(images.namelist()), ["00000001.webp", "00000005.webp"])
+
+    def test_compressed_tar_cannot_resume(self):
+        archive = self.directory / "images.tar.gz"
+        self.run_cli("-o", str(archive))
+        with self.assertRaises(SystemExit):
+            self.run_cli("-o", str(archive), "--resume")
+
+    def test_invalid_board_or_size(self):
+        for args in (["--board", "typo"], ["--size", "8"]):
+            with self.assertRaises(SystemExit) as context, redirect_stderr(io.StringIO()):
+                main(["-o", str(self.directory / "images")] + args, io.StringIO(INPUT), io.StringIO())
+            self.assertEqual(context.exception.code, 2)
+        self.assertFalse((self.directory / "images").exists())
+
+
+if __name__ == '__main__':
+    unittest.main()
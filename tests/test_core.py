@@ -0,0 +1,88 @@
+import io
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import patch
+
+from PIL import Image
+
+from fen2image.core import fen2image, fen2images, RenderResult
+from fen2image.RenderCache import RenderCache
+from fen2image.sinks import BytesSink
+
+
+class TestFen2Image(unittest.TestCase):
+
+    def test_nothing_is_written_by_default(self):
+        with patch.object(Image.Image, "save") as mock_save:
+            image = fen2image("8/8/8/8/8/8/8/K6k b - - 0 1", board_design="green2")
+        mock_save.assert_not_called()
+        self.assertIsInstance(image, Image.Image)
+
+    def test_output_sink(self):
+        sink = BytesSink()
+        image = fen2image("8/8/8/8/8/8/8/K6k b - - 0 1", board_design="green2", output=sink)
+        self.assertEqual(Image.open(io.BytesIO(sink.getvalue())).size, image.size)
+
+    def test_size(self):
+        image = fen2image("8/8/8/8/8/8/8/K6k b - - 0 1", board_design="wood", size=260)
+        # the board is 256 pixels wide, a square is 32 pixels, the turn indicator needs 16 + 8 more
+        self.assertEqual(image.size, (256 + 16 + 8, 256 + 16))
+        with self.assertRaises(ValueError):
+            fen2image("8/8/8/8/8/8/8/K6k b - - 0 1", board_design="wood", size=8)
+
+    def test_size_is_part_of_the_cache_key(self):
+        cache = RenderCache()
+        small = fen2image("8/8/8/8/8/8/8/K6k b - - 0 1", board_design="wood", cache=cache, size=256)
+        large = fen2image("8/8/8/8/8/8/8/K6k b - - 0 1", board_design="wood", cache=cache, size=512)
+        self.assertNotEqual(small.size, large.size)
+        self.assertEqual(cache.stats()["misses"], 2)
+
+
+class TestFen2Images(unittest.TestCase):
+
+    def setUp(self):
+        self.fens = [
+            "rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1",
+            "rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR x KQkq - 0 1",
+            "8/8/8/8/8/8/8/K6k b - - 0 1",
+        ]
+
+    def test_ordered_results_with_errors(self):
+        results = list(fen2images(iter(self.fens), board_design="green2", executor="thread", max_workers=2))
+        self.assertEqual([result.index for result in results], [0, 1, 2])
+        self.assertIsInstance(results[0], RenderResult)
+        self.assertIsInstance(results[0].image, Image.Image)
+        self.assertIsNone(results[0].error)
+        self.assertIsNone(results[1].image)
+        self.assertIsInstance(results[1].error, ValueError)
+        self.assertIn("Incorrect active color", str(results[1].error))
+        self.assertIsInstance(results[2].image, Image.Image)
+
+    def test_completion_order(self):
+        results = list(fen2images(self.fens * 3, board_design="green2", executor="thread", ordered=False))
+        self.assertEqual(sorted(result.index for result in results), list(range(9)))
+
+    def test_process_pool(self):
+        results = list(fen2images(self.fens[:1], board_design="green2", max_workers=1))
+        self.assertEqual(results[0].image.size, (1024 + 64 + 32, 1024 + 64))
+
+    def test_external_executor_is_not_shut_down(self):
+        with ThreadPoolExecutor(1) as executor:
+            list(fen2images(self.fens[:1], board_design="green2", executor=executor))
+            self.assertEqual(executor.submit(int, "1").result(), 1)
+
+    def test_invalid_arguments(self):
+        with self.assertRaises(ValueError):
+            list(fen2images(self.fens, executor="gpu"))
+        with self.assertRaises(ValueError):
+            list(fen2images(self.fens, max_workers=0))
+
+    def test_invalid_arguments_are_raised_on_call(self):
+        for kwargs in ({"executor": "gpu"}, {"max_workers": 0}, {"board_design": "typo"}, {"size": 8}, {"format": "bmp"}):
+            with self.assertRaises(ValueError, msg=kwargs):
+                # the generator is never advanced
+                fen2images(self.fens, **kwargs)
+
+
+if __name__ == '__main__':
+    unittest.main()
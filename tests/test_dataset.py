@@ -0,0 +1,109 @@
+import csv
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+from fen2image.Fen import Fen
+from fen2image.dataset import choose_design, image_shape, write_dataset
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+FENS = [
+    "rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1",
+    "r3k2r/p1ppqpb1/bn2pnp1/3PN3/1p2P3/2N2Q1p/PPPBBPPP/R3K2R b KQkq - 0 1",
+    "not a fen",
+    "8/8/8/8/8/8/8/K6k w - - 0 1",
+    "4k3/8/8/8/8/8/8/4K3 b - - 0 1",
+    "rnbqkbnr/pppppppp/8/8/4P3/8/PPPP1PPP/RNBQKBNR b KQkq e3 0 1",
+]
+
+
+class TestReturnTypes(unittest.TestCase):
+
+    def setUp(self):
+        self.board = Fen(FENS[1]).to_board_representation()
+
+    def test_buffer(self):
+        image = self.board.create_image(board_design="maple", size=128)
+        buffer = self.board.create_image(board_design="maple", size=128, return_type="buffer")
+        self.assertEqual(buffer, image.tobytes())
+
+    @unittest.skipIf(numpy is None, "NumPy is not installed")
+    def test_array(self):
+        image = self.board.create_image(board_design="maple", size=128)
+        array = self.board.create_image(board_design="maple", size=128, return_type="array")
+        self.assertEqual(array.dtype, numpy.uint8)
+        self.assertEqual(array.shape, image_shape(128))
+        self.assertEqual(array.tobytes(), image.tobytes())
+
+    def test_invalid_return_type(self):
+        with self.assertRaises(ValueError) as context:
+            self.board.create_image(board_design="maple", return_type="tensor")
+        self.assertIn("Return type 'tensor' is not available", str(context.exception))
+
+    def test_missing_numpy(self):
+        with patch.dict("sys.modules", {"numpy": None}):
+            with self.assertRaises(ImportError):
+                self.board.create_image(board_design="maple", return_type="array")
+
+
+class TestChooseDesign(unittest.TestCase):
+
+    def test_deterministic(self):
+        designs = ["maple", "wood", "green2"]
+        picked = [choose_design(index, designs) for index in range(100)]
+        self.assertEqual(picked, [choose_design(index, designs) for index in range(100)])
+        self.assertEqual(set(picked), set(designs))
+        self.assertNotEqual(picked, [choose_design(index, designs, seed=1) for index in range(100)])
+
+
+@unittest.skipIf(numpy is None, "NumPy is not installed")
+class TestWriteDataset(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.directory = Path(self.tmp.name) / "dataset"
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_shards_and_labels(self):
+        report = write_dataset(iter(FENS), self.directory, size=64, shard_size=2, board_designs=["maple", "wood"],
+                               executor="thread", max_workers=2, batch_size=3)
+        self.assertEqual(report.count, 5)
+        self.assertEqual([path.name for path in report.shards], ["shard-00000.npy", "shard-00001.npy", "shard-00002.npy"])
+        self.assertEqual([index for index, _ in report.errors], [2])
+        shards = [numpy.load(path) for path in report.shards]
+        self.assertEqual([shard.shape for shard in shards], [(2,) + image_shape(64)] * 2 + [(1,) + image_shape(64)])
+
+        with open(report.labels, newline="") as file:
+            labels = list(csv.DictReader(file))
+        self.assertEqual([int(label["index"]) for label in labels], [0, 1, 3, 4, 5])
+        for label in labels:
+            self.assertEqual(label["board_design"], choose_design(int(label["index"]), ["maple", "wood"]))
+            expected = Fen(label["fen"]).to_board_representation().create_image(
+                label["pieces_design"], label["board_design"], size=64, return_type="array")
+            self.assertTrue(numpy.array_equal(shards[int(label["shard"])][int(label["row"])], expected))
+
+    def test_processes_write_the_same_dataset(self):
+        threads = write_dataset(FENS, self.directory / "threads", size=32, shard_size=4, executor="thread")
+        processes = write_dataset(FENS, self.directory / "processes", size=32, shard_size=4, executor="process", max_workers=2)
+        self.assertEqual(threads.labels.read_text(), processes.labels.read_text())
+        for first, second in zip(threads.shards, processes.shards):
+            self.assertTrue(numpy.array_equal(numpy.load(first), numpy.load(second)))
+
+    def test_invalid_arguments(self):
+        with self.assertRaises(ValueError):
+            write_dataset(FENS, self.directory, size=8)
+        with self.assertRaises(ValueError):
+            write_dataset(FENS, self.directory, shard_size=0)
+        with self.assertRaises(ValueError):
+            write_dataset(FENS, self.directory, board_designs=["nope"])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,78 @@
+import io
+import unittest
+
+from PIL import Image
+
+from fen2image.core import fen2bytes, fen2image
+from fen2image.encoding import Encoding, PRESETS, as_encoding
+from fen2image.sinks import BytesSink
+
+FEN = "r1bqkb1r/pppp1ppp/2n2n2/4p2Q/2B1P3/8/PPPP1PPP/RNB1K1NR w KQkq - 4 4"
+
+
+class TestEncoding(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.image = fen2image(FEN, board_design="wood", size=256)
+
+    def test_invalid_encodings(self):
+        with self.assertRaises(ValueError):
+            Encoding("BMP")
+        with self.assertRaises(ValueError):
+            Encoding("PNG", palette=1000)
+        with self.assertRaises(ValueError):
+            Encoding("JPEG", palette=64)
+        with self.assertRaises(ValueError):
+            as_encoding("gif")
+
+    def test_presets(self):
+        for name, encoding in PRESETS.items():
+            data = encoding.encode(self.image)
+            decoded = Image.open(io.BytesIO(data))
+            self.assertEqual(decoded.format, encoding.format, name)
+            self.assertEqual(decoded.size, self.image.size, name)
+        self.assertIs(as_encoding("WEBP"), PRESETS["webp"])
+        self.assertEqual(PRESETS["jpeg"].mime_type, "image/jpeg")
+
+    def test_palette_keeps_transparency_and_is_smaller(self):
+        data = Encoding("PNG", palette=256).encode(self.image)
+        self.assertLess(len(data), len(Encoding("PNG").encode(self.image)))
+        decoded = Image.open(io.BytesIO(data)).convert("RGBA")
+        # the strip right of the board is transparent
+        self.assertEqual(decoded.getpixel((self.image.width - 1, 0))[3], 0)
+
+    def test_jpeg_is_flattened_on_the_background(self):
+        data = Encoding("JPEG", quality=95, background=(255, 0, 0)).encode(self.image)
+        decoded = Image.open(io.BytesIO(data))
+        self.assertEqual(decoded.mode, "RGB")
+        red, green, blue = decoded.getpixel((self.image.width - 1, 0))
+        self.assertGreater(red, 240)
+        self.assertLess(green, 15)
+
+    def test_lossless_encodings_keep_the_pixels(self):
+        for encoding in (Encoding("PNG", compress_level=1), Encoding("WEBP", lossless=True)):
+            decoded = Image.open(io.BytesIO(encoding.encode(self.image))).convert("RGBA")
+            # lossless WebP may change the color of fully transparent pixels, only visible pixels are compared
+            background = Image.new("RGBA", self.image.size, (255, 255, 255, 255))
+            self.assertEqual(
+                Image.alpha_composite(background, decoded).tobytes(),
+                Image.alpha_composite(background, self.image).tobytes(),
+                encoding,
+            )
+
+
+class TestFen2Bytes(unittest.TestCase):
+
+    def test_bytes_are_returned(self):
+        data = fen2bytes(FEN, board_design="wood", encoding="webp-lossy", size=128)
+        self.assertEqual(Image.open(io.BytesIO(data)).format, "WEBP")
+
+    def test_sink_with_an_encoding(self):
+        sink = BytesSink(Encoding("PNG", palette=64))
+        fen2image(FEN, board_design="wood", size=128, output=sink)
+        self.assertEqual(Image.open(io.BytesIO(sink.getvalue())).mode, "P")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -41,6 +41,19 @@ class TestFen(unittest.TestCase):
             fen_obj.verify()
         self.assertIn("Incorrect number of ranks", str(context.exception))
 
+    def test_verify_invalid_rank_width(self):
+        for placement in ("rnbqkbnr/ppppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR", "rnbqkbnr/pppppppp/8/8/44/8/PPPPPPP/RNBQKBNR", "rnbqkbnr//8/8/8/8/PPPPPPPP/RNBQKBNR"):
+            fen_obj = Fen(placement + " w KQkq - 0 1")
+            with self.assertRaises(ValueError) as context:
+                fen_obj.verify()
+            self.assertIn("Incorrect number of squares in rank", str(context.exception))
+
+    def test_verify_invalid_characters(self):
+        fen_obj = Fen("rnbqkbnr/pppppppp/8/8/8/......../PPPPPPPP/RNBQKBNR w KQkq - 0 1")
+        with self.assertRaises(ValueError) as context:
+            fen_obj.verify()
+        self.assertIn("Incorrect characters in rank", str(context.exception))
+
     def test_verify_invalid_active_color(self):
         fen_obj = Fen(self.invalid_active_color)
         with self.assertRaises(ValueError) as context:
@@ -88,6 +101,7 @@ class TestFen(unittest.TestCase):
             list("RNBQKBNR")
         ]
         self.assertEqual(board_rep.board, expected_board)
+        self.assertEqual(board_rep.board_bytes, b"rnbqkbnrpppppppp" + b"." * 32 + b"PPPPPPPPRNBQKBNR")
 
         self.assertEqual(board_rep.color_turn, "w")
         self.assertEqual(board_rep.castling_rights, "KQkq")
@@ -127,6 +141,20 @@ class TestFen(unittest.TestCase):
         self.assertEqual(board_rep.half_move_count, 15)
         self.assertEqual(board_rep.full_move_count, 30)
 
+    def test_semantic_checks(self):
+        Fen(self.valid_fen).verify(semantic=True)
+        # diagrams without kings stay valid unless asked
+        Fen("8/8/8/8/8/8/8/8 w - - 0 1").verify()
+        with self.assertRaises(ValueError) as context:
+            Fen("8/8/8/8/8/8/8/8 w - - 0 1").verify(semantic=True)
+        self.assertIn("Incorrect number of kings", str(context.exception))
+        with self.assertRaises(ValueError) as context:
+            Fen("k7/8/8/8/8/8/8/KK6 w - - 0 1").verify(semantic=True)
+        self.assertIn("got 2 white and 1 black", str(context.exception))
+        with self.assertRaises(ValueError) as context:
+            Fen("k6P/8/8/8/8/8/8/K7 w - - 0 1").verify(semantic=True)
+        self.assertIn("Pawns on the first or last rank", str(context.exception))
+
 
 if __name__ == '__main__':
     unittest.main()
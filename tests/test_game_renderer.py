@@ -0,0 +1,63 @@
+import unittest
+from unittest.mock import patch
+
+from fen2image.Fen import Fen
+from fen2image.GameRenderer import GameRenderer
+
+GAME = [
+    "rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1",
+    "rnbqkbnr/pppppppp/8/8/4P3/8/PPPP1PPP/RNBQKBNR b KQkq e3 0 1",
+    "rnbqkbnr/pppp1ppp/8/4p3/4P3/8/PPPP1PPP/RNBQKBNR w KQkq e6 0 2",
+    "rnbqkbnr/pppp1ppp/8/4p3/4P3/5N2/PPPP1PPP/RNBQKB1R b KQkq - 1 2",
+    "r1bqkbnr/pppp1ppp/2n5/4p3/4P3/5N2/PPPP1PPP/RNBQKB1R w KQkq - 2 3",
+    "r1bqkbnr/pppp1ppp/2n5/1B2p3/4P3/5N2/PPPP1PPP/RNBQK2R b KQkq - 3 3",
+    "r1bqkbnr/pppp1ppp/2n5/1B2p3/4P3/5N2/PPPP1PPP/RNBQ1RK1 b kq - 4 4",
+    "r1bqkbnr/pppp1ppp/2B5/4p3/4P3/5N2/PPPP1PPP/RNBQ1RK1 b kq - 0 4",
+]
+
+
+class TestGameRenderer(unittest.TestCase):
+
+    def test_frames_match_full_renders(self):
+        frames = list(GameRenderer(board_design="maple").render(GAME))
+        self.assertEqual(len(frames), len(GAME))
+        for fen, frame in zip(GAME, frames):
+            expected = Fen(fen).to_board_representation().create_image(board_design="maple")
+            self.assertEqual(frame.tobytes(), expected.tobytes(), fen)
+
+    def test_sized_frames_match_full_renders(self):
+        frames = list(GameRenderer(board_design="wood", size=256).render(GAME[:3]))
+        for fen, frame in zip(GAME, frames):
+            expected = Fen(fen).to_board_representation().create_image(board_design="wood", size=256)
+            self.assertEqual(frame.tobytes(), expected.tobytes(), fen)
+
+    def test_only_changed_squares_are_repainted(self):
+        renderer = GameRenderer(board_design="maple")
+        renderer.update(GAME[0])
+        with patch.object(renderer, "_paste_piece", wraps=renderer._paste_piece) as mock_paste:
+            renderer.update(GAME[1])
+        self.assertEqual(mock_paste.call_count, 1)
+
+    def test_random_design_is_kept_for_the_game(self):
+        renderer = GameRenderer()
+        renderer.update(GAME[0])
+        design = renderer.board_design
+        self.assertNotEqual(design, "random")
+        renderer.update(GAME[1])
+        self.assertEqual(renderer.board_design, design)
+
+    def test_without_copy_the_canvas_is_reused(self):
+        renderer = GameRenderer(board_design="maple", copy=False)
+        self.assertIs(renderer.update(GAME[0]), renderer.update(GAME[1]))
+
+    def test_reset(self):
+        renderer = GameRenderer(board_design="maple")
+        renderer.update(GAME[0])
+        renderer.reset()
+        frame = renderer.update(GAME[2])
+        expected = Fen(GAME[2]).to_board_representation().create_image(board_design="maple")
+        self.assertEqual(frame.tobytes(), expected.tobytes())
+
+
+if __name__ == '__main__':
+    unittest.main()
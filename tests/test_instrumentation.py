@@ -0,0 +1,73 @@
+import unittest
+
+from fen2image.core import fen2image
+from fen2image.instrumentation import MetricsCollector, instrument, stage
+from fen2image.RenderCache import RenderCache
+from fen2image.sinks import BytesSink
+
+FEN = "rnbqkbnr/pppppppp/8/8/4P3/8/PPPP1PPP/RNBQKBNR b KQkq e3 0 1"
+
+
+class TestMetricsCollector(unittest.TestCase):
+
+    def test_invalid_max_samples(self):
+        with self.assertRaises(ValueError):
+            MetricsCollector(max_samples=0)
+
+    def test_aggregation(self):
+        collector = MetricsCollector()
+        for milliseconds in range(1, 101):
+            collector.timing("encode", milliseconds / 1000)
+        collector.increment("render_cache.hits")
+        collector.increment("render_cache.hits", 2)
+        stats = collector.stats()
+        encode = stats["timings"]["encode"]
+        self.assertEqual(encode["count"], 100)
+        self.assertAlmostEqual(encode["mean"], 0.0505)
+        self.assertAlmostEqual(encode["p50"], 0.05)
+        self.assertAlmostEqual(encode["p99"], 0.099)
+        self.assertAlmostEqual(encode["max"], 0.1)
+        self.assertEqual(stats["counters"], {"render_cache.hits": 3})
+
+        collector.reset()
+        self.assertEqual(collector.stats(), {"timings": {}, "counters": {}})
+
+
+class TestInstrumentation(unittest.TestCase):
+
+    def test_stages_of_a_render(self):
+        collector = MetricsCollector()
+        fen2image(FEN, board_design="wood", size=256, output=BytesSink(), metrics=collector)
+        timings = collector.stats()["timings"]
+        for name in ("validate", "parse", "assets", "decode", "sprites", "composite", "frame", "encode", "render"):
+            self.assertEqual(timings[name]["count"], 1, name)
+        self.assertGreaterEqual(timings["render"]["total"], timings["composite"]["total"])
+
+    def test_cache_counters(self):
+        collector = MetricsCollector()
+        cache = RenderCache()
+        fen2image(FEN, board_design="wood", size=256, cache=cache, metrics=collector)
+        fen2image(FEN, board_design="wood", size=256, cache=cache, metrics=collector)
+        counters = collector.stats()["counters"]
+        self.assertEqual(counters["render_cache.misses"], 1)
+        self.assertEqual(counters["render_cache.hits"], 1)
+        self.assertTrue(any(counter.startswith("sprite_store.") for counter in counters))
+
+    def test_callback(self):
+        events = []
+        with instrument(lambda kind, name, value: events.append((kind, name))):
+            fen2image(FEN, board_design="wood", size=256)
+        self.assertIn(("timing", "composite"), events)
+        self.assertTrue(any(kind == "counter" for kind, _ in events))
+
+    def test_disabled_by_default(self):
+        self.assertIs(stage("render"), stage("encode"))
+
+    def test_invalid_metrics(self):
+        with self.assertRaises(ValueError):
+            with instrument(42):
+                pass
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,43 @@
+import unittest
+from unittest.mock import patch
+
+from fen2image.Fen import Fen
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+
+@unittest.skipIf(numpy is None, "NumPy is not installed")
+class TestNumpyBackend(unittest.TestCase):
+
+    def test_pixels_match_pil_backend(self):
+        fens = [
+            "rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1",
+            "r3k2r/p1ppqpb1/bn2pnp1/3PN3/1p2P3/2N2Q1p/PPPBBPPP/R3K2R b KQkq - 0 1",
+            "8/8/8/8/8/8/8/8 w - - 0 1",
+        ]
+        for board_design in ("maple", "green2"):
+            for fen in fens:
+                board = Fen(fen).to_board_representation()
+                pil = board.create_image(board_design=board_design, backend="pil")
+                vectorized = board.create_image(board_design=board_design, backend="numpy")
+                self.assertEqual(pil.size, vectorized.size)
+                self.assertEqual(pil.tobytes(), vectorized.tobytes(), (board_design, fen))
+
+    def test_invalid_backend(self):
+        board = Fen("8/8/8/8/8/8/8/K6k w - - 0 1").to_board_representation()
+        with self.assertRaises(ValueError) as context:
+            board.create_image(board_design="maple", backend="cuda")
+        self.assertIn("Backend 'cuda' is not available", str(context.exception))
+
+    def test_missing_numpy(self):
+        board = Fen("8/8/8/8/8/8/8/K6k w - - 0 1").to_board_representation()
+        with patch.dict("sys.modules", {"numpy": None}):
+            with self.assertRaises(ImportError):
+                board.create_image(board_design="maple", backend="numpy")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,97 @@
+import unittest
+
+from PIL import Image
+
+from fen2image.Fen import Fen
+from fen2image.RenderCache import RenderCache
+from fen2image.overlays import Arrow, Highlight, arrow_layer, check, last_move, square_index
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+FEN = "r3k2r/p1ppqpb1/bn2pnp1/3PN3/1p2P3/2N2Q1p/PPPBBPPP/R3K2R b KQkq - 0 1"
+OVERLAYS = [*last_move("e2e4"), check("e8"), Highlight("a8"), Highlight("h1"), Arrow("g1", "f3"), Arrow("a1", "h8", width=0.1)]
+
+
+class TestOverlays(unittest.TestCase):
+
+    def test_square_index(self):
+        self.assertEqual(square_index("a8"), 0)
+        self.assertEqual(square_index("h1"), 63)
+        self.assertEqual(square_index("e4"), 36)
+        for square in ("i1", "a9", "e", "e44"):
+            with self.assertRaises(ValueError):
+                square_index(square)
+
+    def test_invalid_overlays(self):
+        with self.assertRaises(ValueError):
+            Highlight("e4", shape="star")
+        with self.assertRaises(ValueError):
+            Arrow("e4", "e4")
+        with self.assertRaises(ValueError):
+            Arrow("e2", "e4", width=0)
+        with self.assertRaises(ValueError):
+            last_move("e2")
+        board = Fen(FEN).to_board_representation()
+        with self.assertRaises(TypeError):
+            board.create_image(board_design="maple", overlays=["e4"])
+
+    def test_highlight_is_drawn_under_the_pieces(self):
+        board = Fen("8/8/8/8/8/8/8/K6k w - - 0 1").to_board_representation()
+        plain = board.create_image(board_design="maple", size=256)
+        highlighted = board.create_image(board_design="maple", size=256, overlays=[Highlight("d4", (255, 0, 0, 255))])
+        # d4 is covered, the empty squares around it are not
+        self.assertEqual(highlighted.getpixel((3 * 32 + 16, 4 * 32 + 16)), (255, 0, 0, 255))
+        self.assertEqual(highlighted.crop((0, 0, 96, 256)).tobytes(), plain.crop((0, 0, 96, 256)).tobytes())
+        # the king on a1 stays over its highlight
+        king = board.create_image(board_design="maple", size=256, overlays=[Highlight("a1", (255, 0, 0, 255))])
+        self.assertNotEqual(king.getpixel((15, 7 * 32 + 16)), (255, 0, 0, 255))
+
+    def test_translucent_overlays_keep_the_board_opaque(self):
+        board = Fen("8/8/8/8/8/8/8/K6k w - - 0 1").to_board_representation()
+        overlays = [*last_move("e2e4"), check("e8"), Arrow("g1", "f3")]
+        backends = ("pil", "tiles", "numpy") if numpy is not None else ("pil", "tiles")
+        for backend in backends:
+            plain = board.create_image(board_design="maple", size=256, backend=backend)
+            drawn = board.create_image(board_design="maple", size=256, backend=backend, overlays=overlays)
+            # e2, e4 and a pixel of the shaft of the arrow, between g1 and f3
+            for x, y in ((4 * 32 + 16, 6 * 32 + 16), (4 * 32 + 16, 4 * 32 + 16), (6 * 32, 6 * 32 + 16)):
+                self.assertNotEqual(drawn.getpixel((x, y)), plain.getpixel((x, y)), backend)
+                self.assertEqual(drawn.getpixel((x, y))[3], 255, backend)
+            # the overlays change no alpha of the render
+            self.assertEqual(drawn.getchannel("A").tobytes(), plain.getchannel("A").tobytes(), backend)
+
+    def test_arrow_layers_are_shared_by_translation(self):
+        arrow_layer.cache_clear()
+        Arrow("a1", "b3").layer(32)
+        layer, position = Arrow("e4", "f6").layer(32)
+        self.assertEqual(arrow_layer.cache_info().hits, 1)
+        self.assertEqual(layer.size, (64, 96))
+        self.assertEqual(position, (4 * 32, 2 * 32))
+
+    def test_backends_give_the_same_pixels(self):
+        board = Fen(FEN).to_board_representation()
+        backends = ("pil", "tiles", "numpy") if numpy is not None else ("pil", "tiles")
+        for board_design in ("maple", "wood"):
+            for size in (None, 200):
+                images = [board.create_image(board_design=board_design, backend=backend, size=size, overlays=OVERLAYS)
+                          for backend in backends]
+                for image in images[1:]:
+                    self.assertEqual(images[0].tobytes(), image.tobytes(), (board_design, size))
+
+    def test_cache_key_includes_overlays(self):
+        board = Fen(FEN).to_board_representation()
+        cache = RenderCache()
+        plain = board.create_image(board_design="maple", size=128, cache=cache)
+        drawn = board.create_image(board_design="maple", size=128, cache=cache, overlays=OVERLAYS)
+        self.assertEqual(cache.stats()["misses"], 2)
+        self.assertNotEqual(plain.tobytes(), drawn.tobytes())
+        self.assertIsInstance(drawn, Image.Image)
+        board.create_image(board_design="maple", size=128, cache=cache, overlays=OVERLAYS)
+        self.assertEqual(cache.stats()["hits"], 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,123 @@
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+from PIL import Image
+
+from fen2image.AssetRegistry import AssetRegistry
+from fen2image.Fen import Fen
+from fen2image.RenderCache import RenderCache
+from fen2image.utils import get_dict_available_boards, get_dict_available_pieces
+
+
+class TestRenderCache(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.directory = Path(self.tmp.name)
+        self.image = Image.new("RGBA", (8, 8), (1, 2, 3, 255))
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_key_ignores_nothing_it_is_given(self):
+        key = RenderCache.make_key("8/8/8/8/8/8/8/K6k", "w", "wood", "classic")
+        self.assertEqual(key, RenderCache.make_key("8/8/8/8/8/8/8/K6k", "w", "wood", "classic"))
+        self.assertNotEqual(key, RenderCache.make_key("8/8/8/8/8/8/8/K6k", "b", "wood", "classic"))
+        self.assertNotEqual(key, RenderCache.make_key("8/8/8/8/8/8/8/K6k", "w", "maple", "classic"))
+        self.assertNotEqual(key, RenderCache.make_key("8/8/8/8/8/8/8/K6k", "w", "wood", "classic", size=256))
+        self.assertNotEqual(key, RenderCache.make_key("8/8/8/8/8/8/8/K6k", "w", "wood", "classic", format="png"))
+
+    def test_memory_lru(self):
+        cache = RenderCache(max_entries=1)
+        cache.put("a", self.image)
+        self.assertEqual(cache.get("a").tobytes(), self.image.tobytes())
+        self.assertIsNot(cache.get("a"), self.image)
+        cache.put("b", b"encoded")
+        self.assertIsNone(cache.get("a"))
+        self.assertEqual(cache.get("b"), b"encoded")
+        stats = cache.stats()
+        self.assertEqual((stats["hits"], stats["misses"], stats["evictions"]), (3, 1, 1))
+
+    def test_disk_tier(self):
+        cache = RenderCache(directory=self.directory)
+        cache.put("a", self.image)
+        cache.put("b", b"encoded")
+
+        reopened = RenderCache(directory=self.directory)
+        self.assertEqual(reopened.get("a").tobytes(), self.image.tobytes())
+        self.assertEqual(reopened.get("b"), b"encoded")
+        self.assertEqual(reopened.stats()["disk_hits"], 2)
+        self.assertGreater(reopened.stats()["disk_bytes"], 0)
+
+    def test_disk_size_cap(self):
+        cache = RenderCache(max_entries=1, directory=self.directory, max_disk_bytes=25)
+        cache.put("a", b"a" * 10)
+        cache.put("b", b"b" * 10)
+        cache.put("c", b"c" * 10)
+        self.assertLessEqual(cache.stats()["disk_bytes"], 25)
+        self.assertEqual(sorted(path.name for path in self.directory.iterdir()), ["b.bin", "c.bin"])
+
+    def test_disk_eviction_leaves_room(self):
+        cache = RenderCache(max_entries=1, directory=self.directory, max_disk_bytes=100)
+        for name in "abcdefghijk":
+            cache.put(name, name.encode() * 10)
+        # the 11th file goes over the cap, the tier is brought down to 90 bytes
+        self.assertEqual(cache.stats()["disk_bytes"], 90)
+        self.assertEqual(len(list(self.directory.iterdir())), 9)
+        with patch.object(RenderCache, "_evict_disk") as mock_evict:
+            cache.put("l", b"l" * 10)
+        mock_evict.assert_not_called()
+
+    def test_clear(self):
+        cache = RenderCache(directory=self.directory)
+        cache.put("a", b"encoded")
+        cache.clear()
+        self.assertIsNone(cache.get("a"))
+        self.assertEqual(list(self.directory.iterdir()), [])
+
+
+class TestCreateImageCache(unittest.TestCase):
+
+    def test_only_rendered_fields_are_cached(self):
+        cache = RenderCache()
+        first = Fen("8/8/8/8/8/8/8/K6k w - - 0 1").to_board_representation()
+        second = Fen("8/8/8/8/8/8/8/K6k w - - 12 40").to_board_representation()
+        image = first.create_image(board_design="green2", cache=cache)
+        with patch.object(type(second), "_render") as mock_render:
+            cached = second.create_image(board_design="green2", cache=cache)
+        mock_render.assert_not_called()
+        self.assertEqual(cached.tobytes(), image.tobytes())
+
+    def test_random_design_is_cached_per_resolved_design(self):
+        cache = RenderCache()
+        board = Fen("8/8/8/8/8/8/8/K6k w - - 0 1").to_board_representation()
+        with patch("fen2image.BoardRepresentation.random.choice", return_value="green2"):
+            board.create_image(cache=cache)
+        key = cache.make_key(board.placement(), "w", "green2", "classic", board_path=get_dict_available_boards()["green2"],
+                             pieces_path=get_dict_available_pieces()["classic"])
+        self.assertIsNotNone(cache.get(key))
+
+    def test_overridden_design_is_not_served_from_the_cache(self):
+        cache = RenderCache()
+        board = Fen("k7/8/8/8/8/8/8/7K w - - 0 1").to_board_representation()
+        with tempfile.TemporaryDirectory() as directory:
+            (Path(directory) / "boards").mkdir()
+            Image.new("RGB", (256, 256), "red").save(Path(directory) / "boards" / "green2.png")
+            registry = AssetRegistry()
+            with patch("fen2image.utils.registry", registry):
+                original = board.create_image(board_design="green2", size=256, cache=cache)
+                registry.register_directory(directory)
+                overridden = board.create_image(board_design="green2", size=256, cache=cache)
+        self.assertEqual(cache.stats()["misses"], 2)
+        self.assertNotEqual(original.getpixel((100, 100)), (255, 0, 0, 255))
+        self.assertEqual(overridden.getpixel((100, 100)), (255, 0, 0, 255))
+
+    def test_placement(self):
+        board = Fen("r3k2r/8/8/8/8/8/8/R3K2R b KQkq - 0 1").to_board_representation()
+        self.assertEqual(board.placement(), "r3k2r/8/8/8/8/8/8/R3K2R")
+
+
+if __name__ == '__main__':
+    unittest.main()
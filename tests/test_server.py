@@ -0,0 +1,109 @@
+import json
+import threading
+import unittest
+import urllib.error
+import urllib.request
+from urllib.parse import urlencode
+
+from fen2image.BoardPyramid import board_pyramid
+from fen2image.server import RenderServer
+
+FEN = "rnbqkbnr/pppppppp/8/8/4P3/8/PPPP1PPP/RNBQKBNR b KQkq e3 0 1"
+
+
+class TestRenderServer(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.server = RenderServer(("127.0.0.1", 0), executor="thread", max_workers=2, log_requests=False,
+                                  boards=["wood", "maple"], sizes=[64, 128])
+        cls.thread = threading.Thread(target=cls.server.serve_forever, daemon=True)
+        cls.thread.start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+
+    def get(self, path, **headers):
+        request = urllib.request.Request(f"http://127.0.0.1:{self.server.server_port}{path}", headers=headers)
+        try:
+            with urllib.request.urlopen(request) as response:
+                return response.status, response.headers, response.read()
+        except urllib.error.HTTPError as error:
+            return error.code, error.headers, error.read()
+
+    def render_path(self, **params):
+        return "/render?" + urlencode(params)
+
+    def test_workers_are_preloaded(self):
+        # the thread workers share the caches of the process
+        misses = board_pyramid.stats()["misses"]
+        board_pyramid.get("wood", 16)
+        board_pyramid.get("maple", 8)
+        self.assertEqual(board_pyramid.stats()["misses"], misses)
+        with self.assertRaises(ValueError):
+            RenderServer(("127.0.0.1", 0), executor="thread", boards=["typo"])
+        with self.assertRaises(ValueError):
+            RenderServer(("127.0.0.1", 0), executor="thread", sizes=[8])
+
+    def test_render_and_conditional_request(self):
+        status, headers, body = self.get(self.render_path(fen=FEN, board="wood", size=128))
+        self.assertEqual(status, 200)
+        self.assertEqual(headers["Content-Type"], "image/png")
+        self.assertTrue(body.startswith(b"\x89PNG"))
+        self.assertIn("max-age", headers["Cache-Control"])
+
+        # castling rights and en passant do not change the image, nor its ETag
+        same_image = FEN.replace("KQkq e3", "- -")
+        status, _, body = self.get(self.render_path(fen=same_image, board="wood", size=128), **{"If-None-Match": headers["ETag"]})
+        self.assertEqual(status, 304)
+        self.assertEqual(body, b"")
+
+    def test_repeated_render_is_cached(self):
+        path = self.render_path(fen=FEN, board="maple", size=64, format="webp")
+        first = self.get(path)
+        hits = self.server.cache.stats()["hits"]
+        second = self.get(path)
+        self.assertEqual(first[2], second[2])
+        self.assertEqual(second[1]["Content-Type"], "image/webp")
+        self.assertEqual(self.server.cache.stats()["hits"], hits + 1)
+
+    def test_overlays(self):
+        plain = self.get(self.render_path(fen=FEN, board="wood", size=128))
+        path = "/render?" + urlencode([("fen", FEN), ("board", "wood"), ("size", 128), ("lastmove", "e2e4"),
+                                       ("arrow", "g8f6"), ("arrow", "d7d5")])
+        status, headers, body = self.get(path)
+        self.assertEqual(status, 200)
+        self.assertNotEqual(headers["ETag"], plain[1]["ETag"])
+        self.assertNotEqual(body, plain[2])
+
+        status, _, body = self.get(self.render_path(fen=FEN, board="wood", arrow="e2e2"))
+        self.assertEqual(status, 400)
+        self.assertIn("two different squares", json.loads(body)["error"])
+
+    def test_random_board_is_not_cached(self):
+        status, headers, _ = self.get(self.render_path(fen=FEN, size=64))
+        self.assertEqual(status, 200)
+        self.assertEqual(headers["Cache-Control"], "no-store")
+        self.assertIsNone(headers["ETag"])
+
+    def test_bad_requests(self):
+        for params in ({}, {"fen": "not a fen"}, {"fen": FEN, "size": "8"}, {"fen": FEN, "format": "bmp"}, {"fen": FEN, "board": "nope"}):
+            status, _, body = self.get(self.render_path(**params))
+            self.assertEqual(status, 400, params)
+            self.assertIn("error", json.loads(body))
+        self.assertEqual(self.get("/nowhere")[0], 404)
+
+    def test_metrics(self):
+        self.get(self.render_path(fen=FEN, board="wood", size=64))
+        status, headers, body = self.get("/metrics")
+        self.assertEqual(status, 200)
+        text = body.decode()
+        self.assertIn('fen2image_requests_total{status="200"}', text)
+        self.assertIn("fen2image_render_cache_misses_total", text)
+        self.assertIn('fen2image_render_seconds{quantile="0.99"}', text)
+
+
+if __name__ == '__main__':
+    unittest.main()
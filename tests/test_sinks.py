@@ -0,0 +1,68 @@
+import io
+import tempfile
+import unittest
+from pathlib import Path
+
+from PIL import Image
+
+from fen2image.sinks import BackgroundWriter, BytesSink, FileSink, Sink, as_sink
+
+
+class TestSinks(unittest.TestCase):
+
+    def setUp(self):
+        self.image = Image.new("RGBA", (16, 16), (10, 20, 30, 255))
+        self.tmp = tempfile.TemporaryDirectory()
+        self.directory = Path(self.tmp.name)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_as_sink(self):
+        self.assertIsNone(as_sink(None))
+        sink = BytesSink()
+        self.assertIs(as_sink(sink), sink)
+        self.assertIsInstance(as_sink("image.png"), FileSink)
+        self.assertIsInstance(as_sink(io.BytesIO()), FileSink)
+        with self.assertRaises(ValueError):
+            as_sink(42)
+
+    def test_bytes_sink(self):
+        sink = BytesSink()
+        sink.write(self.image)
+        decoded = Image.open(io.BytesIO(sink.getvalue()))
+        self.assertEqual(decoded.format, "PNG")
+        self.assertEqual(decoded.convert("RGBA").tobytes(), self.image.tobytes())
+
+    def test_file_sink_format_from_extension(self):
+        path = self.directory / "image.webp"
+        FileSink(path).write(self.image)
+        self.assertEqual(Image.open(path).format, "WEBP")
+
+    def test_file_sink_file_object_defaults_to_png(self):
+        buffer = io.BytesIO()
+        FileSink(buffer).write(self.image)
+        self.assertTrue(buffer.getvalue().startswith(b"\x89PNG"))
+
+    def test_background_writer(self):
+        with BackgroundWriter(max_pending=1) as writer:
+            for index in range(3):
+                writer.sink(self.directory / f"{index}.png").write(self.image)
+            writer.flush()
+            self.assertEqual(sorted(path.name for path in self.directory.iterdir()), ["0.png", "1.png", "2.png"])
+        with self.assertRaises(RuntimeError):
+            writer.sink(self.directory / "3.png").write(self.image)
+
+    def test_background_writer_keeps_errors(self):
+        with BackgroundWriter() as writer:
+            writer.sink(self.directory / "missing" / "image.png").write(self.image)
+        self.assertEqual(len(writer.errors), 1)
+        self.assertIsInstance(writer.errors[0][1], OSError)
+
+    def test_base_sink(self):
+        with self.assertRaises(TypeError):
+            Sink()
+
+
+if __name__ == '__main__':
+    unittest.main()
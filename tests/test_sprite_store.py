@@ -0,0 +1,56 @@
+import unittest
+
+from fen2image.SpriteStore import SpriteStore
+
+
+class TestSpriteStore(unittest.TestCase):
+
+    def setUp(self):
+        self.store = SpriteStore(max_entries=2)
+
+    def test_invalid_max_entries(self):
+        with self.assertRaises(ValueError):
+            SpriteStore(max_entries=0)
+
+    def test_piece_is_resized_and_reused(self):
+        first = self.store.get_piece("classic", "K", 40)
+        second = self.store.get_piece("classic", "K", 40)
+        self.assertEqual(first.size, (40, 40))
+        self.assertEqual(first.mode, "RGBA")
+        self.assertIs(first, second)
+        self.assertEqual(self.store.stats()["hits"], 1)
+        self.assertEqual(self.store.stats()["misses"], 1)
+
+    def test_size_is_part_of_the_key(self):
+        small = self.store.get_piece("classic", "K", 20)
+        large = self.store.get_piece("classic", "K", 40)
+        self.assertIsNot(small, large)
+        self.assertEqual(self.store.stats()["misses"], 2)
+
+    def test_frame_is_half_a_square(self):
+        frame = self.store.get_frame("b", 40)
+        self.assertEqual(frame.size, (20, 20))
+
+    def test_least_recently_used_is_evicted(self):
+        self.store.get_piece("classic", "K", 40)
+        self.store.get_piece("classic", "Q", 40)
+        self.store.get_piece("classic", "K", 40)
+        self.store.get_piece("classic", "R", 40)
+        stats = self.store.stats()
+        self.assertEqual(stats["evictions"], 1)
+        self.assertEqual(stats["size"], 2)
+
+        self.store.get_piece("classic", "K", 40)
+        self.assertEqual(self.store.stats()["hits"], 2)
+        self.store.get_piece("classic", "Q", 40)
+        self.assertEqual(self.store.stats()["misses"], 4)
+
+    def test_clear(self):
+        self.store.get_piece("classic", "K", 40)
+        self.store.clear()
+        self.assertEqual(len(self.store), 0)
+        self.assertEqual(self.store.stats()["misses"], 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,73 @@
+import unittest
+
+from PIL import Image
+
+from fen2image.Fen import Fen
+from fen2image.TileStore import TileStore, tile_store
+from fen2image.instrumentation import MetricsCollector
+
+FENS = [
+    "rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1",
+    "r3k2r/p1ppqpb1/bn2pnp1/3PN3/1p2P3/2N2Q1p/PPPBBPPP/R3K2R b KQkq - 0 1",
+    "8/8/8/8/8/8/8/8 w - - 0 1",
+]
+
+
+class TestTileStore(unittest.TestCase):
+
+    def test_invalid_max_bytes(self):
+        with self.assertRaises(ValueError):
+            TileStore(max_bytes=0)
+
+    def test_tile_is_composed_once(self):
+        store = TileStore()
+        calls = []
+
+        def compose():
+            calls.append(1)
+            return Image.new("RGBA", (8, 8))
+
+        tile = store.get(("maple", "classic", 8, 0, "K"), compose)
+        self.assertIs(store.get(("maple", "classic", 8, 0, "K"), compose), tile)
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(store.stats(), {"hits": 1, "misses": 1, "evictions": 0, "size": 1, "bytes": 256, "max_bytes": store.max_bytes})
+
+    def test_memory_is_bounded(self):
+        store = TileStore(max_bytes=3 * 256)
+        for index in range(5):
+            store.get(("maple", "classic", 8, index, "K"), lambda: Image.new("RGBA", (8, 8)))
+        stats = store.stats()
+        self.assertEqual(stats["size"], 3)
+        self.assertEqual(stats["bytes"], 3 * 256)
+        self.assertEqual(stats["evictions"], 2)
+
+        store.clear()
+        self.assertEqual(len(store), 0)
+        self.assertEqual(store.stats()["bytes"], 0)
+
+
+class TestTilesBackend(unittest.TestCase):
+
+    def test_pixels_match_pil_backend(self):
+        for board_design in ("maple", "green2", "wood"):
+            for size in (None, 200):
+                for fen in FENS:
+                    board = Fen(fen).to_board_representation()
+                    pil = board.create_image(board_design=board_design, backend="pil", size=size)
+                    tiles = board.create_image(board_design=board_design, backend="tiles", size=size)
+                    self.assertEqual(pil.size, tiles.size)
+                    self.assertEqual(pil.tobytes(), tiles.tobytes(), (board_design, size, fen))
+
+    def test_tiles_are_reused(self):
+        board = Fen(FENS[1]).to_board_representation()
+        board.create_image(board_design="maple", backend="tiles", size=160)
+        metrics = MetricsCollector()
+        board.create_image(board_design="maple", backend="tiles", size=160, metrics=metrics)
+        counters = metrics.stats()["counters"]
+        self.assertEqual(counters["tile_store.hits"], 32)
+        self.assertNotIn("tile_store.misses", counters)
+        self.assertLessEqual(tile_store.stats()["bytes"], tile_store.max_bytes)
+
+
+if __name__ == '__main__':
+    unittest.main()
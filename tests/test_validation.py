@@ -0,0 +1,75 @@
+import tempfile
+import unittest
+from pathlib import Path
+
+from fen2image.validation import main, validate_file
+
+START = "rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1"
+LINES = [
+    START,
+    "# a comment",
+    "",
+    "rnbqkbnr/pppppppp/9/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1",
+    "r3k2r/p1ppqpb1/bn2pnp1/3PN3/1p2P3/2N2Q1p/PPPBBPPP/R3K2R b KQkq - 0 1",
+    # the same placement as the first line, other fields in unusual forms
+    "rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR b qkKQ - 00 7",
+    "8/8/8/8/8/8/8/8 w - - 0 1",
+    "8/8/8/8/8/8/8/K6k w - - 0 1  ",
+    "4k3/8/8/8/8/8/8/4K3 x - - 0 1",
+    START,
+]
+
+
+class TestValidateFile(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = Path(self.tmp.name) / "positions.fen"
+        self.path.write_text("\n".join(LINES) + "\n")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_report(self):
+        report = validate_file(self.path, executor="thread")
+        self.assertEqual(report.lines, 8)
+        self.assertEqual(report.valid, 5)
+        self.assertEqual([number for number, _ in report.errors], [4, 7, 9])
+        self.assertIn("Incorrect characters in rank", report.errors[0][1])
+        self.assertIn("Incorrect number of kings", report.errors[1][1])
+        self.assertIn("Incorrect active color", report.errors[2][1])
+        self.assertEqual(report.duplicates, [])
+
+    def test_without_semantic_checks(self):
+        report = validate_file(self.path, semantic=False, executor="thread")
+        self.assertEqual([number for number, _ in report.errors], [4, 9])
+
+    def test_chunks_give_the_same_report(self):
+        whole = validate_file(self.path, dedup=True, executor="thread")
+        for chunk_bytes in (1, 50, 200):
+            self.assertEqual(validate_file(self.path, dedup=True, executor="thread", max_workers=3, chunk_bytes=chunk_bytes), whole)
+
+    def test_dedup_and_output(self):
+        output = Path(self.tmp.name) / "clean.fen"
+        report = validate_file(self.path, dedup=True, output=output, executor="process", max_workers=2, chunk_bytes=100)
+        self.assertEqual(report.duplicates, [6, 10])
+        self.assertEqual(output.read_text().splitlines(), [LINES[0], LINES[4], LINES[7].strip()])
+
+    def test_file_without_final_newline(self):
+        self.path.write_text(START + "\n" + "8/8/8 w - - 0 1")
+        report = validate_file(self.path, executor="thread", chunk_bytes=10)
+        self.assertEqual(report.lines, 2)
+        self.assertEqual([number for number, _ in report.errors], [2])
+
+    def test_empty_file(self):
+        self.path.write_bytes(b"")
+        self.assertEqual(validate_file(self.path, executor="thread"), (0, 0, [], []))
+
+    def test_main(self):
+        output = Path(self.tmp.name) / "clean.fen"
+        self.assertEqual(main([str(self.path), "--dedup", "-o", str(output), "-j", "1", "-q"]), 1)
+        self.assertEqual(len(output.read_text().splitlines()), 3)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,63 @@
+import subprocess
+import sys
+import unittest
+from pathlib import Path
+
+from fen2image.core import fen2image
+from fen2image.instrumentation import MetricsCollector
+from fen2image.warmup import preload
+
+FEN = "r1bqkb1r/pppp1ppp/2n2n2/4p2Q/2B1P3/8/PPPP1PPP/RNB1K1NR w KQkq - 4 4"
+
+
+class TestPreload(unittest.TestCase):
+
+    def test_renders_need_no_decoding_after_preload(self):
+        loaded = preload(boards=["wood", "maple"], sizes=[None, 200], freeze=False)
+        self.assertEqual(loaded["boards"], 4)
+        # 2 native square sizes (128 and 100) and 25 for size 200, 12 pieces and 2 turn indicators each
+        self.assertEqual(loaded["sprites"], 3 * 14)
+
+        metrics = MetricsCollector()
+        for board_design in ("wood", "maple"):
+            for size in (None, 200):
+                fen2image(FEN, board_design=board_design, size=size, metrics=metrics)
+        counters = metrics.stats()["counters"]
+        self.assertNotIn("board_pyramid.misses", counters)
+        self.assertNotIn("sprite_store.misses", counters)
+
+    def test_tiles(self):
+        loaded = preload(boards=["maple"], sizes=[160], tiles=True, freeze=False)
+        self.assertEqual(loaded["tiles"], 64 * 12)
+
+        metrics = MetricsCollector()
+        fen2image(FEN, board_design="maple", size=160, backend="tiles", metrics=metrics)
+        self.assertNotIn("tile_store.misses", metrics.stats()["counters"])
+
+    def test_unknown_designs(self):
+        with self.assertRaises(ValueError):
+            preload(boards=["nope"], freeze=False)
+        with self.assertRaises(ValueError):
+            preload(boards=["wood"], piece_sets=["nope"], freeze=False)
+        with self.assertRaises(ValueError):
+            preload(boards=["wood"], sizes=[8], freeze=False)
+
+
+
+class TestLazyImports(unittest.TestCase):
+
+    def test_parsing_does_not_import_pillow(self):
+        code = (
+            "import sys, fen2image\n"
+            "from fen2image.Fen import Fen\n"
+            f"Fen({FEN!r}).to_board_representation()\n"
+            "print(sorted(name for name in ('PIL', 'asyncio', 'multiprocessing') if name in sys.modules))\n"
+            "fen2image.fen2image\n"
+            "print(fen2image.RenderCache.__name__)\n"
+        )
+        output = subprocess.run([sys.executable, "-c", code], cwd=Path(__file__).parent.parent, capture_output=True, text=True, check=True)
+        self.assertEqual(output.stdout.split(), ["[]", "RenderCache"])
+
+
+if __name__ == '__main__':
+    unittest.main()